@@ -6,37 +6,281 @@ import datetime
 from types import SimpleNamespace
 import regex
 regex.DEFAULT_VERSION = regex.VERSION1
-from bs4 import BeautifulSoup
 import sys
 import copy
 import random
 from threading import Thread
+import threading
+import queue
+import heapq
 from collections.abc import Sequence
+import collections
 import six
 import hashlib
 import base64
 import itertools
+import urllib.parse
 import pickle
 import store
 import logging
-
-crt_cod = [{"name":"Afghanistan","code":"af"},{"name":"Albania","code":"al"},{"name":"Algeria","code":"dz"},{"name":"American Samoa","code":"as"},{"name":"Andorra","code":"ad"},{"name":"Angola","code":"ao"},{"name":"Anguilla","code":"ai"},{"name":"Antarctica","code":"aq"},{"name":"Antigua and Barbuda","code":"ag"},{"name":"Argentina","code":"ar"},{"name":"Armenia","code":"am"},{"name":"Aruba","code":"aw"},{"name":"Australia","code":"au"},{"name":"Austria","code":"at"},{"name":"Azerbaijan","code":"az"},{"name":"Bahamas","code":"bs"},{"name":"Bahrain","code":"bh"},{"name":"Bangladesh","code":"bd"},{"name":"Barbados","code":"bb"},{"name":"Belarus","code":"by"},{"name":"Belgium","code":"be"},{"name":"Belize","code":"bz"},{"name":"Benin","code":"bj"},{"name":"Bermuda","code":"bm"},{"name":"Bhutan","code":"bt"},{"name":"Bolivia, Plurinational State of","code":"bo"},{"name":"Bosnia and Herzegovina","code":"ba"},{"name":"Botswana","code":"bw"},{"name":"Bouvet Island","code":"bv"},{"name":"Brazil","code":"br"},{"name":"British Indian Ocean Territory","code":"io"},{"name":"Brunei Darussalam","code":"bn"},{"name":"Bulgaria","code":"bg"},{"name":"Burkina Faso","code":"bf"},{"name":"Burundi","code":"bi"},{"name":"Cabo Verde","code":"cv"},{"name":"Cambodia","code":"kh"},{"name":"Cameroon","code":"cm"},{"name":"Canada","code":"ca"},{"name":"Cayman Islands","code":"ky"},{"name":"Central African Republic","code":"cf"},{"name":"Chad","code":"td"},{"name":"Chile","code":"cl"},{"name":"China","code":"cn"},{"name":"Christmas Island","code":"cx"},{"name":"Colombia","code":"co"},{"name":"Comoros","code":"km"},{"name":"Congo","code":"cg"},{"name":"Congo, The Democratic Republic of the","code":"cd"},{"name":"Cook Islands","code":"ck"},{"name":"Costa Rica","code":"cr"},{"name":"Croatia","code":"hr"},{"name":"Cuba","code":"cu"},{"name":"Cyprus","code":"cy"},{"name":"Czechia","code":"cz"},{"name":"C\xc3\xb4te d\'Ivoire","code":"ci"},{"name":"Denmark","code":"dk"},{"name":"Djibouti","code":"dj"},{"name":"Dominica","code":"dm"},{"name":"Dominican Republic","code":"do"},{"name":"Ecuador","code":"ec"},{"name":"Egypt","code":"eg"},{"name":"El Salvador","code":"sv"},{"name":"Equatorial Guinea","code":"gq"},{"name":"Eritrea","code":"er"},{"name":"Estonia","code":"ee"},{"name":"Eswatini","code":"sz"},{"name":"Ethiopia","code":"et"},{"name":"Falkland Islands (Malvinas)","code":"fk"},{"name":"Faroe Islands","code":"fo"},{"name":"Fiji","code":"fj"},{"name":"Finland","code":"fi"},{"name":"France","code":"fr"},{"name":"French Guiana","code":"gf"},{"name":"French Polynesia","code":"pf"},{"name":"French Southern Territories","code":"tf"},{"name":"Gabon","code":"ga"},{"name":"Gambia","code":"gm"},{"name":"Georgia","code":"ge"},{"name":"Germany","code":"de"},{"name":"Ghana","code":"gh"},{"name":"Gibraltar","code":"gi"},{"name":"Greece","code":"gr"},{"name":"Greenland","code":"gl"},{"name":"Grenada","code":"gd"},{"name":"Guadeloupe","code":"gp"},{"name":"Guam","code":"gu"},{"name":"Guatemala","code":"gt"},{"name":"Guinea","code":"gn"},{"name":"Guinea-Bissau","code":"gw"},{"name":"Guyana","code":"gy"},{"name":"Haiti","code":"ht"},{"name":"Holy See (Vatican City State)","code":"va"},{"name":"Honduras","code":"hn"},{"name":"Hong Kong","code":"hk"},{"name":"Hungary","code":"hu"},{"name":"Iceland","code":"is"},{"name":"India","code":"in"},{"name":"Indonesia","code":"id"},{"name":"Iran, Islamic Republic of","code":"ir"},{"name":"Iraq","code":"iq"},{"name":"Ireland","code":"ie"},{"name":"Israel","code":"il"},{"name":"Italy","code":"it"},{"name":"Jamaica","code":"jm"},{"name":"Japan","code":"jp"},{"name":"Jordan","code":"jo"},{"name":"Kazakhstan","code":"kz"},{"name":"Kenya","code":"ke"},{"name":"Kiribati","code":"ki"},{"name":"Korea, Democratic People\'s Republic of","code":"kp"},{"name":"Korea, Republic of","code":"kr"},{"name":"Kuwait","code":"kw"},{"name":"Kyrgyzstan","code":"kg"},{"name":"Lao People\'s Democratic Republic","code":"la"},{"name":"Latvia","code":"lv"},{"name":"Lebanon","code":"lb"},{"name":"Lesotho","code":"ls"},{"name":"Liberia","code":"lr"},{"name":"Libya","code":"ly"},{"name":"Liechtenstein","code":"li"},{"name":"Lithuania","code":"lt"},{"name":"Luxembourg","code":"lu"},{"name":"Macao","code":"mo"},{"name":"Madagascar","code":"mg"},{"name":"Malawi","code":"mw"},{"name":"Malaysia","code":"my"},{"name":"Maldives","code":"mv"},{"name":"Mali","code":"ml"},{"name":"Malta","code":"mt"},{"name":"Marshall Islands","code":"mh"},{"name":"Martinique","code":"mq"},{"name":"Mauritania","code":"mr"},{"name":"Mauritius","code":"mu"},{"name":"Mayotte","code":"yt"},{"name":"Mexico","code":"mx"},{"name":"Micronesia, Federated States of","code":"fm"},{"name":"Moldova, Republic of","code":"md"},{"name":"Monaco","code":"mc"},{"name":"Mongolia","code":"mn"},{"name":"Montenegro","code":"me"},{"name":"Montserrat","code":"ms"},{"name":"Morocco","code":"ma"},{"name":"Mozambique","code":"mz"},{"name":"Myanmar","code":"mm"},{"name":"Namibia","code":"na"},{"name":"Nauru","code":"nr"},{"name":"Nepal","code":"np"},{"name":"Netherlands","code":"nl"},{"name":"New Caledonia","code":"nc"},{"name":"New Zealand","code":"nz"},{"name":"Nicaragua","code":"ni"},{"name":"Niger","code":"ne"},{"name":"Nigeria","code":"ng"},{"name":"Norfolk Island","code":"nf"},{"name":"North Macedonia","code":"mk"},{"name":"Northern Mariana Islands","code":"mp"},{"name":"Norway","code":"no"},{"name":"Oman","code":"om"},{"name":"Pakistan","code":"pk"},{"name":"Palau","code":"pw"},{"name":"Palestine, State of","code":"ps"},{"name":"Panama","code":"pa"},{"name":"Papua New Guinea","code":"pg"},{"name":"Paraguay","code":"py"},{"name":"Peru","code":"pe"},{"name":"Philippines","code":"ph"},{"name":"Pitcairn","code":"pn"},{"name":"Poland","code":"pl"},{"name":"Portugal","code":"pt"},{"name":"Puerto Rico","code":"pr"},{"name":"Qatar","code":"qa"},{"name":"Romania","code":"ro"},{"name":"Russia","code":"ru"},{"name":"Rwanda","code":"rw"},{"name":"R\xc3\xa9union","code":"re"},{"name":"Saint Helena, Ascension and Tristan da Cunha","code":"sh"},{"name":"Saint Kitts and Nevis","code":"kn"},{"name":"Saint Lucia","code":"lc"},{"name":"Saint Vincent and the Grenadines","code":"vc"},{"name":"Samoa","code":"ws"},{"name":"San Marino","code":"sm"},{"name":"Sao Tome and Principe","code":"st"},{"name":"Saudi Arabia","code":"sa"},{"name":"Senegal","code":"sn"},{"name":"Serbia","code":"rs"},{"name":"Seychelles","code":"sc"},{"name":"Sierra Leone","code":"sl"},{"name":"Singapore","code":"sg"},{"name":"Slovakia","code":"sk"},{"name":"Slovenia","code":"si"},{"name":"Solomon Islands","code":"sb"},{"name":"Somalia","code":"so"},{"name":"South Africa","code":"za"},{"name":"South Sudan","code":"ss"},{"name":"Spain","code":"es"},{"name":"Sri Lanka","code":"lk"},{"name":"Sudan","code":"sd"},{"name":"Suriname","code":"sr"},{"name":"Sweden","code":"se"},{"name":"Switzerland","code":"ch"},{"name":"Syrian Arab Republic","code":"sy"},{"name":"Taiwan","code":"tw"},{"name":"Tajikistan","code":"tj"},{"name":"Tanzania, United Republic of","code":"tz"},{"name":"Thailand","code":"th"},{"name":"Timor-Leste","code":"tl"},{"name":"Togo","code":"tg"},{"name":"Tokelau","code":"tk"},{"name":"Tonga","code":"to"},{"name":"Trinidad and Tobago","code":"tt"},{"name":"Tunisia","code":"tn"},{"name":"Turkey","code":"tr"},{"name":"Turkmenistan","code":"tm"},{"name":"Turks and Caicos Islands","code":"tc"},{"name":"Tuvalu","code":"tv"},{"name":"Uganda","code":"ug"},{"name":"Ukraine","code":"ua"},{"name":"United Arab Emirates","code":"ae"},{"name":"United Kingdom","code":"gb"},{"name":"United States","code":"us"},{"name":"United States Minor Outlying Islands","code":"um"},{"name":"Uruguay","code":"uy"},{"name":"Uzbekistan","code":"uz"},{"name":"Vanuatu","code":"vu"},{"name":"Venezuela, Bolivarian Republic of","code":"ve"},{"name":"Vietnam","code":"vn"},{"name":"Virgin Islands, British","code":"vg"},{"name":"Virgin Islands, U.S.","code":"vi"},{"name":"Wallis and Futuna","code":"wf"},{"name":"Western Sahara","code":"eh"},{"name":"Yemen","code":"ye"},{"name":"Zambia","code":"zm"},{"name":"Zimbabwe","code":"zw"}]
-lan_ctr = [['ps', ['af', 'pk']], ['fa', ['af', 'ir']], ['uz', ['af', 'uz']], ['sv', ['ax', 'fi', 'se']], ['sq', ['al', 'xk', 'mk']], ['en', ['us','gb','nz','ca','au']], ['ar', ['dz', 'bh', 'td', 'km', 'dj', 'eg', 'er', 'iq', 'il', 'jo', 'kw', 'lb', 'ly', 'mr', 'ma', 'om', 'ps', 'qa', 'sa', 'so', 'ss', 'sd', 'sy', 'tn', 'ae', 'eh', '001', 'ye']], ['fr', ['fr']], ['kab', ['dz']], ['ca', ['ad', 'fr', 'it', 'es']], ['ln', ['ao', 'cf', 'cg', 'cd']], ['pt', ['ao', 'br', 'cv', 'gq', 'fr', 'gw', 'lu', 'mo', 'mz', 'pt', 'st', 'ch', 'tl']], ['es', ['ai', 'ag', 'ar', 'aw', 'bs', 'bb', 'bz', 'bm', 'bo', 'br', 'vg', 'ca', 'ic', 'bq', 'ky', 'ea', 'cl', 'co', 'cr', 'cu', 'cw', 'dm', 'do', 'ec', 'sv', 'gq', 'fk', 'gf', 'gl', 'gd', 'gp', 'gt', 'gy', 'ht', 'hn', '419', 'mq', 'mx', 'ms', 'ni', 'pa', 'py', 'pe', 'ph', 'pr', 'sx', 'es', 'bl', 'kn', 'lc', 'mf', 'pm', 'vc', 'sr', 'tt', 'tc', 'vi', 'us', 'uy', 've']], ['hy', ['am']], ['nl', ['aw', 'be', 'bq', 'cw', 'nl', 'sx', 'sr']], ['de', ['de']], ['az', ['az']], ['bn', ['bd', 'in']], ['ccp', ['bd', 'in']], ['be', ['by']], ['ru', ['by', 'kz', 'kg', 'md', 'ru', 'ua']], ['wa', ['be']], ['yo', ['bj', 'ng']], ['dz', ['bt']], ['qu', ['bo', 'ec', 'pe']], ['bs', ['ba']], ['hr', ['ba', 'hr']], ['sr', ['ba', 'xk', 'me', 'rs']], ['tn', ['bw', 'za']], ['ms', ['bn', 'my', 'sg']], ['bg', ['bg']], ['ff', ['bf', 'cm', 'gm', 'gh', 'gw', 'gn', 'lr', 'mr', 'ne', 'ng', 'sn', 'sl']], ['rn', ['bi']], ['km', ['kh']], ['agq', ['cm']], ['ksf', ['cm']], ['bas', ['cm']], ['dua', ['cm']], ['ewo', ['cm']], ['kkj', ['cm']], ['nmg', ['cm']], ['mgo', ['cm']], ['mua', ['cm']], ['nnh', ['cm']], ['jgo', ['cm']], ['yav', ['cm']], ['iu', ['ca']], ['moh', ['ca']], ['kea', ['cv']], ['sg', ['cf']], ['arn', ['cl']], ['yue', ['cn', 'hk']], ['zh', ['cn', 'hk', 'mo', 'sg', 'tw']], ['ii', ['cn']], ['bo', ['cn', 'in']], ['ug', ['cn']], ['lu', ['cd']], ['sw', ['cd', 'ke', 'tz', 'ug']], ['el', ['cy', 'gr']], ['tr', ['cy', 'tr']], ['cs', ['cz']], ['da', ['dk', 'gl']], ['fo', ['dk', 'fo']], ['so', ['dj', 'et', 'ke', 'so']], ['byn', ['er']], ['gez', ['er', 'et']], ['tig', ['er']], ['ti', ['er', 'et']], ['et', ['ee']], ['ss', ['sz', 'za']], ['am', ['et']], ['om', ['et', 'ke']], ['wal', ['et']], ['fi', ['fi']], ['smn', ['fi']], ['se', ['fi', 'no', 'se']], ['br', ['fr']], ['co', ['fr']], ['oc', ['fr']], ['gsw', ['fr', 'li', 'ch']], ['ka', ['ge']], ['os', ['ge', 'ru']], ['ksh', ['de']], ['nds', ['de', 'nl']], ['dsb', ['de']], ['hsb', ['de']], ['ak', ['gh']], ['ee', ['gh', 'tg']], ['gaa', ['gh']], ['ha', ['gh', 'ne', 'ng']], ['kl', ['gl']], ['kpe', ['gn', 'lr']], ['nqo', ['gn']], ['hu', ['hu']], ['is', ['is']], ['as', ['in']], ['brx', ['in']], ['gu', ['in']], ['hi', ['in']], ['kn', ['in']], ['ks', ['in']], ['kok', ['in']], ['ml', ['in']], ['mni', ['in']], ['mr', ['in']], ['ne', ['in', 'np']], ['or', ['in']], ['pa', ['in', 'pk']], ['sa', ['in']], ['sat', ['in']], ['ta', ['in', 'my', 'sg', 'lk']], ['te', ['in']], ['ur', ['in', 'pk']], ['id', ['id']], ['jv', ['id']], ['ckb', ['ir', 'iq']], ['mzn', ['ir']], ['lrc', ['ir', 'iq']], ['syr', ['iq', 'sy']], ['ga', ['ie']], ['gv', ['im']], ['he', ['il']], ['fur', ['it']], ['it', ['it', 'sm', 'ch', 'va']], ['sc', ['it']], ['scn', ['it']], ['ja', ['jp']], ['kk', ['kz']], ['ebu', ['ke']], ['guz', ['ke']], ['kln', ['ke']], ['kam', ['ke']], ['ki', ['ke']], ['luo', ['ke']], ['luy', ['ke']], ['mas', ['ke', 'tz']], ['mer', ['ke']], ['saq', ['ke']], ['dav', ['ke']], ['teo', ['ke', 'ug']], ['ky', ['kg']], ['lo', ['la']], ['lv', ['lv']], ['st', ['ls', 'za']], ['vai', ['lr']], ['lt', ['lt']], ['lb', ['lu']], ['mg', ['mg']], ['ny', ['mw']], ['dv', ['mv']], ['bm', ['ml']], ['khq', ['ml']], ['ses', ['ml']], ['mt', ['mt']], ['mfe', ['mu']], ['ro', ['md', 'ro']], ['mn', ['mn']], ['tzm', ['ma']], ['zgh', ['ma']], ['shi', ['ma']], ['mgh', ['mz']], ['seh', ['mz']], ['my', ['mm']], ['af', ['na', 'za']], ['naq', ['na']], ['fy', ['nl']], ['mi', ['nz']], ['twq', ['ne']], ['dje', ['ne']], ['ig', ['ng']], ['kaj', ['ng']], ['kcg', ['ng']], ['ko', ['kp', 'kr']], ['mk', ['mk']], ['nb', ['no', 'sj']], ['nn', ['no']], ['sd', ['pk']], ['gn', ['py']], ['ceb', ['ph']], ['fil', ['ph']], ['pl', ['pl']], ['ba', ['ru']], ['ce', ['ru']], ['cv', ['ru']], ['myv', ['ru']], ['sah', ['ru']], ['tt', ['ru']], ['rw', ['rw']], ['dyo', ['sn']], ['wo', ['sn']], ['sk', ['sk']], ['sl', ['si']], ['nso', ['za']], ['nr', ['za']], ['ts', ['za']], ['ve', ['za']], ['xh', ['za']], ['zu', ['za']], ['nus', ['ss']], ['ast', ['es']], ['eu', ['es']], ['gl', ['es']], ['si', ['lk']], ['rm', ['ch']], ['wae', ['ch']], ['trv', ['tw']], ['tg', ['tj']], ['asa', ['tz']], ['bez', ['tz']], ['lag', ['tz']], ['jmc', ['tz']], ['kde', ['tz']], ['rof', ['tz']], ['rwk', ['tz']], ['sbp', ['tz']], ['ksb', ['tz']], ['vun', ['tz']], ['th', ['th']], ['to', ['to']], ['ku', ['tr']], ['tk', ['tm']], ['cgg', ['ug']], ['lg', ['ug']], ['nyn', ['ug']], ['xog', ['ug']], ['uk', ['ua']], ['kw', ['gb']], ['gd', ['gb']], ['cy', ['gb']], ['chr', ['us']], ['haw', ['us']], ['lkt', ['us']], ['vi', ['vn']], ['eo', ['001']], ['io', ['001']], ['ia', ['001']], ['jbo', ['001']], ['bem', ['zm']], ['nd', ['zw']], ['sn', ['zw']]]
+# asyncio, contextvars and aiohttp are imported once the async backend is first used (see aio.available() and aio.start()),
+# orjson once the first json is decoded (see view.decoder())
+aiohttp = None
+orjson = None
 
 logger = logging.getLogger(__name__)
 
-class custom_session(requests.Session):
-    """Custom session class inheriting from requests.Session.
+class client(requests.Session):
+    """Pooled http session of a service.
+
+    Every service module talks to its api through one client. Its connection
+    pools are sized to the concurrency cap of the service's category, so that
+    concurrent threads reuse kept-alive connections instead of discarding them
+    when the pool is full, and requests without an explicit timeout get the
+    default timeout. Instrumentation happens in transport(), which the adapter
+    mounted on every client sends its requests through.
 
-    This class provides per-instance rate limiting, automatic retry for
-    certain error codes, and a default timeout.
+        session = client('realdebrid', 'debrid')
+
+    Attributes:
+        timeout (str): Default timeout (in seconds) of requests without an explicit timeout.
+    """
+
+    timeout = "60"
+
+    def __init__(self, name="", category=""):
+        """Create a new client.
+
+        Args:
+            name (str): Name of the service.
+            category (str): Concurrency category of the service ('scraper', 'debrid' or 'metadata').
+        """
+        super(client, self).__init__()
+        self.name = name
+        self.category = category
+        self.size = 0
+        self.lock = threading.Lock()
+        mounted = adapter()
+        self.mount('https://', mounted)
+        self.mount('http://', mounted)
+
+    def pool(self):
+        # size of the connection pool per host: the concurrency cap of the category, with room for the
+        # requests that a single scrape or download makes in parallel.
+        try:
+            cap = max(1, int(getattr(concurrency, self.category)))
+        except:
+            cap = 1
+        return max(requests.adapters.DEFAULT_POOLSIZE, cap * 2)
+
+    def resize(self):
+        # the pools are sized on first use, once the settings are loaded, and resized if the concurrency settings change
+        size = self.pool()
+        if size == self.size:
+            return
+        with self.lock:
+            if size == self.size:
+                return
+            mounted = adapter(pool_connections=requests.adapters.DEFAULT_POOLSIZE, pool_maxsize=size)
+            self.mount('https://', mounted)
+            self.mount('http://', mounted)
+            self.size = size
+
+    def request(self, method, url, **kwargs):
+        self.resize()
+        if kwargs.get('timeout', None) == None:
+            try:
+                kwargs['timeout'] = float(client.timeout)
+            except:
+                kwargs['timeout'] = 60
+        # scraper and debrid services are skipped while their circuit breaker is open. requests that dont tell whether the
+        # service is up (e.g. resolving the links of releases) are made with circuit=False.
+        circuit = kwargs.pop('circuit', True)
+        if not circuit or not self.category in ['scraper', 'debrid'] or self.name == "":
+            return super(client, self).request(method, url, **kwargs)
+        service = breaker.get(self.name)
+        service.check()
+        try:
+            response = super(client, self).request(method, url, **kwargs)
+        except cancelled:
+            service.release()
+            raise
+        except requests.RequestException as e:
+            service.error(e, cancellation.current())
+            raise
+        except:
+            service.release()
+            raise
+        service.record(response)
+        return response
+
+class conditional:
+    """Conditional GET cache for watchlist polls.
+
+    Remembers the ETag/Last-Modified validators of a polled url together with
+    the result the service derived from it. The next poll sends them as
+    If-None-Match/If-Modified-Since, and if the service answers 304 Not Modified
+    the stored result is used without decoding anything. Validators are only
+    kept once the service stored its result, so a poll that failed halfway is
+    fetched in full again.
+
+        response = session.get(url, headers=poll.headers(key, headers))
+        if poll.check(key, response):
+            return poll.value(key)
+        ...
+        poll.store(key, result)
+
+    Attributes:
+        unchanged: Returned by the service get() helpers for unchanged urls.
+    """
+
+    unchanged = object()
+
+    def __init__(self):
+        self.entries = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def headers(self, key, headers={}):
+        """Return the request headers, with the validators of the last response added."""
+        entry = self.entries.get(key, None)
+        if entry == None:
+            return headers
+        headers = dict(headers)
+        if not entry[0] == None:
+            headers['If-None-Match'] = entry[0]
+        if not entry[1] == None:
+            headers['If-Modified-Since'] = entry[1]
+        return headers
+
+    def check(self, key, response):
+        """Check a response.
+
+        Returns:
+            bool: True if the response is unchanged since the stored result.
+        """
+        if response.status_code == 304 and key in self.entries:
+            metrics.count('not_modified', limiter.host(response.url))
+            return True
+        etag = response.headers.get('ETag', None)
+        modified = response.headers.get('Last-Modified', None)
+        with self.lock:
+            if response.status_code == 200 and not (etag == None and modified == None):
+                self.pending[key] = (etag, modified)
+            else:
+                self.pending.pop(key, None)
+                self.entries.pop(key, None)
+        return False
+
+    def store(self, key, value):
+        """Store the result of a response that was checked before."""
+        with self.lock:
+            validators = self.pending.pop(key, None)
+            if validators == None:
+                self.entries.pop(key, None)
+            else:
+                self.entries[key] = validators + (value,)
+
+    def value(self, key):
+        return self.entries[key][2]
+
+class flight:
+    """Single-flight coalescing of identical concurrent requests.
+
+    The first caller of a key makes the request, callers that ask for the same
+    key while it is in flight wait for it and share its parsed result. If the
+    result is shared, it is fully materialized once (see view) and every caller
+    gets its own copy, so that no caller sees the changes of another. Results
+    are not kept once the request is done.
+
+        inflight = flight()
+        response = inflight.do(flight.key(url), request, url)
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    class call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+            self.waiters = 0
+
+    def key(url, params=None, *extra):
+        """Return the key of a request, with the host lowercased and the query parameters sorted.
+
+        Args:
+            url (str): The requested url.
+            params (dict): Query parameters that are sent in addition to the url, if any.
+            extra: Further values that distinguish the request, e.g. the authorized user.
+        """
+        parts = urllib.parse.urlparse(url)
+        query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not params == None:
+            query += [(str(name), str(value)) for name, value in dict(params).items()]
+        path = parts.path if not parts.path == '' else '/'
+        return (parts.scheme.lower(), parts.netloc.lower(), path, tuple(sorted(query))) + extra
+
+    def do(self, key, function, *args):
+        """Call function(*args), unless a call with the same key is in flight already.
+
+        Returns:
+            The result of the call. Exceptions of the call are raised for all callers.
+        """
+        with self.lock:
+            call = self.calls.get(key, None)
+            leader = call == None
+            if leader:
+                call = flight.call()
+                self.calls[key] = call
+            else:
+                call.waiters += 1
+        if not leader:
+            metrics.count('coalesced', key[1].split('@')[-1].split(':')[0])
+            token = cancellation.current()
+            while not call.event.wait(0.1):
+                token.check()
+            if not call.error == None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        try:
+            result = function(*args)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+                shared = call.waiters > 0
+            if not shared or not call.error == None:
+                call.event.set()
+        if not shared:
+            return result
+        # views are materialized lazily on access, so all callers copy a fully materialized snapshot, which copying doesnt change
+        try:
+            call.result = view.materialize(result)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.event.set()
+        return copy.deepcopy(call.result)
+
+class custom_session(client):
+    """Custom session class inheriting from client.
+
+    This class provides pooled connections, per-host rate limiting (see limiter),
+    automatic retry for certain error codes (see backoff), and a default timeout.
 
     Attributes:
         DEFAULT_TIMEOUT (int): Default timeout for requests.
         RETRY_CODES (list): List of HTTP status codes to be retried.
         MAX_RETRIES (int): Maximum number of retries.
-        GET_RATE_LIMIT (float): Time (in seconds) to wait between GET requests.
-        POST_RATE_LIMIT (float): Time (in seconds) to wait between POST requests.
+        GET_RATE_LIMIT (float): Default time (in seconds) between GET requests.
+        RATE (float): Requests per second to the host of a request.
+        BURST (float): Number of requests that may be made to a host at once.
         last_request_time (float): Timestamp of the last request made.
     """
 
@@ -45,7 +289,10 @@ class custom_session(requests.Session):
                  retry_codes=[429, 503],
                  max_retries=3,
                  get_rate_limit=5,
-                 post_rate_limit=5):
+                 rate=None,
+                 burst=1,
+                 name="",
+                 category="scraper"):
         """Initialize a new CustomSession instance.
 
         Args:
@@ -53,15 +300,21 @@ class custom_session(requests.Session):
             retry_codes (list): List of HTTP status codes to be retried.
             max_retries (int): Maximum number of retries.
             get_rate_limit (float): Time (in seconds) to wait between GET requests.
-            post_rate_limit (float): Time (in seconds) to wait between POST requests.
+            rate (float): Requests per second to the host of a request, defaults to one per get_rate_limit.
+            burst (float): Number of requests that may be made to a host at once.
+            name (str): Name of the service.
+            category (str): Concurrency category of the service.
         """
-        super(custom_session, self).__init__()
+        super(custom_session, self).__init__(name, category)
 
         self.DEFAULT_TIMEOUT = timeout
         self.RETRY_CODES = retry_codes
         self.MAX_RETRIES = max_retries
         self.GET_RATE_LIMIT = get_rate_limit
-        self.POST_RATE_LIMIT = post_rate_limit
+        if rate == None and get_rate_limit > 0:
+            rate = 1 / get_rate_limit
+        self.RATE = rate
+        self.BURST = burst
         self.last_request_time = 0
 
     def request(self, method, url, **kwargs):
@@ -79,15 +332,15 @@ class custom_session(requests.Session):
         if 'timeout' not in kwargs:
             kwargs['timeout'] = self.DEFAULT_TIMEOUT
 
-        # Ensure rate limiting
-        elapsed_time = time.time() - self.last_request_time
-        if method == 'GET' and elapsed_time < self.GET_RATE_LIMIT:
-            time.sleep(self.GET_RATE_LIMIT - elapsed_time)
-        elif method == 'POST' and elapsed_time < self.POST_RATE_LIMIT:
-            time.sleep(self.POST_RATE_LIMIT - elapsed_time)
+        # Ensure rate limiting: the host shares one token bucket with all other sessions and threads,
+        # the actual wait happens in transport(). waits end early if the current cancellation token is cancelled.
+        token = cancellation.current()
+        if not self.RATE == None:
+            limiter.limit(url, self.RATE, self.BURST, replace=False)
 
-        retries = 0
-        while retries < self.MAX_RETRIES:
+        # Retry with the wait the service asks for, or with exponential backoff
+        policy = backoff(retries=self.MAX_RETRIES - 1)
+        while not token.cancelled():
             try:
                 response = super(custom_session, self).request(method, url, **kwargs)
 
@@ -95,24 +348,23 @@ class custom_session(requests.Session):
 
                 if response.status_code in self.RETRY_CODES:
                     logger.error(f"request error: {response.status_code} - retrying...")
-                    retries += 1
-                    if method == 'GET':
-                        time.sleep(self.GET_RATE_LIMIT)
-                    elif method == 'POST':
-                        time.sleep(self.POST_RATE_LIMIT)
-                    continue
+                    if policy.wait(response):
+                        continue
+                    break
 
                 return response
 
+            except (cancelled, tripped):
+                break
             except requests.RequestException as e:
                 logger.error(f"request error: {e}")
-                retries += 1
-                if method == 'GET':
-                    time.sleep(self.GET_RATE_LIMIT)
-                elif method == 'POST':
-                    time.sleep(self.POST_RATE_LIMIT)
+                if not policy.wait():
+                    break
 
-        logger.error(f"failed to fetch URL {url} after {self.MAX_RETRIES} attempts")
+        if token.cancelled():
+            logger.error(f"request to {url} cancelled")
+        else:
+            logger.error(f"failed to fetch URL {url} after {policy.attempt + 1} attempts")
         return None
 
     def get(self, url, **kwargs):
@@ -140,3 +392,1263 @@ class custom_session(requests.Session):
             response: Response object returned from the POST request.
         """
         return self.request('POST', url, data=data, json=json, **kwargs)
+
+class limiter:
+    """Thread-safe token-bucket rate limiter, shared by all sessions and threads.
+
+    Every host gets at most one bucket that refills at `rate` requests per second
+    and holds up to `burst` requests. Requests to a limited host wait (in the
+    order they arrived) until the bucket has a token again, requests to other
+    hosts are not limited at all. Service modules opt in by limiting their host
+    once, e.g. at import:
+
+        limiter.limit('api.real-debrid.com', 250 / 60, 10)
+
+    A host can also limit the requests of a single method further, on top of
+    the limit of the host:
+
+        limiter.limit('api.trakt.tv', 1, method='POST')
+
+    Attributes:
+        rates (str): User defined limits 'host=rate/burst, ...' that override the
+            limits set by the service modules.
+        defaults (dict): Limits set by the service modules, keyed by host.
+        buckets (dict): Buckets created so far, keyed by host.
+        holds (dict): Times until which a host asked not to be contacted, keyed by host.
+    """
+
+    rates = ""
+    defaults = {}
+    buckets = {}
+    holds = {}
+    parsed = (None, {})
+    lock = threading.Lock()
+
+    class bucket:
+        def __init__(self, rate, burst):
+            self.rate = rate
+            self.burst = burst
+            self.tokens = burst
+            self.stamp = time.monotonic()
+            self.lock = threading.Lock()
+
+        def reserve(self):
+            # take a token and return the time to wait for it. the token count can go negative, so that waiting requests are served in order.
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                self.tokens -= 1
+                if self.tokens >= 0:
+                    return 0
+                return -self.tokens / self.rate
+
+    def host(url):
+        return requests.utils.urlparse(url).netloc.split('@')[-1].split(':')[0].lower()
+
+    def overrides():
+        # parse the user defined limits, the buckets are rebuilt whenever the setting changes
+        if limiter.parsed[0] == limiter.rates:
+            return limiter.parsed[1]
+        limits = {}
+        for entry in limiter.rates.split(','):
+            try:
+                host, limit = entry.split('=')
+                rate, burst = (limit.split('/') + ['1'])[:2]
+                limits[host.strip().lower()] = (float(rate), float(burst))
+            except:
+                continue
+        with limiter.lock:
+            limiter.parsed = (limiter.rates, limits)
+            limiter.buckets = {}
+        return limits
+
+    def limit(host, rate, burst=1, replace=True, method=""):
+        """Limit the requests to a host.
+
+        Args:
+            host (str): Host name (or url) to limit.
+            rate (float): Requests per second.
+            burst (float): Number of requests that may be made at once.
+            replace (bool): Whether an existing limit of the host is replaced.
+            method (str): Only limit the requests of this http method, e.g. 'POST'.
+        """
+        if '/' in host:
+            host = limiter.host(host)
+        host = limiter.key(host, method)
+        with limiter.lock:
+            if replace or not host in limiter.defaults:
+                limiter.defaults[host] = (rate, burst)
+                limiter.buckets.pop(host, None)
+
+    def get(host):
+        overrides = limiter.overrides()
+        bucket = limiter.buckets.get(host, None)
+        if bucket == None:
+            limit = overrides.get(host, limiter.defaults.get(host, None))
+            if limit == None or limit[0] <= 0:
+                return None
+            with limiter.lock:
+                if not host in limiter.buckets:
+                    limiter.buckets[host] = limiter.bucket(limit[0], max(1, limit[1]))
+                bucket = limiter.buckets[host]
+        return bucket
+
+    def key(host, method=""):
+        # limits of a single method are kept as 'post api.trakt.tv', like they are written in the rates setting
+        if method == "":
+            return host
+        return method.lower() + ' ' + host
+
+    def hold(url, seconds):
+        """Hold all requests to the host of the url for the given time."""
+        host = limiter.host(url)
+        until = time.monotonic() + seconds
+        with limiter.lock:
+            if until > limiter.holds.get(host, 0):
+                limiter.holds[host] = until
+
+    def acquire(url, method=""):
+        """Wait until a request to the given url may be made.
+
+        Returns:
+            bool: False if the wait was cancelled.
+        """
+        wait = limiter.delay(url, method)
+        if wait > 0:
+            return not cancellation.current().wait(wait)
+        return True
+
+    def delay(url, method=""):
+        """Take a token for a request to the given url and return the time (in seconds) to wait for it."""
+        host = limiter.host(url)
+        wait = 0
+        if host in limiter.holds:
+            wait = limiter.holds[host] - time.monotonic()
+        bucket = limiter.get(host)
+        if not bucket == None:
+            wait = max(wait, bucket.reserve())
+        if not method == "":
+            bucket = limiter.get(limiter.key(host, method))
+            if not bucket == None:
+                wait = max(wait, bucket.reserve())
+        return wait
+
+class backoff:
+    """Retry policy for rate limited and temporarily unavailable responses.
+
+    The wait before a retry is taken from the response headers whenever the
+    service sends them (Retry-After, X-RateLimit-*/RateLimit-* and Trakt's
+    X-Ratelimit), otherwise it grows exponentially with full jitter. A policy
+    gives up once its retries or its time budget are used up, or once the
+    service asks for a wait that would exceed the budget:
+
+        policy = backoff()
+        response = session.get(url)
+        while response.status_code in backoff.codes and policy.wait(response):
+            response = session.get(url)
+
+    Attributes:
+        codes (list): HTTP status codes that are retried.
+        retries (str): Maximum number of retries per request.
+        budget (str): Maximum time (in seconds) spent waiting for retries per request.
+    """
+
+    codes = [429, 503]
+    retries = "5"
+    budget = "60"
+
+    def __init__(self, base=1, cap=30, retries=None, budget=None):
+        """Create a new retry policy.
+
+        Args:
+            base (float): Wait (in seconds) before the first retry, without headers.
+            cap (float): Maximum wait (in seconds) between two retries, without headers.
+            retries (int): Maximum number of retries, defaults to backoff.retries.
+            budget (float): Maximum total wait (in seconds), defaults to backoff.budget.
+        """
+        self.base = base
+        self.cap = cap
+        try:
+            self.retries = int(retries if not retries == None else backoff.retries)
+        except:
+            self.retries = 5
+        try:
+            self.budget = float(budget if not budget == None else backoff.budget)
+        except:
+            self.budget = 60
+        self.attempt = 0
+        self.spent = 0
+
+    def seconds(value, now=None):
+        # a header value as a number of seconds from now: either seconds, a unix timestamp or an http/iso date
+        if now == None:
+            now = time.time()
+        value = str(value).strip()
+        try:
+            number = float(value)
+            if number > 1e9:
+                return max(0, number - now)
+            return max(0, number)
+        except:
+            pass
+        try:
+            import email.utils
+            return max(0, email.utils.parsedate_to_datetime(value).timestamp() - now)
+        except:
+            pass
+        try:
+            date = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if date.tzinfo == None:
+                date = date.replace(tzinfo=datetime.timezone.utc)
+            return max(0, date.timestamp() - now)
+        except:
+            return None
+
+    def pause(response):
+        """Return the time (in seconds) the service asks to wait before the next request.
+
+        Returns:
+            float: Seconds to wait, None if the response doesnt ask for a wait.
+        """
+        headers = getattr(response, 'headers', None)
+        if headers == None:
+            return None
+        if 'Retry-After' in headers and getattr(response, 'status_code', 0) in backoff.codes:
+            return backoff.seconds(headers['Retry-After'])
+        for prefix in ['X-RateLimit-', 'RateLimit-']:
+            if headers.get(prefix + 'Remaining', None) in ['0', '0.0']:
+                if prefix + 'Reset' in headers:
+                    return backoff.seconds(headers[prefix + 'Reset'])
+        if 'X-Ratelimit' in headers:
+            try:
+                limit = json.loads(headers['X-Ratelimit'])
+                if int(limit['remaining']) <= 0:
+                    return backoff.seconds(limit['until'])
+            except:
+                pass
+        return None
+
+    def delay(self, response=None):
+        """Return the wait (in seconds) before the next retry."""
+        pause = backoff.pause(response)
+        if not pause == None:
+            return pause + random.uniform(0, min(1, pause * 0.1 + 0.1))
+        return random.uniform(0, min(self.cap, self.base * 2 ** self.attempt))
+
+    def next(self, response=None):
+        """Count a retry and return the time (in seconds) to wait before it.
+
+        Args:
+            response (response): The response that should be retried, if any.
+
+        Returns:
+            float: Seconds to wait, None if the request shouldnt be retried.
+        """
+        if self.attempt >= self.retries:
+            return None
+        delay = self.delay(response)
+        if self.spent + delay > self.budget:
+            logger.error(f"retry budget exceeded, not waiting another {round(delay, 1)} seconds")
+            return None
+        self.attempt += 1
+        self.spent += delay
+        metrics.count('retries', limiter.host(getattr(response, 'url', '') or ''))
+        return delay
+
+    def wait(self, response=None):
+        """Wait before the next retry.
+
+        Args:
+            response (response): The response that should be retried, if any.
+
+        Returns:
+            bool: False if the request shouldnt be retried.
+        """
+        delay = self.next(response)
+        if delay == None:
+            return False
+        return not cancellation.current().wait(delay)
+
+class tripped(requests.exceptions.ConnectionError):
+    """Raised instead of making a request to a service whose circuit breaker is open."""
+
+class breaker:
+    """Circuit breaker of a scraper or debrid service.
+
+    A service that keeps failing (connection errors, timeouts or 5xx responses)
+    is tripped after a number of consecutive failures. While the breaker is
+    open, requests to the service fail instantly with tripped instead of
+    waiting for their timeouts and retries. Once the cooldown has passed, the
+    breaker is half-open: a single request probes the service, all others
+    still fail instantly. A successful probe closes the breaker, a failed one
+    opens it again for twice the cooldown (up to an hour).
+
+        service = breaker.get('jackett')
+        if service.blocked():
+            ...  # skip the service
+
+    Attributes:
+        failures (str): Number of consecutive failures after which a service is tripped.
+        cooldown (str): Time (in seconds) a tripped service is skipped before it is probed.
+        breakers (dict): Breakers created so far, keyed by service name.
+    """
+
+    failures = "5"
+    cooldown = "60"
+    breakers = {}
+    lock = threading.Lock()
+
+    def __init__(self, name):
+        self.name = name
+        self.state = 'closed'
+        self.count = 0
+        self.opened = 0
+        self.wait = 0
+        self.probing = False
+
+    def get(name):
+        """Return the breaker of a service, creating it on first use."""
+        with breaker.lock:
+            if not name in breaker.breakers:
+                breaker.breakers[name] = breaker(name)
+            return breaker.breakers[name]
+
+    def status():
+        """Return the breakers of all services that were used so far, sorted by name."""
+        with breaker.lock:
+            return sorted(breaker.breakers.values(), key=lambda service: service.name)
+
+    def settings():
+        try:
+            failures = max(1, int(breaker.failures))
+        except:
+            failures = 5
+        try:
+            cooldown = max(0, float(breaker.cooldown))
+        except:
+            cooldown = 60
+        return failures, cooldown
+
+    def retry(self):
+        """Return the time (in seconds) until an open breaker is probed."""
+        return max(0, self.opened + self.wait - time.time())
+
+    def blocked(self):
+        """Return True while the breaker is open and the service shouldnt be used."""
+        return self.state == 'open' and self.retry() > 0
+
+    def allow(self):
+        """Return True if a request to the service may be made. Half-open breakers let one probe through."""
+        with breaker.lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and self.retry() <= 0:
+                self.state = 'half-open'
+                self.probing = False
+            if self.state == 'half-open' and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def check(self):
+        """Raise tripped if no request to the service may be made."""
+        if not self.allow():
+            metrics.count('tripped', self.name)
+            raise tripped("[" + self.name + "] service unavailable, skipping it for another " + str(round(self.retry())) + " seconds")
+
+    def success(self):
+        with breaker.lock:
+            recovered = not self.state == 'closed'
+            self.state = 'closed'
+            self.count = 0
+            self.probing = False
+        if recovered:
+            from ui.ui_print import ui_print
+            ui_print("[" + self.name + "] service is available again")
+
+    def failure(self):
+        failures, cooldown = breaker.settings()
+        with breaker.lock:
+            self.count += 1
+            if self.state == 'half-open':
+                self.wait = min(max(self.wait, cooldown) * 2, 3600)
+            elif self.state == 'closed' and self.count >= failures:
+                self.wait = cooldown
+            else:
+                return
+            self.state = 'open'
+            self.opened = time.time()
+            self.probing = False
+        metrics.count('trips', self.name)
+        from ui.ui_print import ui_print
+        ui_print("[" + self.name + "] service unavailable after " + str(self.count) + " failed requests, skipping it for " + str(round(self.wait)) + " seconds")
+
+    def error(self, e, token):
+        """Count a failed request as a failure, unless it timed out because the time budget of its token ran out."""
+        if getattr(e, 'budget', False) or token.cancelled():
+            self.release()
+        else:
+            self.failure()
+
+    def release(self):
+        # a probe that ended without an answer (e.g. because it was cancelled) lets the next request probe
+        with breaker.lock:
+            self.probing = False
+
+    def record(self, response):
+        """Count a response as a success, or as a failure if the service answered with a server error."""
+        if response.status_code >= 500:
+            self.failure()
+        else:
+            self.success()
+
+class concurrency:
+    """Bounded concurrency slots shared by all threads.
+
+    Every (category, service) pair gets its own semaphore, sized by the cap of its
+    category, so parallel download workers cannot flood a single provider. Use it
+    as a context manager around the calls that should be capped:
+
+        with concurrency('scraper', 'torrentio'):
+            ...
+
+    Attributes:
+        scraper (str): Maximum number of concurrent scrapes per scraper.
+        debrid (str): Maximum number of concurrent checks/downloads per debrid service.
+        metadata (str): Maximum number of concurrent metadata requests per service (Plex, Trakt).
+        semaphores (dict): Semaphores created so far, keyed by category, service and cap.
+    """
+
+    scraper = "4"
+    debrid = "2"
+    metadata = "4"
+    semaphores = {}
+    lock = threading.Lock()
+
+    def __init__(self, category, name=""):
+        """Look up (or create) the semaphore for the given category and service.
+
+        Args:
+            category (str): One of 'scraper', 'debrid' or 'metadata'.
+            name (str): Name of the service whose requests should be capped.
+        """
+        try:
+            cap = max(1, int(getattr(concurrency, category)))
+        except:
+            cap = 1
+        key = (category, name, cap)
+        with concurrency.lock:
+            if not key in concurrency.semaphores:
+                concurrency.semaphores[key] = threading.BoundedSemaphore(cap)
+            self.semaphore = concurrency.semaphores[key]
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.semaphore.release()
+        return False
+
+class executor:
+    """Shared pool of worker threads with a queue per service.
+
+    Work is queued per service, and the workers take it round robin from the
+    queues, so that hundreds of queued link resolutions of one indexer cannot
+    hold up the work of the others. Workers are started when work is queued
+    while all workers are busy, up to the size of the pool, and exit after a
+    minute without work. Work runs under the cancellation token of the thread
+    that queued it. The depth of each queue and the time work waited in it are
+    recorded in the metrics.
+
+        future = executor.scrapers.submit('torrentio', function, *args)
+        releases = future.result()
+
+    Attributes:
+        size (str): Maximum number of worker threads of each pool.
+        scrapers (executor): Pool that runs the scrapers.
+        resolvers (executor): Pool that resolves the release links of jackett and prowlarr.
+    """
+
+    size = "32"
+
+    def __init__(self, name):
+        self.name = name
+        self.queues = collections.OrderedDict()
+        self.condition = threading.Condition()
+        self.workers = 0
+        self.idle = 0
+
+    def limit(self):
+        try:
+            return max(1, int(executor.size))
+        except:
+            return 32
+
+    def submit(self, service, function, *args):
+        """Queue a call of function(*args) for a service.
+
+        Returns:
+            concurrent.futures.Future: The future of the call's result.
+        """
+        import concurrent.futures
+        future = concurrent.futures.Future()
+        task = (future, function, args, cancellation.current(), time.perf_counter())
+        with self.condition:
+            if not service in self.queues:
+                self.queues[service] = collections.deque()
+            self.queues[service].append(task)
+            depth = len(self.queues[service])
+            # start a worker unless there is an idle one for every queued task
+            if sum(len(tasks) for tasks in self.queues.values()) > self.idle and self.workers < self.limit():
+                self.workers += 1
+                Thread(target=self.work, daemon=True, name=self.name).start()
+            else:
+                self.condition.notify()
+        metrics.gauge('queue_depth', self.name + ': ' + service, depth)
+        return future
+
+    def take(self):
+        # the next task of the service that is next in turn. the service goes to the end of the line.
+        for service in self.queues:
+            tasks = self.queues.pop(service)
+            task = tasks.popleft()
+            if len(tasks) > 0:
+                self.queues[service] = tasks
+            return service, task, len(tasks)
+        return None
+
+    def work(self):
+        while True:
+            with self.condition:
+                next = self.take()
+                if next == None:
+                    self.idle += 1
+                    self.condition.wait(60)
+                    self.idle -= 1
+                    next = self.take()
+                    if next == None:
+                        self.workers -= 1
+                        return
+            service, (future, function, args, token, queued), depth = next
+            metrics.gauge('queue_depth', self.name + ': ' + service, depth)
+            metrics.observe('queue_wait', self.name + ': ' + service, time.perf_counter() - queued)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with token:
+                    future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+executor.scrapers = executor('scrapers')
+executor.resolvers = executor('resolvers')
+
+class recorder:
+    """Record-and-replay harness for all http traffic.
+
+    Every request sent through a client (the service sessions and
+    custom_session alike) passes through transport() below, other requests
+    made with the requests library arent recorded or replayed. In
+    'record' mode each request and its response are captured and written to a
+    json fixture file. In 'replay' mode responses are served from such a
+    fixture, in the order they were recorded, either with their recorded latency
+    or with none at all - no network access is made.
+
+    Note that fixtures contain the full urls and responses, including api keys
+    and tokens that are part of urls.
+
+    Attributes:
+        mode (str): '', 'record' or 'replay'.
+        filename (str): Path of the fixture file.
+        latency (str): 'recorded' to replay responses with their recorded latency, 'zero' for none.
+        records (list): Recorded requests and responses.
+        responses (dict): Recorded responses to replay, keyed by request.
+    """
+
+    mode = ""
+    filename = ""
+    latency = "recorded"
+    records = []
+    responses = {}
+    lock = threading.Lock()
+
+    def start(mode, filename, latency="recorded"):
+        """Start recording or replaying.
+
+        Args:
+            mode (str): 'record' or 'replay'.
+            filename (str): Path of the fixture file to write or read.
+            latency (str): 'recorded' or 'zero', only used when replaying.
+        """
+        recorder.mode = mode
+        recorder.filename = filename
+        recorder.latency = latency
+        if mode == 'replay':
+            with open(filename, 'r') as f:
+                for record in json.load(f):
+                    recorder.responses.setdefault(recorder.key(record['method'], record['url'], record['body']), []).append(record)
+        elif mode == 'record':
+            import atexit
+            atexit.register(recorder.save)
+
+    def key(method, url, body):
+        return method + ' ' + url + ' ' + body
+
+    def digest(body):
+        if body == None:
+            return ""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        return hashlib.sha1(body).hexdigest()
+
+    def record(adapter, request, **kwargs):
+        tic = time.perf_counter()
+        response = http_send(adapter, request, **kwargs)
+        content = response.content
+        with recorder.lock:
+            recorder.records.append({
+                'method': request.method,
+                'url': request.url,
+                'body': recorder.digest(request.body),
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': dict(response.headers),
+                'encoding': response.encoding,
+                'content': base64.b64encode(content if content != None else b"").decode('ascii'),
+                'latency': time.perf_counter() - tic,
+            })
+        return response
+
+    def replay(request):
+        key = recorder.key(request.method, request.url, recorder.digest(request.body))
+        with recorder.lock:
+            records = recorder.responses.get(key, [])
+            if len(records) == 0:
+                raise requests.exceptions.ConnectionError("no recorded response for: " + request.method + " " + request.url, request=request)
+            # serve recorded responses in order, the last one is repeated
+            record = records.pop(0) if len(records) > 1 else records[0]
+        if recorder.latency == 'recorded':
+            time.sleep(record['latency'])
+        response = requests.models.Response()
+        response.status_code = record['status']
+        response.reason = record['reason']
+        response.headers = requests.structures.CaseInsensitiveDict(record['headers'])
+        response.encoding = record['encoding']
+        response._content = base64.b64decode(record['content'])
+        response.url = request.url
+        response.request = request
+        response.elapsed = datetime.timedelta(seconds=record['latency'])
+        return response
+
+    def save():
+        """Write all recorded requests and responses to the fixture file."""
+        with recorder.lock:
+            records = list(recorder.records)
+        try:
+            with open(recorder.filename, 'w') as f:
+                json.dump(records, f)
+        except Exception as e:
+            logger.error(f"couldnt write http fixture file {recorder.filename}: {e}")
+
+class metrics:
+    """Timing metrics of the download pipeline.
+
+    Phases (watchlist and library fetches, scrapes, debrid checks and downloads,
+    release sorting, whole media items) are timed per service and aggregated into
+    histograms. Counters track events like scraped releases. Both are exported as
+    a Prometheus text file and a json snapshot, usually into the config dir:
+
+        with metrics.timer('scrape', 'torrentio'):
+            ...
+
+    Attributes:
+        buckets (list): Upper bounds (in seconds) of the histogram buckets.
+        histograms (dict): Bucket counts, sum, count and maximum per (phase, service).
+        counters (dict): Counter values per (event, service).
+    """
+
+    buckets = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+    histograms = {}
+    counters = {}
+    gauges = {}
+    lock = threading.Lock()
+
+    class timer:
+        """Context manager that times a phase of the pipeline."""
+
+        def __init__(self, phase, service=""):
+            self.phase = phase
+            self.service = service
+
+        def __enter__(self):
+            self.start = time.perf_counter()
+            return self
+
+        def __exit__(self, *args):
+            metrics.observe(self.phase, self.service, time.perf_counter() - self.start)
+            return False
+
+    def observe(phase, service, seconds):
+        """Add a duration to the histogram of a phase.
+
+        Args:
+            phase (str): Name of the phase, e.g. 'scrape'.
+            service (str): Name of the service the phase ran on, may be empty.
+            seconds (float): Duration of the phase.
+        """
+        with metrics.lock:
+            key = (phase, str(service))
+            if not key in metrics.histograms:
+                metrics.histograms[key] = {'buckets': [0] * len(metrics.buckets), 'sum': 0.0, 'count': 0, 'max': 0.0}
+            histogram = metrics.histograms[key]
+            for i, bound in enumerate(metrics.buckets):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+            histogram['max'] = max(histogram['max'], seconds)
+
+    def count(event, service="", value=1):
+        """Increase the counter of an event.
+
+        Args:
+            event (str): Name of the event, e.g. 'releases'.
+            service (str): Name of the service the event belongs to, may be empty.
+            value (int): Amount to add.
+        """
+        with metrics.lock:
+            key = (event, str(service))
+            metrics.counters[key] = metrics.counters.get(key, 0) + value
+
+    def gauge(name, service="", value=0):
+        """Set the current value of a gauge, e.g. the depth of a queue."""
+        with metrics.lock:
+            metrics.gauges[(name, str(service))] = value
+
+    def labels(**labels):
+        escaped = []
+        for name, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            escaped += [name + '="' + value + '"']
+        return '{' + ','.join(escaped) + '}'
+
+    def export(directory):
+        """Write the metrics to plex_debrid_metrics.prom and plex_debrid_metrics.json.
+
+        Args:
+            directory (str): Directory to write the files to.
+        """
+        with metrics.lock:
+            histograms = copy.deepcopy(metrics.histograms)
+            counters = dict(metrics.counters)
+            gauges = dict(metrics.gauges)
+        lines = ['# HELP plex_debrid_phase_seconds Time spent in each phase of the download pipeline.',
+                 '# TYPE plex_debrid_phase_seconds histogram']
+        snapshot = {'updated': time.time(), 'phases': [], 'counters': [], 'gauges': []}
+        for (phase, service), histogram in sorted(histograms.items()):
+            for bound, count in zip(metrics.buckets, histogram['buckets']):
+                lines += ['plex_debrid_phase_seconds_bucket' + metrics.labels(phase=phase, service=service, le=bound) + ' ' + str(count)]
+            lines += ['plex_debrid_phase_seconds_bucket' + metrics.labels(phase=phase, service=service, le='+Inf') + ' ' + str(histogram['count'])]
+            lines += ['plex_debrid_phase_seconds_sum' + metrics.labels(phase=phase, service=service) + ' ' + str(round(histogram['sum'], 6))]
+            lines += ['plex_debrid_phase_seconds_count' + metrics.labels(phase=phase, service=service) + ' ' + str(histogram['count'])]
+            snapshot['phases'] += [{'phase': phase, 'service': service, 'count': histogram['count'], 'sum': histogram['sum'],
+                                    'mean': histogram['sum'] / histogram['count'], 'max': histogram['max'],
+                                    'buckets': dict(zip([str(bound) for bound in metrics.buckets], histogram['buckets']))}]
+        lines += ['# HELP plex_debrid_events_total Number of events in the download pipeline.',
+                  '# TYPE plex_debrid_events_total counter']
+        for (event, service), value in sorted(counters.items()):
+            lines += ['plex_debrid_events_total' + metrics.labels(event=event, service=service) + ' ' + str(value)]
+            snapshot['counters'] += [{'event': event, 'service': service, 'value': value}]
+        lines += ['# HELP plex_debrid_gauge Current values in the download pipeline, e.g. queue depths.',
+                  '# TYPE plex_debrid_gauge gauge']
+        for (name, service), value in sorted(gauges.items()):
+            lines += ['plex_debrid_gauge' + metrics.labels(name=name, service=service) + ' ' + str(value)]
+            snapshot['gauges'] += [{'name': name, 'service': service, 'value': value}]
+        try:
+            for filename, content in [('plex_debrid_metrics.prom', '\n'.join(lines) + '\n'), ('plex_debrid_metrics.json', json.dumps(snapshot, indent=4))]:
+                with open(directory + '/' + filename + '.tmp', 'w') as f:
+                    f.write(content)
+                os.replace(directory + '/' + filename + '.tmp', directory + '/' + filename)
+        except Exception as e:
+            logger.error(f"couldnt write metrics to {directory}: {e}")
+
+class namespace:
+    pass
+
+instance_dict = namespace.__dict__['__dict__']
+
+class helper:
+    # A function of view that is called on the class (view.loads(...)). On a view itself the json field of the same name
+    # is returned instead, so that the helpers dont hide fields like "wrap" or "loads".
+    def __init__(self, function):
+        self.function = function
+        self.name = function.__name__
+
+    def __get__(self, instance, owner):
+        if instance == None:
+            return self.function
+        return view.__getattr__(instance, self.name)
+
+class view(namespace):
+    """Attribute view of a decoded json object, built lazily.
+
+    Replaces json.loads(..., object_hook=lambda d: SimpleNamespace(**d)):
+    attribute access works the same (response.MediaContainer.Metadata), but
+    only the top level of an object is set up when it is decoded. Nested
+    objects and lists stay raw until they are first accessed, so the parts of
+    large payloads that are never read are never turned into objects. Reading
+    __dict__ (vars(), self.__dict__.update(...)) materializes the next level.
+    Json is decoded with orjson if it is installed.
+
+    Views may be read from several threads at once: a nested value is only
+    ever set up once, the raw value stays in place until the whole level is
+    materialized.
+    """
+
+    _imported = False
+
+    def __init__(self, data):
+        attributes = instance_dict.__get__(self)
+        lazy = {}
+        for key, value in data.items():
+            if isinstance(value, (dict, list)):
+                lazy[key] = value
+            else:
+                attributes[key] = value
+        if len(lazy) > 0:
+            attributes['_lazy'] = lazy
+
+    @helper
+    def loads(content):
+        """Decode json into attribute views.
+
+        Args:
+            content (str or bytes): The json document.
+
+        Returns:
+            view: The decoded document, lists of objects become lists of views.
+        """
+        if view.decoder() == None:
+            return view.wrap(json.loads(content))
+        return view.wrap(orjson.loads(content))
+
+    @helper
+    def decoder():
+        """Return the orjson module, or None if it isnt installed."""
+        global orjson
+        if not view._imported:
+            try:
+                import orjson
+            except ImportError:
+                orjson = None
+            view._imported = True
+        return orjson
+
+    @helper
+    def materialize(value):
+        """Set up all levels of a view (or a list of views) at once, so that reading it no longer changes it.
+
+        Returns:
+            The value itself.
+        """
+        if isinstance(value, view):
+            for item in value.__dict__.values():
+                view.materialize(item)
+        elif isinstance(value, list):
+            for item in value:
+                view.materialize(item)
+        return value
+
+    @helper
+    def wrap(value):
+        if isinstance(value, dict):
+            return view(value)
+        if isinstance(value, list):
+            return [view.wrap(item) for item in value]
+        return value
+
+    def __getattr__(self, name):
+        # only called for attributes that arent set up yet. the raw value is left in place, so that other threads that read
+        # the same attribute at the same time still find it. the first value that is set up wins.
+        attributes = instance_dict.__get__(self)
+        if name in attributes:
+            return attributes[name]
+        lazy = attributes.get('_lazy', None)
+        if lazy == None or not name in lazy:
+            if name in attributes:
+                return attributes[name]
+            raise AttributeError(name)
+        return attributes.setdefault(name, view.wrap(lazy[name]))
+
+    def __delattr__(self, name):
+        attributes = instance_dict.__get__(self)
+        lazy = attributes.get('_lazy', {})
+        if not name in lazy and not name in attributes:
+            raise AttributeError(name)
+        lazy.pop(name, None)
+        attributes.pop(name, None)
+        if '_lazy' in attributes and len(lazy) == 0:
+            del attributes['_lazy']
+
+    @property
+    def __dict__(self):
+        attributes = instance_dict.__get__(self)
+        lazy = attributes.get('_lazy', None)
+        if not lazy == None:
+            for key, value in list(lazy.items()):
+                if not key in attributes:
+                    attributes.setdefault(key, view.wrap(value))
+            attributes.pop('_lazy', None)
+        return attributes
+
+    def __eq__(self, other):
+        if not isinstance(other, view):
+            return NotImplemented
+        return self.__dict__ == other.__dict__
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'view(' + ', '.join(str(key) + '=' + repr(value) for key, value in self.__dict__.items()) + ')'
+
+class cancelled(requests.exceptions.RequestException):
+    """Raised for requests that are made after their cancellation token was cancelled."""
+
+class cancellation:
+    """Cooperative cancellation token with an optional wall clock budget.
+
+    Tokens form a tree: the root token is cancelled on shutdown, a cycle token
+    can carry a budget for a whole download cycle and an item token a budget for
+    a single media item. A token is cancelled if it, or one of its parents, was
+    cancelled or ran out of time. Using a token as a context manager makes it the
+    current token of the thread; every http request checks the current token and
+    is limited to its remaining time:
+
+        with cancellation(budget=600):
+            element.download()
+
+    Attributes:
+        item_budget (str): Time budget (in seconds) per media item, 0 for none.
+        cycle_budget (str): Time budget (in seconds) per download cycle, 0 for none.
+        root (cancellation): Token that is cancelled on shutdown.
+    """
+
+    item_budget = "0"
+    cycle_budget = "0"
+    root = None
+    local = threading.local()
+
+    def __init__(self, parent=None, budget=0):
+        """Create a new token.
+
+        Args:
+            parent (cancellation): Parent token, if any.
+            budget (float): Wall clock budget in seconds, 0 for none.
+        """
+        self.parent = parent
+        self.event = threading.Event()
+        self.deadline = None
+        try:
+            if float(budget) > 0:
+                self.deadline = time.time() + float(budget)
+        except:
+            self.deadline = None
+
+    def budget(setting):
+        """Parse a budget setting, returns 0 if the setting is not a number."""
+        try:
+            return max(0, float(setting))
+        except:
+            return 0
+
+    def current():
+        """Return the current token of this thread, or the root token."""
+        token = getattr(cancellation.local, 'token', None)
+        return token if not token == None else cancellation.root
+
+    def cancel(self):
+        self.event.set()
+
+    def cancelled(self):
+        if self.event.is_set():
+            return True
+        if not self.deadline == None and time.time() >= self.deadline:
+            return True
+        if not self.parent == None:
+            return self.parent.cancelled()
+        return False
+
+    def remaining(self):
+        """Return the remaining time (in seconds) of this token and its parents, or None."""
+        remaining = None
+        if not self.deadline == None:
+            remaining = max(0, self.deadline - time.time())
+        if not self.parent == None:
+            parent = self.parent.remaining()
+            if not parent == None and (remaining == None or parent < remaining):
+                remaining = parent
+        return remaining
+
+    def check(self):
+        """Raise cancelled if this token was cancelled."""
+        if self.cancelled():
+            raise cancelled("request cancelled")
+
+    def wait(self, seconds):
+        """Sleep for the given time, unless the token is cancelled first.
+
+        Returns:
+            bool: True if the token was cancelled.
+        """
+        end = time.time() + seconds
+        while not self.cancelled():
+            left = end - time.time()
+            if left <= 0:
+                return False
+            self.event.wait(min(left, 0.5))
+        return True
+
+    def __enter__(self):
+        # the tokens that were current before are kept per thread, since worker threads enter the same token at the same time
+        if not hasattr(cancellation.local, 'previous'):
+            cancellation.local.previous = []
+        cancellation.local.previous.append(getattr(cancellation.local, 'token', None))
+        cancellation.local.token = self
+        return self
+
+    def __exit__(self, *args):
+        cancellation.local.token = cancellation.local.previous.pop()
+        return False
+
+cancellation.root = cancellation()
+
+class aio:
+    """Asyncio networking backend for scrapers and debrid checks.
+
+    All coroutines run on one event loop in a background thread, so hundreds of
+    requests can be in flight without a thread per request. Synchronous code
+    calls into it through aio.run(), which blocks until the coroutine is done -
+    media.download and the rest of the pipeline stay synchronous. Requests made
+    with aio.fetch() honor the rate limiter, the cancellation token of the
+    calling thread and the metrics just like requests made through transport().
+    The backend needs aiohttp and is not used while http traffic is recorded or
+    replayed; services then fall back to their synchronous code.
+
+    Attributes:
+        enabled (str): 'true' to use the async backend if aiohttp is installed.
+        connections (str): Maximum number of open connections of the async backend.
+        token (ContextVar): Cancellation token of the running coroutine, set up by start().
+    """
+
+    enabled = "true"
+    connections = "100"
+    imported = False
+    loop = None
+    session = None
+    semaphores = {}
+    lock = threading.Lock()
+    token = None
+
+    class response:
+        """Response of aio.fetch(), with the attributes of requests' responses that the services use."""
+
+        def __init__(self, status_code, headers, content, url):
+            self.status_code = status_code
+            self.headers = headers
+            self.content = content
+            self.url = url
+
+        @property
+        def text(self):
+            return self.content.decode('utf-8', errors='replace')
+
+        def json(self):
+            return json.loads(self.content)
+
+    def available():
+        global aiohttp
+        if not aio.enabled == "true" or not recorder.mode == "":
+            return False
+        if not aio.imported:
+            try:
+                import aiohttp
+            except ImportError:
+                aiohttp = None
+            aio.imported = True
+        return not aiohttp == None
+
+    def start():
+        global asyncio
+        with aio.lock:
+            if aio.loop == None:
+                import asyncio
+                import contextvars
+                aio.token = contextvars.ContextVar('token', default=None)
+                aio.loop = asyncio.new_event_loop()
+                Thread(target=aio.loop.run_forever, daemon=True).start()
+        return aio.loop
+
+    def run(coroutine):
+        """Run a coroutine on the event loop and wait for its result.
+
+        The coroutine runs under the cancellation token of the calling thread.
+        """
+        return aio.submit(coroutine).result()
+
+    def submit(coroutine):
+        """Start a coroutine on the event loop without waiting for it.
+
+        The coroutine runs under the cancellation token of the calling thread.
+
+        Returns:
+            concurrent.futures.Future: The future of the coroutine's result.
+        """
+        token = cancellation.current()
+
+        async def scoped():
+            aio.token.set(token)
+            return await coroutine
+
+        loop = aio.start()
+        return asyncio.run_coroutine_threadsafe(scoped(), loop)
+
+    def current():
+        token = None if aio.token == None else aio.token.get()
+        return token if not token == None else cancellation.root
+
+    def slot(category, name=""):
+        """Return the asyncio semaphore that caps the coroutines of a service, sized like concurrency()."""
+        try:
+            cap = max(1, int(getattr(concurrency, category)))
+        except:
+            cap = 1
+        key = (category, name, cap)
+        if not key in aio.semaphores:
+            aio.semaphores[key] = asyncio.Semaphore(cap)
+        return aio.semaphores[key]
+
+    async def call(function, *args):
+        """Run a synchronous function in a worker thread of the event loop."""
+        token = aio.current()
+
+        def scoped():
+            with token:
+                return function(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(None, scoped)
+
+    async def fetch(url, method='GET', headers=None, data=None, timeout=None, allow_redirects=True, name=""):
+        """Make a request on the event loop.
+
+        Raises requests' Timeout and ConnectionError exceptions, so that callers
+        can handle errors the same way for both backends. Requests of a named
+        service pass through its circuit breaker, like requests of its client.
+
+        Returns:
+            aio.response: The response.
+        """
+        token = aio.current()
+        token.check()
+        if name == "":
+            return await aio.send(url, method, headers, data, timeout, allow_redirects)
+        service = breaker.get(name)
+        service.check()
+        try:
+            response = await aio.send(url, method, headers, data, timeout, allow_redirects)
+        except cancelled:
+            service.release()
+            raise
+        except requests.RequestException as e:
+            service.error(e, token)
+            raise
+        except:
+            service.release()
+            raise
+        service.record(response)
+        return response
+
+    async def send(url, method, headers, data, timeout, allow_redirects):
+        token = aio.current()
+        wait = limiter.delay(url, method)
+        if wait > 0:
+            await asyncio.sleep(wait)
+            token.check()
+        if timeout == None:
+            try:
+                timeout = float(client.timeout)
+            except:
+                timeout = 60
+        remaining = token.remaining()
+        budget = not remaining == None and remaining < timeout
+        if budget:
+            timeout = remaining
+        if aio.session == None:
+            try:
+                connections = max(1, int(aio.connections))
+            except:
+                connections = 100
+            aio.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=connections))
+        host = limiter.host(url)
+        metrics.count('requests', host)
+        try:
+            with metrics.timer('http', host):
+                async with aio.session.request(method, url, headers=headers, data=data, allow_redirects=allow_redirects, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                    response = aio.response(response.status, response.headers, await response.read(), str(response.url))
+        except asyncio.TimeoutError as e:
+            error = requests.exceptions.Timeout(str(e))
+            # timeouts that were shortened to the remaining time budget dont count against the service
+            error.budget = budget
+            raise error
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.ConnectionError(str(e))
+        pause = backoff.pause(response)
+        if not pause == None and pause > 0:
+            limiter.hold(url, min(pause, 3600))
+        return response
+
+http_send = requests.adapters.HTTPAdapter.send
+
+def transport(adapter, request, **kwargs):
+    # every request passes through here: requests wait for the rate limiter (and rate limit headers) of their host, are cancelled and
+    # limited to the remaining time of the current cancellation token, timed per host, and recorded or replayed if the recorder is running.
+    token = cancellation.current()
+    token.check()
+    if not (recorder.mode == 'replay' and recorder.latency == 'zero'):
+        if not limiter.acquire(request.url, request.method):
+            token.check()
+    remaining = token.remaining()
+    budget = False
+    if not remaining == None:
+        timeout = kwargs.get('timeout', None)
+        if isinstance(timeout, tuple):
+            budget = any(t == None or remaining < t for t in timeout)
+            kwargs['timeout'] = tuple(remaining if t == None else min(t, remaining) for t in timeout)
+        else:
+            budget = timeout == None or remaining < timeout
+            kwargs['timeout'] = remaining if timeout == None else min(timeout, remaining)
+    host = limiter.host(request.url)
+    metrics.count('requests', host)
+    if recorder.mode == 'replay':
+        with metrics.timer('http', host):
+            return recorder.replay(request)
+    try:
+        with metrics.timer('http', host):
+            if recorder.mode == 'record':
+                response = recorder.record(adapter, request, **kwargs)
+            else:
+                response = http_send(adapter, request, **kwargs)
+    except requests.exceptions.RequestException as e:
+        # requests that failed because their timeout was shortened to the remaining time budget dont count against the service
+        e.budget = budget
+        raise
+    # services that report an exhausted rate limit are not contacted again until the limit resets
+    pause = backoff.pause(response)
+    if not pause == None and pause > 0:
+        limiter.hold(request.url, min(pause, 3600))
+    return response
+
+class adapter(requests.adapters.HTTPAdapter):
+    # transport adapter of the client sessions, only requests made through a client go through transport()
+    send = transport
@@ -1,2 +1,3 @@
 from content import services
-from content import classes
\ No newline at end of file
+from content import classes
+from content import schedule
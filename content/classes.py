@@ -5,7 +5,13 @@ import debrid
 import scraper
 from ui.ui_print import *
 
-imdb_scraped = False
+# download state of the media item that this thread works on. kept per thread, so that parallel download workers dont
+# reset each others imdb id fallback scrape.
+class thread_local(threading.local):
+    def __init__(self):
+        self.imdb_scraped = False
+
+local = thread_local()
 
 
 class watchlist(Sequence):
@@ -30,6 +36,35 @@ class watchlist(Sequence):
     def add(self, item, user):
         self.data.append(item)
 
+class delta:
+    # The changes of a watchlist since its last update: media items that were added, removed or whose
+    # metadata changed. A delta is true if it contains any change, pending() if it contains media items
+    # that need to be checked.
+    def __init__(self, added=None, removed=None, changed=None):
+        self.added = [] if added == None else added
+        self.removed = [] if removed == None else removed
+        self.changed = [] if changed == None else changed
+
+    def __bool__(self):
+        return len(self.added) > 0 or len(self.removed) > 0 or len(self.changed) > 0
+
+    def pending(self):
+        return len(self.added) > 0 or len(self.changed) > 0
+
+    def modified(element, entry):
+        # true if a fresh watchlist entry of a known media item carries different metadata than the last time it was seen,
+        # e.g. a new season of a show. the first time an entry is seen its metadata is only recorded.
+        state = {}
+        for key in ['updatedAt', 'updated_at', 'leafCount', 'aired_episodes']:
+            if hasattr(entry, key):
+                state[key] = getattr(entry, key)
+        previous = getattr(element, 'polled', None)
+        element.polled = state
+        return not previous == None and not previous == state
+
+    def __add__(self, other):
+        return delta(self.added + other.added, self.removed + other.removed, self.changed + other.changed)
+
 
 class library:
 
@@ -264,10 +299,207 @@ class map:
                     return map.anidb.titles[EID]
 
 
+def identity(element):
+    # identity keys of a media item: one key per external id and one for its guid. two media items
+    # that are equal always share at least one of these keys.
+    keys = []
+    try:
+        if element.type in ['movie', 'show']:
+            if hasattr(element, "EID"):
+                keys += [(element.type, EID) for EID in element.EID]
+            if hasattr(element, "guid"):
+                keys += [(element.type, str(element.guid))]
+        elif element.type == 'season':
+            if hasattr(element, "parentEID"):
+                keys += [(element.type, EID, element.index) for EID in element.parentEID]
+            if hasattr(element, "parentGuid"):
+                keys += [(element.type, str(element.parentGuid), element.index)]
+        elif element.type == 'episode':
+            if hasattr(element, "grandparentEID"):
+                keys += [(element.type, EID, element.parentIndex, element.index) for EID in element.grandparentEID]
+            if hasattr(element, "grandparentGuid"):
+                keys += [(element.type, str(element.grandparentGuid), element.parentIndex, element.index)]
+    except:
+        keys = []
+    if keys == []:
+        keys = [('id', id(element))]
+    return keys
+
+class catalog:
+    # An index of media items by their identity keys. Membership checks and lookups only compare
+    # against the items that share a key, instead of every item. Items can carry a value.
+    def __init__(self, items=[]):
+        self.index = {}
+        self.entries = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter([entry[0] for entry in list(self.entries.values())])
+
+    def __contains__(self, item):
+        return not self.find(item) == None
+
+    def find(self, item):
+        for key in identity(item):
+            for entry in self.index.get(key, []):
+                if entry[0] is item or item == entry[0]:
+                    return entry
+        return None
+
+    def get(self, item, default=None):
+        entry = self.find(item)
+        if entry == None:
+            return default
+        return entry[0]
+
+    def value(self, item, default=None):
+        entry = self.find(item)
+        if entry == None:
+            return default
+        return entry[1]
+
+    def add(self, item, value=None):
+        # add an item, replacing an equal item that is already in the catalog
+        self.pop(item)
+        entry = [item, value, identity(item)]
+        self.entries[id(entry)] = entry
+        for key in entry[2]:
+            self.index.setdefault(key, []).append(entry)
+
+    def pop(self, item, default=None):
+        entry = self.find(item)
+        if entry == None:
+            return default
+        del self.entries[id(entry)]
+        for key in entry[2]:
+            if key in self.index:
+                self.index[key] = [x for x in self.index[key] if not x is entry]
+                if self.index[key] == []:
+                    del self.index[key]
+        return entry[1]
+
+
+class snapshot(list):
+    # A library list, indexed by the identity keys of its movies and shows, their seasons and their
+    # episodes, so that looking up a media item in the library doesnt walk through the entire library.
+    # A snapshot shouldnt be modified after it was created.
+    last = None
+
+    def __init__(self, items=[]):
+        super().__init__(items)
+        self.items = catalog()
+        self.seasons = catalog()
+        self.episodes = catalog()
+        for item in self:
+            if not item in self.items:
+                self.items.add(item)
+            if not getattr(item, 'type', None) == 'show' or not hasattr(item, 'Seasons'):
+                continue
+            for season in item.Seasons:
+                if not season in self.seasons:
+                    self.seasons.add(season)
+                for episode in getattr(season, 'Episodes', []):
+                    if not episode in self.episodes:
+                        self.episodes.add(episode)
+            if not hasattr(item, 'leafCount'):
+                item.leafCount = sum(len(getattr(season, 'Episodes', [])) for season in item.Seasons)
+
+    def __reduce__(self):
+        # pickle and copy the items only, the indices are rebuilt
+        return (snapshot, (list(self),))
+
+    def __contains__(self, element):
+        return not self.get(element) == None
+
+    def get(self, element):
+        # the library item that matches a media item, or None
+        if getattr(element, 'type', None) == 'season':
+            return self.seasons.get(element)
+        if getattr(element, 'type', None) == 'episode':
+            return self.episodes.get(element)
+        return self.items.get(element)
+
+    def of(items):
+        # the snapshot of a library list. snapshots of plain lists are cached for the last list.
+        if isinstance(items, snapshot):
+            return items
+        last = snapshot.last
+        if not last == None and last[0] is items and last[1] == len(items):
+            return last[2]
+        new = snapshot(items)
+        snapshot.last = (items, len(items), new)
+        return new
+
+
+class calendar:
+    # Release calendar of unreleased media items. Items are parked until their computed release time,
+    # so that their availability isnt re-evaluated (and no api calls are made) before they are released.
+    dates = {}
+    loaded = False
+    changed = False
+    lock = threading.Lock()
+
+    def load():
+        with calendar.lock:
+            if calendar.loaded:
+                return
+            calendar.loaded = True
+            dates = store.load('content', 'calendar')
+            if isinstance(dates, dict):
+                calendar.dates = dates
+
+    def save():
+        with calendar.lock:
+            if not calendar.changed:
+                return
+            now = time.time()
+            calendar.dates = {key: date for key, date in calendar.dates.items() if date[0] > now}
+            calendar.changed = False
+            dates = dict(calendar.dates)
+        store.save(dates, 'content', 'calendar', ui_settings.debug)
+
+    def keys(element):
+        return [key for key in identity(element) if not key[0] == 'id']
+
+    def park(element, release):
+        # park a media item until its release (a utc datetime). the release date of the item is stored
+        # as well, so that the item is woken up right away if its metadata changes.
+        calendar.load()
+        release = release.replace(tzinfo=datetime.timezone.utc).timestamp()
+        if release <= time.time():
+            return
+        date = getattr(element, 'originallyAvailableAt', None)
+        with calendar.lock:
+            for key in calendar.keys(element):
+                calendar.dates[key] = (release, date)
+                calendar.changed = True
+
+    def check(element):
+        # returns the release time of a parked media item, or None if the item isnt parked
+        calendar.load()
+        date = getattr(element, 'originallyAvailableAt', None)
+        now = time.time()
+        with calendar.lock:
+            for key in calendar.keys(element):
+                if key in calendar.dates:
+                    release, parked = calendar.dates[key]
+                    if release > now and parked == date:
+                        return release
+                    del calendar.dates[key]
+                    calendar.changed = True
+        return None
+
+
 class media:
 
-    ignore_queue = []
-    downloaded_versions = []
+    # run state, persisted across restarts. downloaded versions that still arent in the library a day later are
+    # forgotten on the next start, so that they can be downloaded again.
+    ignore_queue = store.journal('content', 'ignore_queue', index=catalog)
+    downloaded_versions = store.journal('content', 'downloaded_versions', expiry=86400)
 
     def __init__(self, other):
         self.__dict__.update(other.__dict__)
@@ -304,6 +536,10 @@ class media:
         except:
             return False
 
+    # equal media items only need to share one of their external ids, so there is no hash that agrees with __eq__.
+    # media items cant be put in sets or used as dict keys, use a catalog to look them up by their identity keys.
+    __hash__ = None
+
     def match(self, service):
         if not hasattr(self, "services"):
             self.services = [self.__module__]
@@ -709,7 +945,7 @@ class media:
                     version[0], version[1], version[2], version[3])]
         # update media items ignore count
         if self in media.ignore_queue:
-            match = next((x for x in media.ignore_queue if self == x), None)
+            match = media.ignore_queue.get(self)
             self.ignored_count = match.ignored_count
         # remove versions that dont apply
         for version in versions[:]:
@@ -824,7 +1060,7 @@ class media:
     def version_missing(self):
         all_versions = []
         if self in media.ignore_queue:
-            match = next((x for x in media.ignore_queue if self == x), None)
+            match = media.ignore_queue.get(self)
             self.ignored_count = match.ignored_count
         for version in releases.sort.versions:
             if not '\u0336' in version[0]:
@@ -849,40 +1085,17 @@ class media:
             for episode in self.Episodes:
                 episode.set_file_names()
         if self.type in ["episode", "movie"]:
-            for element in plex.current_library:
-                if self.type == "movie":
-                    if self == element:
-                        try:
-                            for Media in element.Media:
-                                res = "2160" if Media.videoResolution == "4k" else Media.videoResolution
-                                for Part in Media.Part:
-                                    self.existing_releases += [
-                                        "(" + res + "p) " + Part.file]
-                            return
-                        except Exception as e:
-                            ui_print("error: (file name exception): " +
-                                     self.query() + " " + str(e), ui_settings.debug)
-                            return
-                elif self.type == "episode":
-                    if element.type == "show":
-                        if any(eid in self.grandparentEID for eid in element.EID):
-                            for season in element.Seasons:
-                                if not hasattr(season, "index"):
-                                    continue
-                                if self.parentIndex == season.index:
-                                    for episode in season.Episodes:
-                                        if self == episode:
-                                            try:
-                                                for Media in episode.Media:
-                                                    res = "2160" if Media.videoResolution == "4k" else Media.videoResolution
-                                                    for Part in Media.Part:
-                                                        self.existing_releases += [
-                                                            "(" + res + "p) " + Part.file]
-                                                return
-                                            except Exception as e:
-                                                ui_print(
-                                                    "error: (file name exception): " + self.query() + " " + str(e), ui_settings.debug)
-                                                return
+            element = snapshot.of(plex.current_library).get(self)
+            if not element == None:
+                try:
+                    for Media in element.Media:
+                        res = "2160" if Media.videoResolution == "4k" else Media.videoResolution
+                        for Part in Media.Part:
+                            self.existing_releases += [
+                                "(" + res + "p) " + Part.file]
+                except Exception as e:
+                    ui_print("error: (file name exception): " +
+                             self.query() + " " + str(e), ui_settings.debug)
 
     def complete(self, list):
         if self.type in ['movie', 'episode']:
@@ -914,8 +1127,7 @@ class media:
         return False
 
     def watch(self):
-        global imdb_scraped
-        imdb_scraped = False
+        local.imdb_scraped = False
         names = []
         retries = 0
         for version in self.versions():
@@ -926,20 +1138,23 @@ class media:
                         retries = int(float(trigger[2]))
         if retries == 0:
             return
-        if not self in media.ignore_queue:
-            self.ignored_count = 1
-            media.ignore_queue += [self]
-            ui_print('retrying download in 30min for item: ' + self.query() + ' - version/s [' + '],['.join(
-                names) + '] - attempt ' + str(self.ignored_count) + '/' + str(retries))
-        else:
-            match = next((x for x in media.ignore_queue if self == x), None)
-            if match.ignored_count < retries:
-                match.ignored_count += 1
+        # parallel download workers can retry the same item (e.g. a show and one of its episodes) at the same time
+        with media.ignore_queue.lock:
+            if not self in media.ignore_queue:
+                self.ignored_count = 1
+                media.ignore_queue += [self]
                 ui_print('retrying download in 30min for item: ' + self.query() + ' - version/s [' + '],['.join(
-                    names) + '] - attempt ' + str(match.ignored_count) + '/' + str(retries))
+                    names) + '] - attempt ' + str(self.ignored_count) + '/' + str(retries))
             else:
-                media.ignore_queue.remove(match)
-                ignore.add(self)
+                match = media.ignore_queue.get(self)
+                if match.ignored_count < retries:
+                    match.ignored_count += 1
+                    media.ignore_queue.update(match)
+                    ui_print('retrying download in 30min for item: ' + self.query() + ' - version/s [' + '],['.join(
+                        names) + '] - attempt ' + str(match.ignored_count) + '/' + str(retries))
+                else:
+                    media.ignore_queue.remove(match)
+                    ignore.add(self)
 
     def unwatch(self):
         ignore.remove(self)
@@ -947,24 +1162,45 @@ class media:
     def watched(self):
         return ignore.check(self)
 
+    def aired(self):
+        # release date of the media item, for shows and seasons the release date of their newest episode
+        elements = [self] + getattr(self, 'Episodes', [])
+        for season in getattr(self, 'Seasons', []):
+            elements += [season] + getattr(season, 'Episodes', [])
+        newest = None
+        for element in elements:
+            try:
+                date = datetime.datetime.strptime(element.originallyAvailableAt, '%Y-%m-%d')
+            except:
+                continue
+            if newest == None or date > newest:
+                newest = date
+        return newest
+
     def released(self):
+        # parked items are unreleased until their release time has passed
+        if not calendar.check(self) == None:
+            return False
         try:
-            released = datetime.datetime.utcnow(
-            ) - datetime.datetime.strptime(self.originallyAvailableAt, '%Y-%m-%d')
+            release = datetime.datetime.strptime(self.originallyAvailableAt, '%Y-%m-%d')
             if hasattr(self, "offset_airtime"):
                 smallest_offset = 0
                 for offset in self.offset_airtime:
                     if float(offset) < smallest_offset or smallest_offset == 0:
                         smallest_offset = float(offset)
-                released = datetime.datetime.utcnow() - datetime.datetime.strptime(self.originallyAvailableAt,
-                                                                                   '%Y-%m-%d') - datetime.timedelta(hours=float(smallest_offset))
+                release = release + datetime.timedelta(hours=float(smallest_offset))
+            released = datetime.datetime.utcnow() - release
             if self.type == 'movie':
                 if released.days >= -30 and released.days <= 180:
                     return self.available()
+                if released.days < -30:
+                    calendar.park(self, release - datetime.timedelta(days=30))
                 return released.days > 0
             else:
                 if released.days >= -1 and released.days <= 1:
                     return self.available()
+                if released.days < -1:
+                    calendar.park(self, release - datetime.timedelta(days=1))
                 return released.days >= 0
         except Exception as e:
             ui_print("media error: (released exception): " +
@@ -985,8 +1221,13 @@ class media:
                         for offset in self.offset_airtime:
                             if datetime.datetime.utcnow() > self.offset_airtime[offset]:
                                 return True
+                        if len(self.offset_airtime) > 0:
+                            calendar.park(self, min(self.offset_airtime.values()))
                         return False
-                    return datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z')
+                    if datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z'):
+                        return True
+                    calendar.park(self, datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z'))
+                    return False
                 elif self.type == 'movie':
                     release_date = None
                     releases, header = trakt.get(
@@ -1020,6 +1261,14 @@ class media:
                         ui_print("item: '" + self.query() +
                                  "' seems to be released prior to its official release date and will be downloaded.")
                         return True
+                    # park the movie until its release. early releases are only noticed by checking trakt, so
+                    # in that case the movie is checked again after a day at the latest.
+                    release = datetime.datetime.strptime(release_date, '%Y-%m-%d')
+                    if hasattr(self, "offset_airtime") and len(self.offset_airtime) > 0:
+                        release = min(release + datetime.timedelta(hours=float(offset)) for offset in self.offset_airtime)
+                    if trakt.early_releases == "true":
+                        release = min(release, datetime.datetime.utcnow() + datetime.timedelta(days=1))
+                    calendar.park(self, release)
                     if hasattr(self, "offset_airtime"):
                         for offset in self.offset_airtime:
                             if datetime.datetime.utcnow() > (datetime.datetime.strptime(release_date, '%Y-%m-%d') + datetime.timedelta(hours=float(offset))):
@@ -1041,8 +1290,12 @@ class media:
                             for offset in self.offset_airtime:
                                 if datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z') + datetime.timedelta(hours=float(offset)):
                                     return True
+                            calendar.park(self, min(datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z') + datetime.timedelta(hours=float(offset)) for offset in self.offset_airtime))
                             return False
-                        return datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z')
+                        if datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z'):
+                            return True
+                        calendar.park(self, datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z'))
+                        return False
                     except:
                         return True
                 elif self.type == 'episode':
@@ -1050,6 +1303,9 @@ class media:
                         for offset in self.offset_airtime:
                             if datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z') + datetime.timedelta(hours=float(offset)):
                                 return True
+                        if len(self.offset_airtime) > 0:
+                            calendar.park(self, min(datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z') + datetime.timedelta(hours=float(offset)) for offset in self.offset_airtime))
+                        for offset in self.offset_airtime:
                             available = datetime.datetime.strptime(
                                 self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z') + datetime.timedelta(hours=float(offset)) - datetime.datetime.utcnow()
                             ui_print("item: '" + self.query() + "' is available in: " + "{:02d}d:{:02d}h:{:02d}m:{:02d}s".format(available.days, available.seconds // 3600, (
@@ -1057,6 +1313,7 @@ class media:
                         return False
                     if datetime.datetime.utcnow() > datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z'):
                         return True
+                    calendar.park(self, datetime.datetime.strptime(self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z'))
                     available = datetime.datetime.strptime(
                         self.first_aired, '%Y-%m-%dT%H:%M:%S.000Z') - datetime.datetime.utcnow()
                     ui_print("item: '" + self.query() + "' is available in: " + "{:02d}d:{:02d}h:{:02d}m:{:02d}s".format(
@@ -1070,6 +1327,7 @@ class media:
             released = datetime.datetime.utcnow(
             ) - datetime.datetime.strptime(self.originallyAvailableAt, '%Y-%m-%d')
             if released.days < 0:
+                calendar.park(self, datetime.datetime.strptime(self.originallyAvailableAt, '%Y-%m-%d'))
                 return False
             return True
         except:
@@ -1093,33 +1351,25 @@ class media:
                     "error: library update service could not be determined", ui_settings.debug)
 
     def collected(self, list):
+        list = snapshot.of(list)
         if self.type in ["movie", "show"]:
-            if self in list:
+            match = list.get(self)
+            if not match == None:
                 if self.type == "movie":
                     return True
-                match = next((x for x in list if x == self), None)
                 if not hasattr(match, 'leafCount'):
                     return False
                 if match.leafCount == self.leafCount:
                     return True
             return False
         if self.type == "season":
-            for show in list:
-                if show.type == "show":
-                    for season in show.Seasons:
-                        if self == season:
-                            if season.leafCount == self.leafCount:
-                                return True
-                            return False
+            match = list.get(self)
+            if not match == None:
+                if match.leafCount == self.leafCount:
+                    return True
             return False
         if self.type == "episode":
-            for show in list:
-                if show.type == "show":
-                    for season in show.Seasons:
-                        for episode in season.Episodes:
-                            if self == episode:
-                                return True
-            return False
+            return not list.get(self) == None
 
     def uncollected(self, list):
         if self.type == 'movie':
@@ -1157,7 +1407,6 @@ class media:
         return False
 
     def download(self, retries=0, library=[], parentReleases=[]):
-        global imdb_scraped
         refresh_ = False
         i = 0
         self.Releases = []
@@ -1168,7 +1417,6 @@ class media:
     scraper
    
     def download(self, retries=0, library=[], parentReleases=[]):
-        global imdb_scraped
         refresh_ = False
         i = 0
         self.Releases = []
@@ -1176,7 +1424,9 @@ class media:
             ui_print(
                 "error: media item has no title or release year. This unknown movie/show might not be released yet.")
             return
-        scraper.services.overwrite = []
+        scraper.services.local.overwrite = []
+        scraper.cache.released(self.aired())
+        scraper.stream.watch(self)
         EIDS = []
         imdbID = "."
         if hasattr(self, "EID"):
@@ -1204,17 +1454,17 @@ class media:
                             self.aliases(version.lang)
                             langs += [version.lang]
                     self.aliases('en')
-                    imdb_scraped = False
+                    local.imdb_scraped = False
                     for year in alternate_years:
                         i = 0
                         while len(self.Releases) == 0 and i <= retries:
                             for k, title in enumerate(self.alternate_titles):
                                 self.Releases += scraper.scrape(self.query(title).replace(
                                     str(self.year), str(year)), self.deviation(year=str(year))+"("+imdbID+")?")
-                                if len(self.Releases) < 20 and k == 0 and not imdb_scraped and not imdbID == ".":
+                                if len(self.Releases) < 20 and k == 0 and not local.imdb_scraped and not imdbID == ".":
                                     self.Releases += scraper.scrape(
                                         imdbID, "(.*|"+imdbID+")")
-                                    imdb_scraped = True
+                                    local.imdb_scraped = True
                                 if len(self.Releases) > 0:
                                     break
                             i += 1
@@ -1244,27 +1494,27 @@ class media:
                             self.aliases(version.lang)
                             langs += [version.lang]
                     self.aliases('en')
-                    imdb_scraped = False
+                    local.imdb_scraped = False
                     # if there is more than one uncollected season
                     if len(self.Seasons) > 1:
                         if self.isanime():
                             for k, title in enumerate(self.alternate_titles[:3]):
                                 self.Releases += scraper.scrape(self.anime_query(title), self.deviation(
                                 ) + "("+imdbID+")?(nyaa"+"|".join(self.alternate_titles)+")?")
-                                if len(self.Releases) < 20 and k == 0 and not imdb_scraped and not imdbID == ".":
+                                if len(self.Releases) < 20 and k == 0 and not local.imdb_scraped and not imdbID == ".":
                                     self.Releases += scraper.scrape(
                                         imdbID, "(.*|S00|"+imdbID+"|nyaa"+"|".join(self.alternate_titles)+")")
-                                    imdb_scraped = True
+                                    local.imdb_scraped = True
                                 if len(self.Releases) > 0:
                                     break
                         else:
                             for k, title in enumerate(self.alternate_titles[:3]):
                                 self.Releases += scraper.scrape(self.query(
                                     title), self.deviation() + "("+imdbID+")?")
-                                if len(self.Releases) < 20 and k == 0 and not imdb_scraped and not imdbID == ".":
+                                if len(self.Releases) < 20 and k == 0 and not local.imdb_scraped and not imdbID == ".":
                                     self.Releases += scraper.scrape(
                                         imdbID, "(.*|S00|"+imdbID+")")
-                                    imdb_scraped = True
+                                    local.imdb_scraped = True
                                 if len(self.Releases) > 0:
                                     break
                         debrid.check(self)
@@ -1387,20 +1637,20 @@ class media:
                         for k, title in enumerate(self.alternate_titles[:3]):
                             self.Releases += scraper.scrape(self.anime_query(title), "(.*|S"+str(
                                 "{:02d}".format(self.index))+"|"+imdbID+"|nyaa"+"|".join(self.alternate_titles)+")")
-                            if len(self.Releases) < 20 and k == 0 and not imdb_scraped and not imdbID == ".":
+                            if len(self.Releases) < 20 and k == 0 and not local.imdb_scraped and not imdbID == ".":
                                 self.Releases += scraper.scrape(imdbID, "(.*|S"+str("{:02d}".format(
                                     self.index))+"|"+imdbID+"|nyaa"+"|".join(self.alternate_titles)+")")
-                                imdb_scraped = True
+                                local.imdb_scraped = True
                             if len(self.Releases) > 0:
                                 break
                     if len(self.Releases) == 0:
                         for k, title in enumerate(self.alternate_titles[:3]):
                             self.Releases += scraper.scrape(self.query(
                                 title)[:-1], "(.*|S"+str("{:02d}".format(self.index))+"|"+imdbID+")")
-                            if len(self.Releases) < 20 and k == 0 and not imdb_scraped and not imdbID == ".":
+                            if len(self.Releases) < 20 and k == 0 and not local.imdb_scraped and not imdbID == ".":
                                 self.Releases += scraper.scrape(
                                     imdbID, "(.*|S"+str("{:02d}".format(self.index))+"|"+imdbID+")")
-                                imdb_scraped = True
+                                local.imdb_scraped = True
                             if len(self.Releases) > 0:
                                 break
                     # Set the episodes parent releases to be the newly scraped releases
@@ -1426,7 +1676,8 @@ class media:
                             if rule[0] == "bitrate":
                                 version.rules.remove(rule)
                         test_releases = copy.deepcopy(scraped_releases)
-                        releases.sort(test_releases, version, False)
+                        with metrics.timer('sort', version.name):
+                            releases.sort(test_releases, version, False)
                         if len(test_releases) > 0:
                             attempt_episodes = True
                             break
@@ -1480,8 +1731,7 @@ class media:
         self.collect(refresh_)
 
     def downloaded(self):
-        global imdb_scraped
-        imdb_scraped = False
+        local.imdb_scraped = False
         if self.type == "movie" or self.type == "episode":
             media.downloaded_versions += [self.query() +
                                           ' [' + self.version.name + ']']
@@ -1516,6 +1766,28 @@ class media:
                     episode.version = self.version
                     episode.downloaded()
 
+    def sufficient(self, scraped_releases, count):
+        # true once at least count of the scraped releases are cached and pass the requirements of every version. releases
+        # that are checked here arent checked again when they are downloaded.
+        if len(self.versions()) == 0:
+            return False
+        Releases = self.Releases
+        try:
+            self.Releases = list(scraped_releases)
+            debrid.check(self)
+            self.bitrate()
+            cached = [release for release in self.Releases if len(release.cached) > 0]
+        finally:
+            self.Releases = Releases
+        if len(cached) < count:
+            return False
+        for version in self.versions():
+            candidates = copy.deepcopy(cached)
+            releases.sort(candidates, version, False)
+            if len(candidates) < count:
+                return False
+        return True
+
     def debrid_download(self, force=False):
         debrid.check(self)
         self.bitrate()
@@ -1534,7 +1806,8 @@ class media:
                         debrid_uncached = False
                 self.version = version
                 self.Releases = copy.deepcopy(scraped_releases)
-                releases.sort(self.Releases, self.version)
+                with metrics.timer('sort', self.version.name):
+                    releases.sort(self.Releases, self.version)
                 if len(self.Releases) > 0:
                     releases.print_releases(self.Releases, True)
                 ver_dld = False
@@ -0,0 +1,177 @@
+from base import *
+#import parent modules
+from content import classes
+from ui.ui_print import *
+
+# Interval (in seconds) after which a media item is checked again, if it isnt waiting for a retry or release
+interval = "1800"
+# Media items that couldnt be downloaded are retried after 30 minutes
+retry = 1800
+
+def seconds():
+    try:
+        return float(interval)
+    except:
+        ui_print("error: the media recheck interval setting is not a number! using the default of 1800 seconds.")
+        return 1800
+
+def pending(element):
+    # true if the media item or one of its seasons/episodes is waiting for a retry
+    if element in classes.media.ignore_queue:
+        return True
+    if element.type == "show" and hasattr(element, "Seasons"):
+        for season in element.Seasons:
+            if season in classes.media.ignore_queue:
+                return True
+            for episode in season.Episodes:
+                if episode in classes.media.ignore_queue:
+                    return True
+    return False
+
+def release(element):
+    # timestamp of the media items release, if it lies in the future. items that were parked in the
+    # release calendar are due at their computed release time.
+    parked = classes.calendar.check(element)
+    if not parked == None:
+        return parked
+    try:
+        released = datetime.datetime.strptime(element.originallyAvailableAt, '%Y-%m-%d')
+        released = released.replace(tzinfo=datetime.timezone.utc).timestamp()
+        if released > time.time():
+            return released
+    except:
+        return None
+    return None
+
+def due(element):
+    # determine when a media item should be checked next:
+    # - items that are waiting for a retry are checked once the retry interval has passed
+    # - unreleased items are checked once they are released
+    # - everything else is checked again after the recheck interval
+    now = time.time()
+    try:
+        if pending(element):
+            return now + retry
+        released = release(element)
+        if not released == None:
+            return released
+    except Exception as e:
+        ui_print("schedule error: (due exception): " + str(e), ui_settings.debug)
+    return now + seconds()
+
+class scheduler:
+    # A heap of media items, ordered by the time they are due to be checked. Items are removed
+    # lazily: rescheduling or removing an item only invalidates its old heap entry.
+    def __init__(self):
+        self.heap = []
+        self.entries = classes.catalog()
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.saved = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, element):
+        return element in self.entries
+
+    def push(self, element, due):
+        entry = [due, next(self.counter), element]
+        old = self.entries.pop(element)
+        if not old == None:
+            old[2] = None
+        self.entries.add(element, entry)
+        heapq.heappush(self.heap, entry)
+
+    def add(self, element, due):
+        with self.lock:
+            self.push(element, due)
+
+    def remove(self, element):
+        with self.lock:
+            entry = self.entries.pop(element)
+            if not entry == None:
+                entry[2] = None
+
+    def update(self, elements):
+        # sync the schedule with a freshly fetched watchlist: new items are due immediately, items
+        # that are no longer monitored are dropped, known items keep their due time but get the
+        # fresh metadata - unless their episode count changed, which makes them due immediately.
+        now = time.time()
+        with self.lock:
+            current = classes.catalog(elements)
+            for element in list(self.entries):
+                if not element in current:
+                    self.entries.pop(element)[2] = None
+            for element in elements:
+                entry = self.entries.value(element)
+                if entry == None:
+                    self.push(element, self.resumed(element, now))
+                    continue
+                due = entry[0]
+                if hasattr(element, "leafCount") and not getattr(entry[2], "leafCount", None) == element.leafCount:
+                    due = now
+                self.push(element, due)
+
+    def apply(self, changes, watchlists, processed=[]):
+        # apply a watchlist delta: processed items are due again according to their state, added and
+        # changed items are due immediately and removed items are dropped, unless they are still
+        # monitored through another watchlist.
+        now = time.time()
+        done = classes.catalog(processed)
+        for element in processed:
+            self.add(element, due(element))
+        for element in changes.added + changes.changed:
+            if not element in done:
+                self.add(element, now)
+        if len(changes.removed) > 0:
+            monitored = classes.catalog(watchlists)
+            for element in changes.removed:
+                if not element in monitored:
+                    self.remove(element)
+
+    def resume(self):
+        # load the due times of the last run, so that a restart doesnt check every item right away
+        saved = store.load('content', 'schedule')
+        if isinstance(saved, dict):
+            self.saved = saved
+
+    def resumed(self, element, now):
+        # due time of a media item from the last run
+        due = now
+        for key in classes.calendar.keys(element):
+            if key in self.saved:
+                due = self.saved.pop(key)
+        return due
+
+    def save(self):
+        saved = {}
+        with self.lock:
+            for element in self.entries:
+                entry = self.entries.value(element)
+                for key in classes.calendar.keys(element):
+                    saved[key] = entry[0]
+        store.save(saved, 'content', 'schedule', ui_settings.debug)
+
+    def pop(self, now=None):
+        # remove and return all media items that are due, in order of their due time
+        if now == None:
+            now = time.time()
+        due = []
+        with self.lock:
+            while len(self.heap) > 0 and self.heap[0][0] <= now:
+                entry = heapq.heappop(self.heap)
+                if entry[2] == None:
+                    continue
+                self.entries.pop(entry[2])
+                due += [entry[2]]
+        return due
+
+    def next(self):
+        # due time of the next media item, or None if nothing is scheduled
+        with self.lock:
+            while len(self.heap) > 0 and self.heap[0][2] == None:
+                heapq.heappop(self.heap)
+            if len(self.heap) == 0:
+                return None
+            return self.heap[0][0]
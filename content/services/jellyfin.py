@@ -5,7 +5,7 @@ from content import classes
 from ui.ui_print import *
 
 name = 'Jellyfin'
-session = requests.Session()
+session = client(name, 'metadata')
 api_key = ''
 
 def logerror(response):
@@ -19,7 +19,7 @@ def get(url, timeout=30):
         headers = {"X-MediaBrowser-Token": api_key}
         response = session.get(url, timeout=timeout, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
         return response
     except Exception as e:
         ui_print("jellyfin error: (json exception): " + str(e), debug=ui_settings.debug)
@@ -30,7 +30,7 @@ def post(url, data):
         headers = {"X-MediaBrowser-Token": api_key}
         response = session.post(url, data=data, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
         return response
     except Exception as e:
         ui_print("jellyfin error: (json exception): " + str(e), debug=ui_settings.debug)
@@ -159,7 +159,7 @@ class library():
         if len(list) == 0:
             ui_print(
                 "[jellyfin error]: Your library seems empty. To prevent unwanted behaviour, no further downloads will be started. If your library really is empty, please add at least one media item manually.")
-        return list
+        return classes.snapshot(list)
 
 # Multiprocessing watchlist method
 def multi_init(cls, obj, result, index):
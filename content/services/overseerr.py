@@ -12,7 +12,9 @@ users = ['all']
 allowed_movie_status = [['2'], ['3']]
 allowed_show_status = [['2'], ['3'], ['4'], ['5']]
 api_key = ""
-session = requests.Session()
+session = client(name, 'metadata')
+# validators and results of the last watchlist polls
+poll = conditional()
 last_requests = []
 
 def setup(self):
@@ -173,13 +175,17 @@ def logerror(response):
     if response.status_code == 401:
         ui_print("[overseerr] error: (401 unauthorized): overserr api key does not seem to work.")
 
-def get(url):
+def get(url, poll=None):
+    # if a conditional poll cache is given, unchanged urls return conditional.unchanged
     try:
-        response = session.get(url, headers={
+        headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
-            'Content-type': "application/json", "X-Api-Key": api_key})
+            'Content-type': "application/json", "X-Api-Key": api_key}
+        response = session.get(url, headers=headers if poll == None else poll.headers(url, headers))
+        if not poll == None and poll.check(url, response):
+            return conditional.unchanged
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[overseerr] error: (exception): " + str(e), debug=ui_settings.debug)
         return None
@@ -191,7 +197,7 @@ def post(url, data):
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
             'Content-type': "application/json", "X-Api-Key": api_key}, data=data)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[overseerr] error: (exception): " + str(e), debug=ui_settings.debug)
         return None
@@ -279,21 +285,27 @@ class requests(classes.watchlist):
                     add += [element]
                 except:
                     ui_print('[overseerr] error: couldnt match item to service ' + matching_service, ui_settings.debug)
+            known = classes.catalog()
             for element in add:
-                if not element in self.data:
+                if not element in known:
                     self.data.append(element)
+                    known.add(element)
             ui_print('done')
 
     def update(self):
         global last_requests
+        added = []
+        changed = []
         if len(users) > 0 and len(api_key) > 0:
-            refresh = False
             try:
-                response = get(base_url + '/api/v1/request?take=10000')
+                url = base_url + '/api/v1/request?take=10000'
+                response = get(url, poll=poll)
+                # nothing changed since the last poll
+                if response == conditional.unchanged:
+                    return classes.delta()
                 for element_ in response.results:
                     if not any(x.id == element_.id and x.updatedAt == element_.updatedAt for x in last_requests) and (element_.requestedBy.displayName in users or users == ['all']) and ([str(element_.media.status)] in allowed_movie_status if element_.type == 'movie' else [str(element_.media.status)] in allowed_show_status):
                         ui_print('[overseerr] found new overseerr request by user "' + element_.requestedBy.displayName + '".')
-                        refresh = True
                         last_requests.append(element_)
                         if len(sys.modules['content.services.plex'].users) > 0:
                             matching_service = 'content.services.plex'
@@ -301,7 +313,7 @@ class requests(classes.watchlist):
                             matching_service = 'content.services.trakt'
                         else:
                             ui_print("[overseerr] error: couldnt match overseerr content to either plex or trakt - add at least one plex or trakt user. No requests will be downloaded.")
-                            return False
+                            return classes.delta(added, changed=changed)
                         ui_print('[overseerr] matching overseerr requests to service ' + matching_service + ' ...')
                         element = copy.deepcopy(element_)
                         if element.type == "movie":
@@ -316,21 +328,22 @@ class requests(classes.watchlist):
                         element.request_id = element_.media.id
                         if not element in self.data:
                             self.data.append(element)
+                            added += [element]
                         else:
                             existing = next(x for x in self.data if x == element)
                             if element.type == "show":
                                 for season in element.Seasons:
                                     if not any(season.index == x.index for x in existing.Seasons):
                                         existing.Seasons.append(season)
+                            changed += [existing]
                         ui_print('done')
                 for element in last_requests[:]:
                     if not element.id in (x.id for x in response.results):
                         last_requests.remove(element)
-                if refresh:
-                    return True
+                poll.store(url, True)
             except:
-                return False
-        return False
+                return classes.delta(added, changed=changed)
+        return classes.delta(added, changed=changed)
 
 class library():
     name = 'Overseerr Requests'
@@ -5,7 +5,11 @@ from content import classes
 from ui.ui_print import *
 
 name = 'Plex'
-session = requests.Session()
+session = client(name, 'metadata')
+# validators and results of the last watchlist polls
+poll = conditional()
+# requests that are in flight
+inflight = flight()
 users = []
 headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
 current_library = []
@@ -28,11 +32,21 @@ def logerror(response):
         else:
             ui_print("plex error: (401 unauthorized): token for user '"+name+"' does not seem to work. check your plex user settings.")
 
-def get(url, timeout=60):
+def get(url, timeout=60, poll=None):
+    # identical concurrent requests share one response. if a conditional poll cache is given, unchanged urls
+    # return conditional.unchanged - polls are never shared.
+    if poll == None:
+        return inflight.do(flight.key(url), request, url, timeout)
+    return request(url, timeout, poll)
+
+def request(url, timeout=60, poll=None):
     try:
-        response = session.get(url, headers=headers, timeout=timeout)
+        with concurrency('metadata', name):
+            response = session.get(url, headers=headers if poll == None else poll.headers(url, headers), timeout=timeout)
+        if not poll == None and poll.check(url, response):
+            return conditional.unchanged
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
         return response
     except Exception as e:
         ui_print("plex error: (json exception): " + str(e), debug=ui_settings.debug)
@@ -42,7 +56,7 @@ def post(url, data):
     try:
         response = session.post(url, data=data, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
         return response
     except Exception as e:
         ui_print("plex error: (json exception): " + str(e), debug=ui_settings.debug)
@@ -62,6 +76,7 @@ class watchlist(classes.watchlist):
         if len(users) > 0:
             ui_print('[plex] getting all watchlists ...')
         self.data = []
+        known = classes.catalog()
         try:
             for user in users:
                 added = 0
@@ -76,13 +91,15 @@ class watchlist(classes.watchlist):
                         if hasattr(response.MediaContainer, 'Metadata'):
                             for entry in response.MediaContainer.Metadata:
                                 entry.user = [user]
-                                if not entry in self.data:
+                                element = known.get(entry)
+                                if element == None:
                                     if entry.type == 'show':
                                         self.data += [show(entry)]
+                                        known.add(self.data[-1])
                                     if entry.type == 'movie':
                                         self.data += [movie(entry)]
+                                        known.add(self.data[-1])
                                 else:
-                                    element = next(x for x in self.data if x == entry)
                                     if not user in element.user:
                                         element.user += [user]
             try:
@@ -129,34 +146,53 @@ class watchlist(classes.watchlist):
             self.data.append(movie(item.ratingKey))
 
     def update(self):
-        update = False
+        added = []
+        removed = []
+        modified = []
         new_watchlist = []
+        changed = False
+        known = classes.catalog(self.data)
         try:
             for user in users:
                 url = 'https://metadata.provider.plex.tv/library/sections/watchlist/all?X-Plex-Token=' + user[1]
-                response = get(url)
+                response = get(url, poll=poll)
+                if response == conditional.unchanged:
+                    new_watchlist += poll.value(url)
+                    continue
+                changed = True
                 if hasattr(response, 'MediaContainer'):
                     if hasattr(response.MediaContainer, 'Metadata'):
                         for entry in response.MediaContainer.Metadata:
                             entry.user = [user]
-                            if not entry in self.data:
+                            element = known.get(entry)
+                            if element == None:
                                 ui_print('[plex] item: "' + entry.title + '" found in ' + user[0] + '`s watchlist')
-                                update = True
                                 if entry.type == 'show':
                                     self.data += [show(entry)]
+                                    known.add(self.data[-1])
+                                    added += [self.data[-1]]
                                 if entry.type == 'movie':
                                     self.data += [movie(entry)]
+                                    known.add(self.data[-1])
+                                    added += [self.data[-1]]
+                                if entry.type in ['show', 'movie']:
+                                    classes.delta.modified(self.data[-1], entry)
                             else:
-                                element = next(x for x in self.data if x == entry)
                                 if not user in element.user:
                                     ui_print('[plex] item: "' + entry.title + '" found in ' + user[0] + '`s watchlist')
                                     element.user += [user]
                                     if library.lable.name in classes.refresh.active:
                                         library.lable(element)
+                                if classes.delta.modified(element, entry) and not element in modified:
+                                    modified += [element]
                         new_watchlist += response.MediaContainer.Metadata
-            for entry in self.data[:]:
-                if not entry in new_watchlist:
-                    self.data.remove(entry)
+                        poll.store(url, response.MediaContainer.Metadata)
+            # nothing changed since the last poll
+            if not changed:
+                return classes.delta()
+            new_watchlist = classes.catalog(new_watchlist)
+            removed = [entry for entry in self.data if not entry in new_watchlist]
+            self.data = [entry for entry in self.data if entry in new_watchlist]
             try:
                 self.data.sort(key=lambda s: s.watchlistedAt, reverse=True)
             except:
@@ -164,7 +200,8 @@ class watchlist(classes.watchlist):
         except Exception as e:
             ui_print("[plex error]: (watchlist exception): " + str(e), debug=ui_settings.debug)
             ui_print('[plex error]: could not reach plex')
-        return update
+        modified = [element for element in modified if element in self.data]
+        return classes.delta(added, removed, modified)
 
 class season(classes.media):
     def __init__(self, other):
@@ -584,7 +621,7 @@ class library(classes.library):
                     time.sleep(10)
                     _ = library(silent=True)
                     retries += 1
-                library_item = next((x for x in current_library if element == x), None)
+                library_item = classes.snapshot.of(current_library).get(element)
                 if library_item == None:
                     ui_print('[plex] error: couldnt add lables - item: "' + element.query() + '" could not be found on server.')
                     return
@@ -620,7 +657,7 @@ class library(classes.library):
                     if element.query() in version and not "Version: " +version.split("[")[-1][:-1] in tags:
                         tags += ["Version: " +version.split("[")[-1][:-1]]
                         version_tags = True
-                library_item = next((x for x in current_library if element == x), None)
+                library_item = classes.snapshot.of(current_library).get(element)
                 # Return if no version tags and not collected
                 if library_item == None and version_tags == False:
                     return
@@ -781,7 +818,7 @@ class library(classes.library):
         first_load = False
         if len(current_library) == 0:
             first_load = True
-            current_library = store.load("plex","metadata")
+            current_library = classes.snapshot(store.load("plex","metadata"))
         if library.check == [['']]:
             library.check = []
         try:
@@ -855,13 +892,13 @@ class library(classes.library):
         updated = False
         for item in list_:
             try:
-                if not item in current_library:
+                match = current_library.get(item)
+                if match == None:
                     updated = True
                     url = library.url + '/library/metadata/' + item.ratingKey + '?X-Plex-Token=' + users[0][1]
                     response = get(url)
                     item.__dict__.update(response.MediaContainer.Metadata[0].__dict__)
                 else:
-                    match = next((x for x in current_library if item == x), None)
                     if hasattr(match,"Guid"):
                         item.Guid = match.Guid
                     if hasattr(match,"Label"):
@@ -878,10 +915,10 @@ class library(classes.library):
                 ui_print('done')
                 ui_print("[plex error]: found incorrectly matched library item : " + item.title + " - this item needs a metadata refresh (open plex webui, find item, open item menu, refresh metadata).")  
         ui_print('done')
-        current_library = copy.deepcopy(list_)
+        current_library = classes.snapshot(copy.deepcopy(list_))
         if first_load and updated:
-            store.save(current_library,"plex","metadata")       
-        return list_
+            store.save(list(current_library),"plex","metadata")       
+        return classes.snapshot(list_)
 
 def search(query, library=[]):
     query = query.replace(' ', '%20')
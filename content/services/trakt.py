@@ -12,7 +12,15 @@ users = []
 current_user = ["", ""]
 current_library = []
 early_releases = "false"
-session = requests.Session()
+session = client(name, 'metadata')
+# validators and results of the last watchlist polls
+poll = conditional()
+# requests that are in flight
+inflight = flight()
+# trakt allows 1000 GET requests per 5 minutes
+limiter.limit('api.trakt.tv', 1000 / 300, 10)
+# trakt allows one POST request per second
+limiter.limit('api.trakt.tv', 1, method='POST')
 
 def setup(self, new=False):
     from settings import settings_list
@@ -142,15 +150,31 @@ def logerror(response):
         ui_print("[trakt] error: (401 unauthorized): trakt api key for user '" + current_user[
             0] + "' does not seem to work. Consider re-authorizing plex_debrid for this trakt user.")
 
-def get(url):
+def get(url, poll=None):
+    # identical concurrent requests of the same user share one response. if a conditional poll cache is given,
+    # unchanged urls return conditional.unchanged - polls are cached per user and never shared.
+    if poll == None:
+        return inflight.do(flight.key(url, None, current_user[1]), request, url)
+    return request(url, poll)
+
+def request(url, poll=None):
     try:
-        response = session.get(url, headers={
+        policy = backoff()
+        headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
             'Content-type': "application/json", "trakt-api-key": client_id, "trakt-api-version": "2",
-            "Authorization": "Bearer " + current_user[1]})
+            "Authorization": "Bearer " + current_user[1]}
+        key = (current_user[1], url)
+        while True:
+            with concurrency('metadata', name):
+                response = session.get(url, headers=headers if poll == None else poll.headers(key, headers))
+            if not response.status_code in backoff.codes or not policy.wait(response):
+                break
+        if not poll == None and poll.check(key, response):
+            return conditional.unchanged, response.headers
         logerror(response)
         header = response.headers
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except:
         response = None
         header = None
@@ -158,13 +182,17 @@ def get(url):
 
 def post(url, data):
     try:
-        response = session.post(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
-            'Content-type': "application/json", "trakt-api-key": client_id, "trakt-api-version": "2",
-            "Authorization": "Bearer " + current_user[1]}, data=data)
+        # trakt allows one POST request per second, requests that exceed the limit are retried after the time trakt asks for
+        policy = backoff()
+        while True:
+            response = session.post(url, headers={
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
+                'Content-type': "application/json", "trakt-api-key": client_id, "trakt-api-version": "2",
+                "Authorization": "Bearer " + current_user[1]}, data=data)
+            if not response.status_code in backoff.codes or not policy.wait(response):
+                break
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
-        time.sleep(1.1)
+        response = view.loads(response.content)
     except:
         response = None
     return response
@@ -208,6 +236,7 @@ class watchlist(classes.watchlist):
         if len(lists) > 0:
             ui_print('[trakt] getting all trakt lists ...')
         self.data = []
+        known = classes.catalog()
         for list in lists:
             list_type = "public"
             for user in users:
@@ -233,8 +262,9 @@ class watchlist(classes.watchlist):
                                 element.show.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                             except:
                                 element.show.watchlistedAt = 0
-                            if not element.show in self.data:
+                            if not element.show in known:
                                 self.data.append(show(element.show))
+                                known.add(self.data[-1])
                         elif hasattr(element, 'movie'):
                             element.movie.type = 'movie'
                             element.movie.user = user
@@ -243,8 +273,9 @@ class watchlist(classes.watchlist):
                                 element.movie.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                             except:
                                 element.movie.watchlistedAt = 0
-                            if not element.movie in self.data:
+                            if not element.movie in known:
                                 self.data.append(movie(element.movie))
+                                known.add(self.data[-1])
                 except Exception as e:
                     ui_print("[trakt error]: (exception): " + str(e), debug=ui_settings.debug)
                     continue
@@ -257,8 +288,9 @@ class watchlist(classes.watchlist):
                             element.show.user = user
                             element.show.guid = element.show.ids.trakt
                             element.show.watchlistedAt = 0
-                            if not element.show in self.data:
+                            if not element.show in known:
                                 self.data.append(show(element.show))
+                                known.add(self.data[-1])
                 except Exception as e:
                     ui_print("[trakt error]: (exception): " + str(e), debug=ui_settings.debug)
                     continue
@@ -281,8 +313,9 @@ class watchlist(classes.watchlist):
                                     element.show.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                                 except:
                                     element.show.watchlistedAt = 0
-                                if not element.show in self.data:
+                                if not element.show in known:
                                     self.data.append(show(element.show))
+                                    known.add(self.data[-1])
                             elif hasattr(element, 'movie'):
                                 element.movie.type = 'movie'
                                 element.movie.user = user
@@ -291,8 +324,9 @@ class watchlist(classes.watchlist):
                                     element.movie.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                                 except:
                                     element.movie.watchlistedAt = 0
-                                if not element.movie in self.data:
+                                if not element.movie in known:
                                     self.data.append(movie(element.movie))
+                                    known.add(self.data[-1])
                 except Exception as e:
                     ui_print("[trakt error]: (exception): " + str(e), debug=ui_settings.debug)
                     continue
@@ -308,8 +342,9 @@ class watchlist(classes.watchlist):
                                 element.show.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                             except:
                                 element.show.watchlistedAt = 0
-                            if not element.show in self.data:
+                            if not element.show in known:
                                 self.data.append(show(element.show))
+                                known.add(self.data[-1])
                         elif hasattr(element, 'movie'):
                             element.movie.type = 'movie'
                             element.movie.user = user
@@ -318,8 +353,9 @@ class watchlist(classes.watchlist):
                                 element.movie.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                             except:
                                 element.movie.watchlistedAt = 0
-                            if not element.movie in self.data:
+                            if not element.movie in known:
                                 self.data.append(movie(element.movie))
+                                known.add(self.data[-1])
                 except Exception as e:
                     ui_print("[trakt error]: (exception): " + str(e), debug=ui_settings.debug)
                     continue
@@ -328,8 +364,11 @@ class watchlist(classes.watchlist):
     def update(self):
         global current_user
         global users
-        refresh = False
+        added = []
+        modified = []
         new_watchlist = []
+        changed = False
+        known = classes.catalog(self.data)
         for list in lists:
             list_type = "public"
             for user in users:
@@ -340,9 +379,15 @@ class watchlist(classes.watchlist):
                     list_type = "private"
                     break
             current_user = user
+            entries = []
             if list_type == "watchlist":
                 try:
-                    watchlist_items, header = get('https://api.trakt.tv/users/me/watchlist/movies,shows?extended=full')
+                    url = 'https://api.trakt.tv/users/me/watchlist/movies,shows?extended=full'
+                    watchlist_items, header = get(url, poll=poll)
+                    if watchlist_items == conditional.unchanged:
+                        new_watchlist += poll.value((user[1], url))
+                        continue
+                    changed = True
                     for element in watchlist_items:
                         if hasattr(element, 'show'):
                             element.show.type = 'show'
@@ -352,11 +397,15 @@ class watchlist(classes.watchlist):
                                 element.show.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                             except:
                                 element.show.watchlistedAt = 0
-                            if not element.show in self.data:
-                                refresh = True
+                            if not element.show in known:
                                 ui_print('[trakt] item: "' + element.show.title + '" found in ' + current_user[0] + "'s trakt watchlist.")
                                 self.data.append(show(element.show))
-                            new_watchlist += [element.show]
+                                known.add(self.data[-1])
+                                added += [self.data[-1]]
+                            existing = known.get(element.show)
+                            if classes.delta.modified(existing, element.show) and not existing in modified:
+                                modified += [existing]
+                            entries += [element.show]
                         elif hasattr(element, 'movie'):
                             element.movie.type = 'movie'
                             element.movie.user = user
@@ -365,13 +414,21 @@ class watchlist(classes.watchlist):
                                 element.movie.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                             except:
                                 element.movie.watchlistedAt = 0
-                            if not element.movie in self.data:
-                                refresh = True
+                            if not element.movie in known:
                                 ui_print('[trakt] item: "' + element.movie.title + '" found in ' + current_user[0] + "'s trakt watchlist.")
                                 self.data.append(movie(element.movie))
-                            new_watchlist += [element.movie]
+                                known.add(self.data[-1])
+                                added += [self.data[-1]]
+                            existing = known.get(element.movie)
+                            if classes.delta.modified(existing, element.movie) and not existing in modified:
+                                modified += [existing]
+                            entries += [element.movie]
+                    new_watchlist += entries
+                    poll.store((user[1], url), entries)
                 except Exception as e:
                     ui_print("[trakt error]: (exception): " + str(e), debug=ui_settings.debug)
+                    new_watchlist += entries
+                    changed = True
                     continue
             if list_type == "private":
                 try:
@@ -382,7 +439,12 @@ class watchlist(classes.watchlist):
                             p_list_id = p_list.ids.trakt
                             break
                     if not p_list_id == None:
-                        watchlist_items, header = get('https://api.trakt.tv/users/me/lists/'+str(p_list_id)+'/items/movies,shows?extended=full')
+                        url = 'https://api.trakt.tv/users/me/lists/'+str(p_list_id)+'/items/movies,shows?extended=full'
+                        watchlist_items, header = get(url, poll=poll)
+                        if watchlist_items == conditional.unchanged:
+                            new_watchlist += poll.value((user[1], url))
+                            continue
+                        changed = True
                         for element in watchlist_items:
                             if hasattr(element, 'show'):
                                 element.show.type = 'show'
@@ -392,11 +454,15 @@ class watchlist(classes.watchlist):
                                     element.show.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                                 except:
                                     element.show.watchlistedAt = 0
-                                if not element.show in self.data:
-                                    refresh = True
+                                if not element.show in known:
                                     ui_print('[trakt] item: "' + element.show.title + '" found in ' + current_user[0] + "'s private list: "+p_list.name+".")
                                     self.data.append(show(element.show))
-                                new_watchlist += [element.show]
+                                    known.add(self.data[-1])
+                                    added += [self.data[-1]]
+                                existing = known.get(element.show)
+                                if classes.delta.modified(existing, element.show) and not existing in modified:
+                                    modified += [existing]
+                                entries += [element.show]
                             elif hasattr(element, 'movie'):
                                 element.movie.type = 'movie'
                                 element.movie.user = user
@@ -405,20 +471,30 @@ class watchlist(classes.watchlist):
                                     element.movie.watchlistedAt = datetime.datetime.timestamp(datetime.datetime.strptime(element.listed_at,'%Y-%m-%dT%H:%M:%S.000Z'))
                                 except:
                                     element.movie.watchlistedAt = 0
-                                if not element.movie in self.data:
-                                    refresh = True
+                                if not element.movie in known:
                                     ui_print('[trakt] item: "' + element.movie.title + '" found in ' + current_user[0] + "'s private list: "+p_list.name+".")
                                     self.data.append(movie(element.movie))
-                                new_watchlist += [element.movie]
+                                    known.add(self.data[-1])
+                                    added += [self.data[-1]]
+                                existing = known.get(element.movie)
+                                if classes.delta.modified(existing, element.movie) and not existing in modified:
+                                    modified += [existing]
+                                entries += [element.movie]
+                        new_watchlist += entries
+                        poll.store((user[1], url), entries)
                 except Exception as e:
                     ui_print("[trakt error]: (exception): " + str(e), debug=ui_settings.debug)
+                    new_watchlist += entries
+                    changed = True
                     continue
-        for element in self.data[:]:
-            if not element in new_watchlist:
-                self.data.remove(element)
-        if refresh:
-            return True
-        return False
+        # nothing changed since the last poll
+        if not changed:
+            return classes.delta()
+        new_watchlist = classes.catalog(new_watchlist)
+        removed = [element for element in self.data if not element in new_watchlist]
+        self.data = [element for element in self.data if element in new_watchlist]
+        modified = [element for element in modified if element in new_watchlist and not element in added]
+        return classes.delta(added, removed, modified)
 
     def remove(self, original_element):
         global current_user
@@ -646,8 +722,8 @@ class library(classes.library):
                     element.movie.EID = setEID(element.movie)
                     collection.append(classes.media(element.movie))
             ui_print('done')
-            current_library = collection
-            return collection
+            current_library = classes.snapshot(collection)
+            return current_library
         except Exception as e:
             ui_print("[trakt] error: (exception): " + str(e), debug=ui_settings.debug)
             ui_print("[trakt] error: couldnt get trakt collection. the script will pause all downloads to avoid unwanted behavior.")
@@ -1112,6 +1188,7 @@ class library(classes.library):
                 return None
 
 def aliases(self,lan):
+    from base.languages import lan_ctr
     global current_user
     ctrs = []
     for l in lan_ctr:
@@ -4,7 +4,9 @@ from debrid import services
 from ui.ui_print import *
 
 tracker = []
-downloading = []
+# releases that are being downloaded by the debrid services, persisted across restarts. releases that are still
+# downloading a day later are forgotten on the next start, so that a stuck download doesnt block the item.
+downloading = store.journal('debrid', 'downloading', expiry=86400)
 uncached = 'true'
 
 # Download Method:
@@ -14,6 +16,8 @@ def download(element, stream=True, query='', force=False):
         cached_releases = copy.deepcopy(element.Releases)
         downloaded = False
         for release in cached_releases:
+            if cancellation.current().cancelled():
+                break
             element.Releases = [release, ]
             if len(tracker) > 0:
                 for t, s in tracker:
@@ -21,8 +25,11 @@ def download(element, stream=True, query='', force=False):
                         release.cached = s
             for service in services.get():
                 if service.short in release.cached:
-                    if service.download(element, stream=stream, query=query, force=force):
-                        downloaded = True
+                    with concurrency('debrid', service.short):
+                        with metrics.timer('debrid_download', service.short):
+                            downloaded = service.download(element, stream=stream, query=query, force=force)
+                    if downloaded:
+                        metrics.count('downloads', service.short)
                         downloaded_files += element.Releases[0].files
                         if not hasattr(element,"existing_releases"):
                             element.existing_releases = []
@@ -40,6 +47,8 @@ def download(element, stream=True, query='', force=False):
         scraped_releases = copy.deepcopy(element.Releases)
         downloaded = False
         for release in scraped_releases:
+            if cancellation.current().cancelled():
+                break
             element.Releases = [release, ]
             if len(tracker) > 0:
                 for t, s in tracker:
@@ -48,15 +57,21 @@ def download(element, stream=True, query='', force=False):
             for service in services.get():
                 if len(release.cached) > 0:
                     if service.short in release.cached:
-                        if service.download(element, stream=stream, query=query, force=force):
-                            downloaded = True
+                        with concurrency('debrid', service.short):
+                            with metrics.timer('debrid_download', service.short):
+                                downloaded = service.download(element, stream=stream, query=query, force=force)
+                        if downloaded:
+                            metrics.count('downloads', service.short)
                             downloaded_files += element.Releases[0].files
                             element.existing_releases += [element.Releases[0].title]
                             element.downloaded_releases += [element.Releases[0].title]
                             break
                 else:
-                    if service.download(element, stream=stream, query=query, force=force):
-                        downloaded = True
+                    with concurrency('debrid', service.short):
+                        with metrics.timer('debrid_download', service.short):
+                            downloaded = service.download(element, stream=stream, query=query, force=force)
+                    if downloaded:
+                        metrics.count('downloads', service.short)
                         downloaded_files += element.Releases[0].files
                         element.existing_releases += [element.Releases[0].title]
                         element.downloaded_releases += [element.Releases[0].title]
@@ -79,10 +94,36 @@ def check(element, force=False):
     activeservices = services.active
     if len(element.Releases) > 0:
         ui_print("checking cache status for scraped releases on: [" + "],[".join(activeservices) + "] ...")
-        for service in services.get():
-            service.check(element, force=force)
+        if aio.available():
+            aio.run(check_async(element, force))
+        else:
+            for service in services.get():
+                if cancellation.current().cancelled():
+                    break
+                if breaker.get(service.name).blocked():
+                    continue
+                with concurrency('debrid', service.short):
+                    with metrics.timer('debrid_check', service.short):
+                        service.check(element, force=force)
         ui_print("done")
     for release in checked:
         element.Releases += [release]
     for release in element.Releases:
         release.checked = True
+
+async def check_async(element, force=False):
+    import asyncio
+    # services with an async check run at the same time, all others run one after another afterwards,
+    # since they change the releases of the media item from another thread.
+    async def check_service(service):
+        async with aio.slot('debrid', service.short):
+            with metrics.timer('debrid_check', service.short):
+                await service.check_async(element, force=force)
+    await asyncio.gather(*[check_service(service) for service in services.get() if hasattr(service, 'check_async') and not breaker.get(service.name).blocked()])
+    for service in services.get():
+        if hasattr(service, 'check_async') or breaker.get(service.name).blocked():
+            continue
+        if aio.current().cancelled():
+            break
+        with metrics.timer('debrid_check', service.short):
+            await aio.call(service.check, element, force)
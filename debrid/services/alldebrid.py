@@ -9,7 +9,9 @@ short = "AD"
 # (required) Authentification of the Debrid service, can be oauth aswell. Create a setting for the required variables in the ui.settings_list. For an oauth example check the trakt authentification.
 api_key = ""
 # Define Variables
-session = requests.Session()
+session = client(name, 'debrid')
+# alldebrid allows 12 requests per second and 600 requests per minute
+limiter.limit('api.alldebrid.com', 600 / 60, 12)
 
 def setup(cls, new=False):
     from debrid.services import setup
@@ -21,11 +23,11 @@ def logerror(response):
         ui_print("[alldebrid] error "+str(response.status_code)+": " + str(response.content), debug=ui_settings.debug)
     if 'error' in str(response.content):
         try:
-            response2 = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+            response2 = view.loads(response.content)
             ui_print("[alldebrid] error "+str(response.status_code)+": " + response2.data[0].error.message)
         except:
             try:
-                response2 = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+                response2 = view.loads(response.content)
                 ui_print("[alldebrid] error "+str(response.status_code)+": " + response2.error.message)
             except:
                 ui_print("[alldebrid] error "+str(response.status_code)+": unknown error")
@@ -40,7 +42,21 @@ def get(url):
     try:
         response = session.get(url + '&agent=plex_debrid', headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
+    except Exception as e:
+        ui_print("[alldebrid] error: (json exception): " + str(e), debug=ui_settings.debug)
+        response = None
+    return response
+
+# Asynchronous Get Function
+async def get_async(url):
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
+        'authorization': 'Bearer ' + api_key}
+    try:
+        response = await aio.fetch(url + '&agent=plex_debrid', headers=headers, name=name)
+        logerror(response)
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[alldebrid] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -54,7 +70,7 @@ def post(url, data):
     try:
         response = session.post(url, headers=headers, data=data)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[alldebrid] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -122,26 +138,38 @@ def download(element, stream=True, query='', force=False):
     # (required) Check Function
 
 def check(element, force=False):
-    if force:
-        wanted = ['.*']
-    else:
-        wanted = element.files()
-    unwanted = releases.sort.unwanted
+    hashes = checked(element)
+    if len(hashes) > 0:
+        response = get(
+            'https://api.alldebrid.com/v4/magnet/instant?magnets[]=' + '&magnets[]='.join(hashes[:200]))
+        cached(element, response)
+
+# Asynchronous Check Function
+async def check_async(element, force=False):
+    hashes = checked(element)
+    if len(hashes) > 0:
+        response = await get_async(
+            'https://api.alldebrid.com/v4/magnet/instant?magnets[]=' + '&magnets[]='.join(hashes[:200]))
+        cached(element, response)
+
+def checked(element):
+    # hashes of the releases that can be checked, releases without a hash are dropped
     hashes = []
     for release in element.Releases[:]:
         if len(release.hash) == 40:
             hashes += [release.hash]
         else:
             element.Releases.remove(release)
-    if len(hashes) > 0:
-        response = get(
-            'https://api.alldebrid.com/v4/magnet/instant?magnets[]=' + '&magnets[]='.join(hashes[:200]))
-        for i, release in enumerate(element.Releases):
-            try:
-                instant = response.data.magnets[i].instant
-                if instant:
-                    release.cached += ['AD']
-                    # release.wanted = 0
-                    # release.unwanted = 0
-            except:
-                continue
\ No newline at end of file
+    return hashes
+
+def cached(element, response):
+    # mark the releases that are cached
+    for i, release in enumerate(element.Releases):
+        try:
+            instant = response.data.magnets[i].instant
+            if instant:
+                release.cached += ['AD']
+                # release.wanted = 0
+                # release.unwanted = 0
+        except:
+            continue
\ No newline at end of file
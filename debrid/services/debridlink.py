@@ -9,7 +9,7 @@ short = "DL"
 api_key = ""
 client_id = "0KLCzpbPTCsWZtQ9Ad0aZA"
 # Define Variables
-session = requests.Session()
+session = client(name, 'debrid')
 
 def setup(cls, new=False):
     from debrid.services import setup
@@ -21,7 +21,7 @@ def logerror(response):
         ui_print("[debridlink] error "+str(response.status_code)+": " + str(response.content), debug=ui_settings.debug)
     if 'error' in str(response.content): 
         try:
-            response2 = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+            response2 = view.loads(response.content)
             if not response2.error == 'authorization_pending':
                 ui_print("[debridlink] error "+str(response.status_code)+": " + response2.error)
         except:
@@ -39,7 +39,7 @@ def get(url):
     try:
         response = session.get(url, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("debridlink error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -54,7 +54,7 @@ def post(url, data):
     try:
         response = session.post(url, headers=headers, data=data)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("debridlink error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
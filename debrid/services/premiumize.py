@@ -9,7 +9,7 @@ short = "PM"
 # (required) Authentification of the Debrid service, can be oauth aswell. Create a setting for the required variables in the ui.settings_list. For an oauth example check the trakt authentification.
 api_key = ""
 # Define Variables
-session = requests.Session()
+session = client(name, 'debrid')
 
 def setup(cls, new=False):
     from debrid.services import setup
@@ -20,7 +20,7 @@ def logerror(response):
     if not response.status_code == 200:
         ui_print("[premiumize] error: " + str(response.content), debug=ui_settings.debug)
     if 'error' in str(response.content):
-        response2 = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response2 = view.loads(response.content)
         ui_print("[premiumize] error: " + response2.message)
     if response.status_code == 401:
         ui_print(
@@ -34,7 +34,7 @@ def get(url):
     try:
         response = session.get(url + '&apikey=' + api_key, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[premiumize] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -49,7 +49,7 @@ def post(url, data):
         response = session.post(url + '?apikey=' + api_key + data,
                                                     headers=headers, data={})
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[premiumize] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -10,7 +10,7 @@ short = "PUT"
 api_key = ""
 client_id = "5843"
 # Define Variables
-session = requests.Session()
+session = client(name, 'debrid')
 
 def setup(cls, new=False):
     from debrid.services import setup
@@ -22,7 +22,7 @@ def logerror(response):
         ui_print("[put.io] error: " + str(response.content), debug=ui_settings.debug)
     if 'error' in str(response.content) and not response.status_code == 200:
         try:
-            response2 = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+            response2 = view.loads(response.content)
             ui_print("[put.io] error: " + response2.error_message)
         except:
             ui_print("[put.io] error: unknown error")
@@ -38,7 +38,7 @@ def get(url):
     try:
         response = session.get(url, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[put.io] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -52,7 +52,7 @@ def post(url, data):
     try:
         response = session.post(url, headers=headers, data=data)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[put.io] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -14,7 +14,9 @@ short = "RD"
 # (required) Authentification of the Debrid service, can be oauth as well. Create a setting for the required variables in the ui.settings_list. For an oauth example check the trakt authentication.
 api_key = ""
 # Define Variables
-session = requests.Session()
+session = client(name, 'debrid')
+# real debrid allows 250 requests per minute
+limiter.limit('api.real-debrid.com', 250 / 60, 10)
 errors = [
     [202, "action already done"],
     [400, "bad Request (see error message)"],
@@ -149,9 +151,36 @@ def get(url):
     }
     response = None
     try:
+        policy = backoff()
         response = session.get(url, headers=headers)
+        while response.status_code in backoff.codes and policy.wait(response):
+            response = session.get(url, headers=headers)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
+    except Exception as e:
+        ui_print("[realdebrid] error: (json exception): " + str(e), debug=ui_settings.debug)
+        response = None
+    return response
+
+# Asynchronous Get Function
+async def get_async(url):
+    import asyncio
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
+        'authorization': 'Bearer ' + api_key
+    }
+    response = None
+    try:
+        policy = backoff()
+        response = await aio.fetch(url, headers=headers, name=name)
+        while response.status_code in backoff.codes:
+            delay = policy.next(response)
+            if delay == None:
+                break
+            await asyncio.sleep(delay)
+            response = await aio.fetch(url, headers=headers, name=name)
+        logerror(response)
+        response = view.loads(response.content)
     except Exception as e:
         ui_print("[realdebrid] error: (json exception): " + str(e), debug=ui_settings.debug)
         response = None
@@ -165,9 +194,12 @@ def post(url, data):
     }
     response = None
     try:
+        policy = backoff()
         response = session.post(url, headers=headers, data=data)
+        while response.status_code in backoff.codes and policy.wait(response):
+            response = session.post(url, headers=headers, data=data)
         logerror(response)
-        response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
     except Exception as e:
         if hasattr(response, "status_code"):
             if response.status_code >= 300:
@@ -182,7 +214,7 @@ def delete(url):
     headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/50.0.2661.102 Safari/537.36',
                'authorization': 'Bearer ' + api_key}
     try:
-        requests.delete(url, headers=headers)
+        session.delete(url, headers=headers)
         # time.sleep(1)
     except Exception as e:
         ui_print("[realdebrid] error: (delete exception): " + str(e), debug=ui_settings.debug)
@@ -252,37 +284,20 @@ def download(element, stream=True, query='', force=False):
                             cached_ids = []
                             for file in version.files:
                                 cached_ids += [file.id]
-                            # post magnet to real debrid
+                            # post magnet to real debrid. rate limited and unavailable responses are retried by post().
                             max_retries = 3
-                            retry_delay = 5 # seconds
-                            for attempt in range(max_retries):
-                                try:
-                                    response = post('https://api.real-debrid.com/rest/1.0/torrents/addMagnet', {'magnet': str(release.download[0])})
-                                    if hasattr(response, 'error_code') and response.error_code == 25:
-                                        retry = f'Error adding magnet due to ({response.error_code} service_unavailable)'
-                                        print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] {retry}')
-                                        continue
-                                    else:
-                                        if hasattr(response, 'id'):
-                                            torrent_id = str(response.id)
-                                        else:
-                                            print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] error: No "id" in response for release: {release.title}')
-                                            continue
-                                except Exception as e:
-                                    print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] error: could not add magnet for release. ({e})')
-                                    if hasattr(e, 'response') and hasattr(e.response, 'status_code'):
-                                        if e.response.status_code == 429:
-                                            print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] Rate limit exceeded')
-                                    continue
+                            policy = backoff()
                             try:
                                 response = post('https://api.real-debrid.com/rest/1.0/torrents/addMagnet', {'magnet': str(release.download[0])})
                                 if hasattr(response, 'id'):
                                     torrent_id = str(response.id)
                                 else:
+                                    if hasattr(response, 'error_code'):
+                                        print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] Error adding magnet due to ({response.error_code} {response.error})')
                                     print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] error: No "id" in response for release: {release.title}')
                                     continue
-                            except:
-                                ui_print('[realdebrid] error: could not add magnet for release: ' + release.title, ui_settings.debug)
+                            except Exception as e:
+                                ui_print('[realdebrid] error: could not add magnet for release: ' + release.title + ' (' + str(e) + ')', ui_settings.debug)
                                 continue
                             response = post('https://api.real-debrid.com/rest/1.0/torrents/selectFiles/' + torrent_id, {'files': str(','.join(cached_ids))})
                             for attempt in range(max_retries):
@@ -326,8 +341,7 @@ def download(element, stream=True, query='', force=False):
                                             release.title = actual_title
                                         return True
                                 elif response.error_code == 34:
-                                    time.sleep(retry_delay)
-                                    retry_delay += 1
+                                    policy.wait()
                                     continue
                                 else:
                                     print(f'[{str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S"))}] [realdebrid] {response.error}')
@@ -350,14 +364,20 @@ def download(element, stream=True, query='', force=False):
 
 # (required) Check Function
 def check(element, force=False):
-    if force:
-        wanted = ['.*']
-    else:
-        wanted = element.files()
-    unwanted = releases.sort.unwanted
-    wanted_patterns = list(zip(wanted, [regex.compile(r'(' + key + ')', regex.IGNORECASE) for key in wanted]))
-    unwanted_patterns = list(zip(unwanted, [regex.compile(r'(' + key + ')', regex.IGNORECASE) for key in unwanted]))
+    hashes = checked(element)
+    if len(hashes) > 0:
+        response = get('https://api.real-debrid.com/rest/1.0/torrents/instantAvailability/' + '/'.join(hashes))
+        cached(element, response, force)
 
+# Asynchronous Check Function
+async def check_async(element, force=False):
+    hashes = checked(element)
+    if len(hashes) > 0:
+        response = await get_async('https://api.real-debrid.com/rest/1.0/torrents/instantAvailability/' + '/'.join(hashes))
+        cached(element, response, force)
+
+def checked(element):
+    # hashes of the releases that can be checked, releases without a hash are dropped
     hashes = []
     for release in element.Releases[:]:
         if len(release.hash) == 40:
@@ -365,31 +385,40 @@ def check(element, force=False):
         else:
             ui_print("[realdebrid] error (missing torrent hash): ignoring release '" + release.title + "' ", ui_settings.debug)
             element.Releases.remove(release)
-    if len(hashes) > 0:
-        response = get('https://api.real-debrid.com/rest/1.0/torrents/instantAvailability/' + '/'.join(hashes))
-        ui_print("[realdebrid] checking and sorting all release files ...", ui_settings.debug)
-        for release in element.Releases:
-            release.files = []
-            release_hash = release.hash.lower()
-            if hasattr(response, release_hash):
-                response_attr = getattr(response, release_hash)
-                if hasattr(response_attr, 'rd'):
-                    rd_attr = response_attr.rd
-                    if len(rd_attr) > 0:
-                        for cached_version in rd_attr:
-                            version_files = []
-                            for file_ in cached_version.__dict__:
-                                file_attr = getattr(cached_version, file_)
-                                debrid_file = file(file_, file_attr.filename, file_attr.filesize, wanted_patterns, unwanted_patterns)
-                                version_files.append(debrid_file)
-                            release.files += [version(version_files), ]
-                        # select cached version that has the most needed, most wanted, least unwanted files and most files overall
-                        release.files.sort(key=lambda x: len(x.files), reverse=True)
-                        release.files.sort(key=lambda x: x.wanted, reverse=True)
-                        release.files.sort(key=lambda x: x.unwanted, reverse=False)
-                        release.wanted = release.files[0].wanted
-                        release.unwanted = release.files[0].unwanted
-                        release.size = release.files[0].size
-                        release.cached += ['RD']
-                        continue
-        ui_print("done", ui_settings.debug)
+    return hashes
+
+def cached(element, response, force=False):
+    # mark the releases that are cached and select their best cached file combination
+    if force:
+        wanted = ['.*']
+    else:
+        wanted = element.files()
+    unwanted = releases.sort.unwanted
+    wanted_patterns = list(zip(wanted, [regex.compile(r'(' + key + ')', regex.IGNORECASE) for key in wanted]))
+    unwanted_patterns = list(zip(unwanted, [regex.compile(r'(' + key + ')', regex.IGNORECASE) for key in unwanted]))
+    ui_print("[realdebrid] checking and sorting all release files ...", ui_settings.debug)
+    for release in element.Releases:
+        release.files = []
+        release_hash = release.hash.lower()
+        if hasattr(response, release_hash):
+            response_attr = getattr(response, release_hash)
+            if hasattr(response_attr, 'rd'):
+                rd_attr = response_attr.rd
+                if len(rd_attr) > 0:
+                    for cached_version in rd_attr:
+                        version_files = []
+                        for file_ in cached_version.__dict__:
+                            file_attr = getattr(cached_version, file_)
+                            debrid_file = file(file_, file_attr.filename, file_attr.filesize, wanted_patterns, unwanted_patterns)
+                            version_files.append(debrid_file)
+                        release.files += [version(version_files), ]
+                    # select cached version that has the most needed, most wanted, least unwanted files and most files overall
+                    release.files.sort(key=lambda x: len(x.files), reverse=True)
+                    release.files.sort(key=lambda x: x.wanted, reverse=True)
+                    release.files.sort(key=lambda x: x.unwanted, reverse=False)
+                    release.wanted = release.files[0].wanted
+                    release.unwanted = release.files[0].unwanted
+                    release.size = release.files[0].size
+                    release.cached += ['RD']
+                    continue
+    ui_print("done", ui_settings.debug)
@@ -8,14 +8,38 @@ if os.path.exists('./settings.json'):
     if os.path.getsize('./settings.json') > 0 and os.path.isfile('./settings.json'):
         config_dir = "."
 
+benchmark = False
+profile = False
+
 for i,arg in enumerate(sys.argv):
     if config_dir == "" and arg == "--config-dir":
         config_dir = sys.argv[i+1]
     if arg == "-service":
         service_mode = True
+    # record all http traffic to a fixture file, or replay it without network access
+    if arg == "--record":
+        recorder.start('record', sys.argv[i+1])
+    if arg == "--replay":
+        recorder.start('replay', sys.argv[i+1], 'zero' if "--replay-latency=zero" in sys.argv else 'recorded')
+    # run a single download cycle and print its duration
+    if arg == "--benchmark":
+        benchmark = True
+    # decode the json payloads of a recorded fixture and print the parse time and memory of each decoder
+    if arg == "--benchmark-json":
+        benchmark = sys.argv[i+1]
+    # print the time it takes to import plex_debrid, per package
+    if arg == "--profile-startup":
+        profile = True
 
 if config_dir == "":
     config_dir = "."
 
 if __name__ == "__main__":
-    ui.run(config_dir, service_mode)
\ No newline at end of file
+    if profile:
+        ui.profile_startup()
+    elif isinstance(benchmark, str):
+        ui.benchmark_json(benchmark)
+    elif benchmark:
+        ui.benchmark(config_dir)
+    else:
+        ui.run(config_dir, service_mode)
\ No newline at end of file
@@ -231,6 +231,7 @@ class sort:
                 elif choice == 'lang':
                     lang = "not a lang"
                     langs = []
+                    from base.languages import lan_ctr
                     for l_c in lan_ctr:
                         langs += [l_c[0]]
                     while lang not in langs:
@@ -1315,7 +1316,7 @@ class sort:
                             if not servicename in services:
                                 services += [servicename]
                     if len(services) > 0:
-                        ss.overwrite += [services,]
+                        ss.local.overwrite += [services,]
                 else:
                     services = []
                     for servicename in ss.active:
@@ -1323,7 +1324,7 @@ class sort:
                             if not servicename in services:
                                 services += [servicename]
                     if len(services) > 0:
-                        ss.overwrite += [services,]
+                        ss.local.overwrite += [services,]
                 return True
 
         class scraper_adjustment(trigger):
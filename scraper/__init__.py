@@ -10,30 +10,69 @@ def scrape(query, altquery="(.*)"):
     if len(scrapers) == 0:
         scrapers = [services.get()]
     scraped_releases = []
+    # the scraper threads run under the cancellation token of the calling thread
+    token = cancellation.current()
     for sequence in scrapers:
+        if token.cancelled():
+            ui_print('scraping cancelled')
+            break
         servicenames = "[" + ",".join(x.name for x in sequence) + "]"
         if regex.search(r'(tt[0-9]+)', query, regex.I):
             ui_print('scraping sources '+servicenames+' for IMDB ID "' + query + '" ...')
         else:
             ui_print('scraping sources '+servicenames+' for query "' + query + '" ...')
         ui_print('accepting titles that regex match "' + altquery + '" ...', debug=ui_settings.debug)
-        results = [None] * len(sequence)
-        threads = []
-        for index, scraper_ in enumerate(sequence):
-            t = Thread(target=multi_scrape, args=(scraper_, query, altquery, results, index))
-            threads.append(t)
+        # scrapers that scraped the same query recently return their cached releases
+        results = [cache.get(scraper_.name, query, altquery) for scraper_ in sequence]
+        pending = [index for index, result in enumerate(results) if result == None]
+        if len(pending) < len(sequence):
+            ui_print('using cached releases of [' + ",".join(sequence[index].name for index in range(len(sequence)) if not index in pending) + ']', debug=ui_settings.debug)
+        # each scraper hands in its releases as soon as it is done. in streaming mode, the remaining scrapers are cancelled once
+        # enough cached releases were found.
+        completed = [index for index in range(len(sequence)) if not index in pending]
+        remaining = list(pending)
+        scope = cancellation(token)
+        if len(remaining) > 0 and len(completed) > 0 and stream.sufficient(collect(results, completed)):
+            ui_print('found enough cached releases, skipping [' + ",".join(sequence[index].name for index in remaining) + ']')
+            remaining = []
+        done = queue.Queue()
+        with scope:
+            for index in remaining:
+                if aio.available():
+                    # scrape all sources concurrently on the event loop
+                    future = aio.submit(multi_scrape_async(sequence[index], query, altquery))
+                else:
+                    future = executor.scrapers.submit(sequence[index].name, multi_scrape, sequence[index], query, altquery)
+                future.add_done_callback(lambda future, index=index: done.put((index, future)))
+        # wait for the scrapers to complete, but no longer than the time budget of the calling thread
+        ttl = cache.ttl()
+        while len(remaining) > 0:
+            wait = token.remaining()
+            try:
+                index, future = done.get(timeout=1 if wait == None else min(1, wait))
+            except queue.Empty:
+                if token.cancelled():
+                    ui_print('scraping cancelled, not waiting for [' + ",".join(sequence[index].name for index in remaining) + ']')
+                    scope.cancel()
+                    break
+                continue
+            remaining.remove(index)
+            failed = False
             try:
-                t.start()
-            except:
-                ui_print("error starting new thread (perhaps maximum number of threads reached), will retry in 5 seconds and exit if it fails again.")
-                time.sleep(5)
-                t.start()
-        # wait for the threads to complete
-        for t in threads:
-            t.join()
-        for result in results:
-            if not result == [] and not result == None:
-                scraped_releases += result
+                results[index] = future.result()
+            except Exception as e:
+                ui_print('[' + sequence[index].name + '] error: (scrape exception): ' + str(e), ui_settings.debug)
+                results[index] = []
+                failed = True
+            completed += [index]
+            # results of failed scrapers arent cached, they would hide the scraper until the cache entry expires
+            if not failed and not token.cancelled() and breaker.get(sequence[index].name).state == 'closed':
+                cache.put(sequence[index].name, query, altquery, results[index], ttl)
+            if len(remaining) > 0 and not token.cancelled() and stream.sufficient(collect(results, completed)):
+                ui_print('found enough cached releases, cancelling [' + ",".join(sequence[index].name for index in remaining) + ']')
+                scope.cancel()
+                break
+        scraped_releases = merge(collect(results, completed))
         for release in scraped_releases:
             release.title = ''.join([i if ord(i) < 512 else '' for i in release.title])
         ui_print('done - found ' + str(len(scraped_releases)) + ' releases')
@@ -41,6 +80,188 @@ def scrape(query, altquery="(.*)"):
             break
     return scraped_releases
 
+def merge(scraped_releases, report=True):
+    # releases of the same torrent that were found by several scrapers or indexers are merged into one release: it keeps the
+    # most descriptive title, the most seeders and the sources and download links of all of them. releases without a hash
+    # are kept as they are. the merged release is a copy, the given releases arent changed, since they can be shared with
+    # the scraper cache.
+    torrents = {}
+    for release in scraped_releases:
+        key = release.hash.lower()
+        if not key == '':
+            torrents[key] = torrents.get(key, []) + [release]
+    if report:
+        metrics.count('releases_scraped', value=len(scraped_releases))
+    if len(scraped_releases) == 0 or all(len(duplicates) == 1 for duplicates in torrents.values()):
+        return scraped_releases
+    merged = []
+    for release in scraped_releases:
+        key = release.hash.lower()
+        if key == '':
+            merged += [release]
+            continue
+        if not key in torrents:
+            continue
+        duplicates = torrents.pop(key)
+        if len(duplicates) == 1:
+            merged += duplicates
+            continue
+        best = max(duplicates, key=lambda release: (len(regex.split(r'[\s\.\-_\[\]\(\)]+', release.title)), len(release.title)))
+        sources = []
+        download = []
+        for duplicate in [best] + [duplicate for duplicate in duplicates if not duplicate is best]:
+            for source in regex.findall(r'\[[^\]]*\]', duplicate.source) or [duplicate.source]:
+                if not source in sources:
+                    sources += [source]
+            for link in duplicate.download:
+                if not link in download:
+                    download += [link]
+        combined = copy.deepcopy(best)
+        combined.source = ' '.join(sources)
+        combined.download = download
+        combined.seeders = max(duplicate.seeders for duplicate in duplicates)
+        combined.size = max(duplicate.size for duplicate in duplicates)
+        merged += [combined]
+    if not report:
+        return merged
+    metrics.count('releases_merged', value=len(scraped_releases) - len(merged))
+    ui_print('merged ' + str(len(scraped_releases)) + ' releases into ' + str(len(merged)) + ' unique releases (' + str(round((1 - len(merged) / len(scraped_releases)) * 100)) + '% duplicates)', ui_settings.debug)
+    return merged
+
+class cache:
+    # Persistent cache of the releases each scraper found for a query, so that the same show-level query of every season and
+    # episode, the alternate titles and the retries of a media item arent scraped again and again. Entries expire depending on
+    # the age of the media item that is downloaded: releases of a recent episode change quickly, those of an old movie hardly
+    # ever. Empty results are only kept for the shortest time, since they might be caused by a failing scraper. The least
+    # recently used entries are dropped once the cache is full.
+    enabled = "true"
+    size = "2000"
+    # (age in days of the newest release of the media item, seconds the scraped releases are kept)
+    ttls = [(2, 900), (30, 7200), (365, 43200), (None, 259200)]
+    entries = collections.OrderedDict()
+    loaded = False
+    changed = False
+    lock = threading.Lock()
+    local = threading.local()
+
+    def key(name, query, altquery):
+        return (name, regex.sub(r'\s+', ' ', query.strip().lower()), altquery)
+
+    def load():
+        with cache.lock:
+            if cache.loaded:
+                return
+            cache.loaded = True
+            entries = store.load('scraper', 'cache')
+            if isinstance(entries, collections.OrderedDict):
+                cache.entries = entries
+
+    def save():
+        with cache.lock:
+            if not cache.changed:
+                return
+            now = time.time()
+            for key in [key for key, entry in cache.entries.items() if entry[0] <= now]:
+                del cache.entries[key]
+            cache.changed = False
+            entries = copy.copy(cache.entries)
+        store.save(entries, 'scraper', 'cache', ui_settings.debug)
+
+    def released(date):
+        # set the release date of the media item that this thread downloads, it decides how long its scrapes are cached
+        cache.local.released = date
+
+    def ttl():
+        date = getattr(cache.local, 'released', None)
+        if date == None:
+            return cache.ttls[0][1]
+        days = (datetime.datetime.utcnow() - date).days
+        for age, seconds in cache.ttls:
+            if age == None or days < age:
+                return seconds
+
+    def get(name, query, altquery):
+        # a copy of the cached releases, or None if the query isnt cached
+        if not cache.enabled == "true":
+            return None
+        cache.load()
+        key = cache.key(name, query, altquery)
+        with cache.lock:
+            entry = cache.entries.get(key, None)
+            if entry == None or entry[0] <= time.time():
+                return None
+            cache.entries.move_to_end(key)
+        metrics.count('scrape_cache_hits', name)
+        return copy.deepcopy(entry[1])
+
+    def put(name, query, altquery, scraped, ttl):
+        if not cache.enabled == "true" or not isinstance(scraped, list):
+            return
+        if len(scraped) == 0:
+            ttl = min(ttl, cache.ttls[0][1])
+        try:
+            size = max(0, int(cache.size))
+        except:
+            size = 2000
+        cache.load()
+        key = cache.key(name, query, altquery)
+        entry = (time.time() + ttl, copy.deepcopy(scraped))
+        with cache.lock:
+            cache.entries[key] = entry
+            cache.entries.move_to_end(key)
+            while len(cache.entries) > size:
+                cache.entries.popitem(last=False)
+            cache.changed = True
+
+class ids:
+    # Persistent cache of the ids that scrapers looked up by title (e.g. the imdb ids torrentio gets from cinemeta for plain
+    # text queries), so that the same title isnt looked up again for every episode and retry.
+    # (type, title): (expiry timestamp, id)
+    titles = {}
+    ttl = 2592000
+    loaded = False
+    changed = False
+    lock = threading.Lock()
+
+    def key(type, title):
+        return (type, regex.sub(r'\s+', ' ', title.strip().lower()))
+
+    def load():
+        with ids.lock:
+            if ids.loaded:
+                return
+            ids.loaded = True
+            titles = store.load('scraper', 'ids')
+            if isinstance(titles, dict):
+                ids.titles = titles
+
+    def save():
+        with ids.lock:
+            if not ids.changed:
+                return
+            now = time.time()
+            for key in [key for key, entry in ids.titles.items() if entry[0] <= now]:
+                del ids.titles[key]
+            ids.changed = False
+            titles = copy.copy(ids.titles)
+        store.save(titles, 'scraper', 'ids', ui_settings.debug)
+
+    def lookup(type, title):
+        # the cached id of a title, or None
+        ids.load()
+        with ids.lock:
+            entry = ids.titles.get(ids.key(type, title), None)
+        if entry == None or entry[0] <= time.time():
+            return None
+        metrics.count('id_cache_hits', type)
+        return entry[1]
+
+    def remember(type, title, id):
+        ids.load()
+        with ids.lock:
+            ids.titles[ids.key(type, title)] = (time.time() + ids.ttl, id)
+            ids.changed = True
+
 def traditional():
     scrapers = services.sequential()
     if len(scrapers) == 0:
@@ -51,6 +272,80 @@ def traditional():
                 return True
     return False
 
-# Multiprocessing scrape method
-def multi_scrape(cls, query, altquery, result, index):
-    result[index] = cls.scrape(query, altquery)
+def collect(results, completed):
+    # releases of the scrapers that completed, in the order of the scrapers
+    scraped_releases = []
+    for index in sorted(completed):
+        if isinstance(results[index], list):
+            scraped_releases += results[index]
+    return scraped_releases
+
+class stream:
+    # Streaming scrapes: once a scraper is done, its releases are checked for their debrid cache status right away, and the
+    # remaining (slower) scrapers are cancelled as soon as enough cached releases pass the requirements of every version of
+    # the media item that is downloaded. Off by default.
+    cached = "0"
+    local = threading.local()
+
+    def watch(element):
+        # set the media item that this thread downloads
+        stream.local.element = element
+
+    def sufficient(scraped_releases):
+        element = getattr(stream.local, 'element', None)
+        try:
+            count = int(stream.cached)
+        except:
+            count = 0
+        if element == None or count <= 0 or len(scraped_releases) < count or not hasattr(element, 'sufficient'):
+            return False
+        try:
+            return element.sufficient(merge(scraped_releases, False), count)
+        except Exception as e:
+            ui_print('[scraper] error: (streaming exception): ' + str(e), ui_settings.debug)
+            return False
+
+# Multiprocessing scrape method: runs in the scraper pool, under the cancellation token of the scrape
+def multi_scrape(cls, query, altquery):
+    token = cancellation.current()
+    result = []
+    if skipped(cls):
+        return result
+    with concurrency('scraper', cls.name):
+        if token.cancelled():
+            return result
+        with metrics.timer('scrape', cls.name):
+            try:
+                result = cls.scrape(query, altquery)
+            except cancelled:
+                result = []
+    metrics.count('releases', cls.name, len(result) if isinstance(result, list) else 0)
+    return result
+
+# scrapers are skipped while their circuit breaker is open
+def skipped(cls):
+    service = breaker.get(cls.name)
+    if service.blocked():
+        ui_print('[' + cls.name + '] skipped: service unavailable, retrying in ' + str(round(service.retry())) + ' seconds', ui_settings.debug)
+        return True
+    return False
+
+# Asynchronous scrape method: scrapers that have a scrape_async() run on the event loop, the others in a worker thread
+async def multi_scrape_async(cls, query, altquery):
+    token = aio.current()
+    result = []
+    if skipped(cls):
+        return result
+    async with aio.slot('scraper', cls.name):
+        if token.cancelled():
+            return result
+        with metrics.timer('scrape', cls.name):
+            try:
+                if hasattr(cls, 'scrape_async'):
+                    result = await cls.scrape_async(query, altquery)
+                else:
+                    result = await aio.call(cls.scrape, query, altquery)
+            except cancelled:
+                result = []
+    metrics.count('releases', cls.name, len(result) if isinstance(result, list) else 0)
+    return result
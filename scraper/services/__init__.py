@@ -13,7 +13,13 @@ def __subclasses__():
     return [rarbg,x1337,jackett,prowlarr,orionoid,nyaa,torrentio]
 
 active = ['torrentio']
-overwrite = []
+
+# scraper sequences forced by version triggers. kept per thread, so that parallel download workers dont overwrite each others scrapers.
+class thread_local(threading.local):
+    def __init__(self):
+        self.overwrite = []
+
+local = thread_local()
 
 def setup(cls, new=False):
     from settings import settings_list
@@ -66,10 +72,9 @@ def get():
     return activeservices
 
 def sequential():
-    global overwrite
     cls = sys.modules[__name__]
     activeservices = []
-    for sequence in overwrite:
+    for sequence in local.overwrite:
         activesequence = []
         for servicename in sequence:
             for service in cls.__subclasses__():
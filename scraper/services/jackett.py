@@ -8,7 +8,7 @@ api_key = ""
 name = "jackett"
 resolver_timeout = '1'
 filter = "!status:failing,test:passed"
-session = requests.Session()
+session = client(name, 'scraper')
 
 def setup(cls, new=False):
     from settings import settings_list
@@ -52,102 +52,130 @@ def setup(cls, new=False):
                 if not cls.name in active:
                     active += [cls.name]
 
-def scrape(query, altquery):
+def request(query):
+    # url of a jackett search, or None if jackett isnt active
     from scraper.services import active
     global base_url
-    scraped_releases = []
-    if 'jackett' in active:
-        if base_url.endswith('/'):
-            base_url = base_url[:-1]
-        url = base_url + '/api/v2.0/indexers/' + filter + '/results?apikey=' + api_key + '&Query=' + query
-        try:
-            response = session.get(url, timeout=60)
-        except requests.exceptions.Timeout:
-            ui_print('[jackett] error: jackett request timed out. Reduce the number of jackett indexers, make sure your indexers are healthy and enable the jackett setting "CORS".')
-            return []
-        except :
-            ui_print('[jackett] error: jackett couldnt be reached. Make sure your jackett base url is correctly formatted (default: http://localhost:9117).')
-            return []
-        if not response.status_code == 200:
-            if response.status_code in [401,403]:
-                ui_print('[jackett] error '+str(response.status_code)+': it seems your api key is not working.')
-            else:
-                ui_print('[jackett] error '+str(response.status_code)+': it seems jackett is reachable, but jackett returned an internal error.')
-            return []
-        try:
-            response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
-        except:
-            ui_print('[jackett] error: jackett didnt return any data.')
-            return []
-        for result in response.Results[:]:
-            result.Title = result.Title.replace(' ', '.')
-            result.Title = result.Title.replace(':', '').replace("'", '')
-            result.Title = regex.sub(r'\.+', ".", result.Title)
-            if regex.match(r'(' + altquery.replace('.', '\.').replace("\.*", ".*") + ')', result.Title,regex.I):
-                if not result.MagnetUri == None:
-                    if not result.Tracker == None and not result.Size == None:
-                        scraped_releases += [
-                            releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],float(result.Size) / 1000000000, [result.MagnetUri],seeders=result.Seeders)]
-                    elif not result.Tracker == None:
-                        scraped_releases += [
-                            releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],1, [result.MagnetUri], seeders=result.Seeders)]
-                    elif not result.Size == None:
-                        scraped_releases += [releases.release('[jackett: unnamed]', 'torrent', result.Title, [],float(result.Size) / 1000000000, [result.MagnetUri],seeders=result.Seeders)]
-                    response.Results.remove(result)
-            else:
-                response.Results.remove(result)
-        # Multiprocess resolving of result.Link for remaining releases
-        results = [None] * len(response.Results[:200])
-        threads = []
-        # start thread for each remaining release
-        for index, result in enumerate(response.Results[:200]):
-            t = Thread(target=multi_init, args=(resolve, result, results, index))
-            threads.append(t)
-            try:
-                t.start()
-            except:
-                ui_print("[jackett] error: couldnt start resolver thread - retrying.")
-                time.sleep(1)
-                t.start()
-        # wait for the threads to complete
-        for t in threads:
-            t.join()
-        for result in results:
-            if not result == [] and not result == None:
-                scraped_releases += result
-    return scraped_releases
+    if not 'jackett' in active:
+        return None
+    if base_url.endswith('/'):
+        base_url = base_url[:-1]
+    return base_url + '/api/v2.0/indexers/' + filter + '/results?apikey=' + api_key + '&Query=' + query
 
-def resolve(result):
+def error(e):
+    if isinstance(e, requests.exceptions.Timeout):
+        ui_print('[jackett] error: jackett request timed out. Reduce the number of jackett indexers, make sure your indexers are healthy and enable the jackett setting "CORS".')
+    else:
+        ui_print('[jackett] error: jackett couldnt be reached. Make sure your jackett base url is correctly formatted (default: http://localhost:9117).')
+
+def results(response, altquery):
+    # releases with a magnet link, and the remaining results whose link has to be resolved
     scraped_releases = []
+    if not response.status_code == 200:
+        if response.status_code in [401,403]:
+            ui_print('[jackett] error '+str(response.status_code)+': it seems your api key is not working.')
+        else:
+            ui_print('[jackett] error '+str(response.status_code)+': it seems jackett is reachable, but jackett returned an internal error.')
+        return [], []
     try:
-        link = session.get(result.Link, allow_redirects=False, timeout=float(resolver_timeout))
-        if 'Location' in link.headers:
-            if regex.search(r'(?<=btih:).*?(?=&)', str(link.headers['Location']), regex.I):
+        response = view.loads(response.content)
+    except:
+        ui_print('[jackett] error: jackett didnt return any data.')
+        return [], []
+    for result in response.Results[:]:
+        result.Title = result.Title.replace(' ', '.')
+        result.Title = result.Title.replace(':', '').replace("'", '')
+        result.Title = regex.sub(r'\.+', ".", result.Title)
+        if regex.match(r'(' + altquery.replace('.', '\.').replace("\.*", ".*") + ')', result.Title,regex.I):
+            if not result.MagnetUri == None:
                 if not result.Tracker == None and not result.Size == None:
                     scraped_releases += [
-                        releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],float(result.Size) / 1000000000, [link.headers['Location']],seeders=result.Seeders)]
+                        releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],float(result.Size) / 1000000000, [result.MagnetUri],seeders=result.Seeders)]
                 elif not result.Tracker == None:
                     scraped_releases += [
-                        releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [], 1,[link.headers['Location']], seeders=result.Seeders)]
+                        releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],1, [result.MagnetUri], seeders=result.Seeders)]
                 elif not result.Size == None:
-                    scraped_releases += [releases.release('[jackett: unnamed]', 'torrent', result.Title, [],float(result.Size) / 1000000000, [link.headers['Location']],seeders=result.Seeders)]
-            return scraped_releases
-        elif link.headers['Content-Type'] == "application/x-bittorrent":
-            magnet = releases.torrent2magnet(link.content)
+                    scraped_releases += [releases.release('[jackett: unnamed]', 'torrent', result.Title, [],float(result.Size) / 1000000000, [result.MagnetUri],seeders=result.Seeders)]
+                response.Results.remove(result)
+        else:
+            response.Results.remove(result)
+    return scraped_releases, response.Results[:200]
+
+def scrape(query, altquery):
+    url = request(query)
+    if url == None:
+        return []
+    try:
+        response = session.get(url, timeout=60)
+    except Exception as e:
+        error(e)
+        return []
+    scraped_releases, remaining = results(response, altquery)
+    # resolve the links of the remaining releases in the shared resolver pool
+    resolved = [future.result() for future in [executor.resolvers.submit(name, resolve, result) for result in remaining]]
+    for result in resolved:
+        if not result == [] and not result == None:
+            scraped_releases += result
+    return scraped_releases
+
+async def scrape_async(query, altquery):
+    import asyncio
+    url = request(query)
+    if url == None:
+        return []
+    try:
+        response = await aio.fetch(url, timeout=60, name=name)
+    except Exception as e:
+        error(e)
+        return []
+    scraped_releases, remaining = results(response, altquery)
+    # resolve the links of the remaining releases concurrently
+    for result in await asyncio.gather(*[resolve_async(result) for result in remaining]):
+        if not result == [] and not result == None:
+            scraped_releases += result
+    return scraped_releases
+
+def resolve(result):
+    try:
+        link = session.get(result.Link, allow_redirects=False, timeout=float(resolver_timeout), circuit=False)
+        return resolved(result, link)
+    except:
+        ui_print("[jackett] error: resolver couldnt get magnet/torrent for release: " + result.Title,ui_settings.debug)
+        return []
+
+async def resolve_async(result):
+    try:
+        link = await aio.fetch(result.Link, allow_redirects=False, timeout=float(resolver_timeout))
+        return resolved(result, link)
+    except Exception:
+        ui_print("[jackett] error: resolver couldnt get magnet/torrent for release: " + result.Title,ui_settings.debug)
+        return []
+
+def resolved(result, link):
+    # releases from the response of a resolved result link: either a redirect to a magnet link or a torrent file
+    scraped_releases = []
+    if 'Location' in link.headers:
+        if regex.search(r'(?<=btih:).*?(?=&)', str(link.headers['Location']), regex.I):
             if not result.Tracker == None and not result.Size == None:
                 scraped_releases += [
-                    releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],float(result.Size) / 1000000000, [magnet], seeders=result.Seeders)]
+                    releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],float(result.Size) / 1000000000, [link.headers['Location']],seeders=result.Seeders)]
             elif not result.Tracker == None:
                 scraped_releases += [
-                    releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [], 1, [magnet],seeders=result.Seeders)]
+                    releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [], 1,[link.headers['Location']], seeders=result.Seeders)]
             elif not result.Size == None:
-                scraped_releases += [
-                    releases.release('[jackett: unnamed]', 'torrent', result.Title, [], float(result.Size) / 1000000000,[magnet], seeders=result.Seeders)]
-            return scraped_releases
-    except:
-        ui_print("[jackett] error: resolver couldnt get magnet/torrent for release: " + result.Title,ui_settings.debug)
+                scraped_releases += [releases.release('[jackett: unnamed]', 'torrent', result.Title, [],float(result.Size) / 1000000000, [link.headers['Location']],seeders=result.Seeders)]
+        return scraped_releases
+    elif link.headers['Content-Type'] == "application/x-bittorrent":
+        magnet = releases.torrent2magnet(link.content)
+        if not result.Tracker == None and not result.Size == None:
+            scraped_releases += [
+                releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [],float(result.Size) / 1000000000, [magnet], seeders=result.Seeders)]
+        elif not result.Tracker == None:
+            scraped_releases += [
+                releases.release('[jackett: ' + str(result.Tracker) + ']', 'torrent', result.Title, [], 1, [magnet],seeders=result.Seeders)]
+        elif not result.Size == None:
+            scraped_releases += [
+                releases.release('[jackett: unnamed]', 'torrent', result.Title, [], float(result.Size) / 1000000000,[magnet], seeders=result.Seeders)]
         return scraped_releases
+    return scraped_releases
 
-# Multiprocessing watchlist method
-def multi_init(cls, obj, result, index):
-    result[index] = cls(obj)
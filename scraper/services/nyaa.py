@@ -4,7 +4,7 @@ from ui.ui_print import *
 import releases
 
 name = "nyaa"
-session = requests.Session()
+session = client(name, 'scraper')
 params = "&c=1_0&s=seeders&o=desc"
 proxy = 'nyaa.si'
 proxies = ["nyaa.sbs", "nya.iss.one",]
@@ -50,6 +50,7 @@ def get(url):
     
 def scrape(query, altquery):
     from scraper.services import active
+    from bs4 import BeautifulSoup
     global proxy
     scraped_releases = []
     if 'nyaa' in active:
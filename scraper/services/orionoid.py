@@ -10,14 +10,13 @@ client_id = "GPQJBFGJKAHVFM37LJDNNLTHKJMXEAJJ"
 default_opts = [["limitcount", "5"], ["sortvalue", "popularity"], [
     "streamtype", "torrent"], ["filename", "true"]]
 
-session = custom_session()
+session = custom_session(name=name)
 
 
 def get(url):
     try:
         response = session.get(url, timeout=60)
-        response = json.loads(
-            response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
         return response
     except:
         return None
@@ -6,97 +6,130 @@ import releases
 base_url = "http://127.0.0.1:9696"
 api_key = ""
 name = "prowlarr"
-session = requests.Session()
+session = client(name, 'scraper')
 
 def setup(cls, new=False):
     from scraper.services import setup
     setup(cls,new)
 
-def scrape(query, altquery):
+def request(query):
+    # url and headers of a prowlarr search, or None if prowlarr isnt active
     from scraper.services import active
+    if not 'prowlarr' in active:
+        return None, None
+    return base_url + '/api/v1/search?query=' + query + '&type=search&limit=1000&offset=0', {'X-Api-Key': api_key}
+
+def error(e):
+    if isinstance(e, requests.exceptions.Timeout):
+        ui_print('[prowlarr] error: prowlarr request timed out. Reduce the number of prowlarr indexers or make sure they are healthy.')
+    else:
+        ui_print('[prowlarr] error: prowlarr couldnt be reached. Make sure your prowlarr base url is correctly formatted (default: http://localhost:9696).')
+
+def results(response, altquery):
+    # releases with a magnet link, and the remaining results whose download url has to be resolved
     scraped_releases = []
-    if 'prowlarr' in active:
-        url = base_url + '/api/v1/search?query=' + query + '&type=search&limit=1000&offset=0'
-        headers = {'X-Api-Key': api_key}
-        try:
-            response = session.get(url, headers=headers, timeout=60)
-        except requests.exceptions.Timeout:
-            ui_print('[prowlarr] error: prowlarr request timed out. Reduce the number of prowlarr indexers or make sure they are healthy.')
-            return []
-        except :
-            ui_print('[prowlarr] error: prowlarr couldnt be reached. Make sure your prowlarr base url is correctly formatted (default: http://localhost:9696).')
-            return []
-        if response.status_code == 200:
-            try:
-                response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
-            except:
-                ui_print('[prowlarr] error: prowlarr didnt return any data.')
-                return []
-            for result in response[:]:
-                result.title = result.title.replace(' ', '.')
-                result.title = result.title.replace(':', '').replace("'", '')
-                result.title = regex.sub(r'\.+', ".", result.title)
-                if regex.match(r'(' + altquery.replace('.', '\.').replace("\.*", ".*") + ')', result.title,regex.I) and result.protocol == 'torrent':
-                    if hasattr(result, 'magnetUrl'):
-                        if not result.magnetUrl == None:
-                            if not result.indexer == None and not result.size == None:
-                                scraped_releases += [
-                                    releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title,[], float(result.size) / 1000000000, [result.magnetUrl],seeders=result.seeders)]
-                            elif not result.indexer == None:
-                                scraped_releases += [
-                                    releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title,[], 1, [result.magnetUrl], seeders=result.seeders)]
-                            elif not result.size == None:
-                                scraped_releases += [
-                                    releases.release('[prowlarr: unnamed]', 'torrent', result.title, [],float(result.size) / 1000000000, [result.magnetUrl],seeders=result.seeders)]
-                            response.remove(result)
-                else:
+    if not response.status_code == 200:
+        return [], []
+    try:
+        response = view.loads(response.content)
+    except:
+        ui_print('[prowlarr] error: prowlarr didnt return any data.')
+        return [], []
+    for result in response[:]:
+        result.title = result.title.replace(' ', '.')
+        result.title = result.title.replace(':', '').replace("'", '')
+        result.title = regex.sub(r'\.+', ".", result.title)
+        if regex.match(r'(' + altquery.replace('.', '\.').replace("\.*", ".*") + ')', result.title,regex.I) and result.protocol == 'torrent':
+            if hasattr(result, 'magnetUrl'):
+                if not result.magnetUrl == None:
+                    if not result.indexer == None and not result.size == None:
+                        scraped_releases += [
+                            releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title,[], float(result.size) / 1000000000, [result.magnetUrl],seeders=result.seeders)]
+                    elif not result.indexer == None:
+                        scraped_releases += [
+                            releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title,[], 1, [result.magnetUrl], seeders=result.seeders)]
+                    elif not result.size == None:
+                        scraped_releases += [
+                            releases.release('[prowlarr: unnamed]', 'torrent', result.title, [],float(result.size) / 1000000000, [result.magnetUrl],seeders=result.seeders)]
                     response.remove(result)
-            # Multiprocess resolving of result.Link for remaining releases
-            results = [None] * len(response)
-            threads = []
-            # start thread for each remaining release
-            for index, result in enumerate(response):
-                t = Thread(target=multi_init, args=(resolve, result, results, index))
-                threads.append(t)
-                t.start()
-            # wait for the threads to complete
-            for t in threads:
-                t.join()
-            for result in results:
-                if not result == [] and not result == None:
-                    scraped_releases += result
+        else:
+            response.remove(result)
+    return scraped_releases, response
+
+def scrape(query, altquery):
+    url, headers = request(query)
+    if url == None:
+        return []
+    try:
+        response = session.get(url, headers=headers, timeout=60)
+    except Exception as e:
+        error(e)
+        return []
+    scraped_releases, remaining = results(response, altquery)
+    # resolve the links of the remaining releases in the shared resolver pool
+    resolved = [future.result() for future in [executor.resolvers.submit(name, resolve, result) for result in remaining]]
+    for result in resolved:
+        if not result == [] and not result == None:
+            scraped_releases += result
+    return scraped_releases
+
+async def scrape_async(query, altquery):
+    import asyncio
+    url, headers = request(query)
+    if url == None:
+        return []
+    try:
+        response = await aio.fetch(url, headers=headers, timeout=60, name=name)
+    except Exception as e:
+        error(e)
+        return []
+    scraped_releases, remaining = results(response, altquery)
+    # resolve the download urls of the remaining releases concurrently
+    for result in await asyncio.gather(*[resolve_async(result) for result in remaining]):
+        if not result == [] and not result == None:
+            scraped_releases += result
     return scraped_releases
 
 def resolve(result):
-    scraped_releases = []
     try:
-        link = session.get(result.downloadUrl, allow_redirects=False, timeout=1)
-        if 'Location' in link.headers:
-            if regex.search(r'(?<=btih:).*?(?=&)', str(link.headers['Location']), regex.I):
-                if not result.indexer == None and not result.size == None:
-                    scraped_releases += [
-                        releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [],float(result.size) / 1000000000, [link.headers['Location']],seeders=result.seeders)]
-                elif not result.indexer == None:
-                    scraped_releases += [
-                        releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [], 1,[link.headers['Location']], seeders=result.seeders)]
-                elif not result.size == None:
-                    scraped_releases += [releases.release('[prowlarr: unnamed]', 'torrent', result.title, [],float(result.size) / 1000000000, [link.headers['Location']],seeders=result.seeders)]
-            return scraped_releases
-        elif link.headers['Content-Type'] == "application/x-bittorrent":
-            magnet = releases.torrent2magnet(link.content)
+        link = session.get(result.downloadUrl, allow_redirects=False, timeout=1, circuit=False)
+        return resolved(result, link)
+    except:
+        ui_print("[prowlarr] error: resolver couldnt get magnet/torrent for release: " + result.title,ui_settings.debug)
+        return []
+
+async def resolve_async(result):
+    try:
+        link = await aio.fetch(result.downloadUrl, allow_redirects=False, timeout=1)
+        return resolved(result, link)
+    except Exception:
+        ui_print("[prowlarr] error: resolver couldnt get magnet/torrent for release: " + result.title,ui_settings.debug)
+        return []
+
+def resolved(result, link):
+    # releases from the response of a resolved download url: either a redirect to a magnet link or a torrent file
+    scraped_releases = []
+    if 'Location' in link.headers:
+        if regex.search(r'(?<=btih:).*?(?=&)', str(link.headers['Location']), regex.I):
             if not result.indexer == None and not result.size == None:
                 scraped_releases += [
-                    releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [],float(result.size) / 1000000000, [magnet], seeders=result.seeders)]
+                    releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [],float(result.size) / 1000000000, [link.headers['Location']],seeders=result.seeders)]
             elif not result.indexer == None:
                 scraped_releases += [
-                    releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [], 1,[magnet], seeders=result.seeders)]
+                    releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [], 1,[link.headers['Location']], seeders=result.seeders)]
             elif not result.size == None:
-                scraped_releases += [releases.release('[prowlarr: unnamed]', 'torrent', result.title, [],float(result.size) / 1000000000, [magnet],seeders=result.seeders)]
-            return scraped_releases
-    except:
-        ui_print("[prowlarr] error: resolver couldnt get magnet/torrent for release: " + result.title,ui_settings.debug)
+                scraped_releases += [releases.release('[prowlarr: unnamed]', 'torrent', result.title, [],float(result.size) / 1000000000, [link.headers['Location']],seeders=result.seeders)]
         return scraped_releases
-    
-# Multiprocessing watchlist method
-def multi_init(cls, obj, result, index):
-    result[index] = cls(obj)
+    elif link.headers['Content-Type'] == "application/x-bittorrent":
+        magnet = releases.torrent2magnet(link.content)
+        if not result.indexer == None and not result.size == None:
+            scraped_releases += [
+                releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [],float(result.size) / 1000000000, [magnet], seeders=result.seeders)]
+        elif not result.indexer == None:
+            scraped_releases += [
+                releases.release('[prowlarr: ' + str(result.indexer) + ']', 'torrent', result.title, [], 1,[magnet], seeders=result.seeders)]
+        elif not result.size == None:
+            scraped_releases += [releases.release('[prowlarr: unnamed]', 'torrent', result.title, [],float(result.size) / 1000000000, [magnet],seeders=result.seeders)]
+        return scraped_releases
+    return scraped_releases
+
@@ -5,7 +5,7 @@ import releases
 
 name = "rarbg"
 token = 'r05xvbq6ul'
-session = requests.Session()
+session = client(name, 'scraper')
 
 def setup(cls, new=False):
     from scraper.services import setup
@@ -30,7 +30,7 @@ def scrape(query, altquery):
             try:
                 response = session.get(url, headers=headers)
                 if not response.status_code == 429:
-                    response = json.loads(response.content, object_hook=lambda d: SimpleNamespace(**d))
+                    response = view.loads(response.content)
                     if hasattr(response, "error"):
                         if 'Invalid token' in response.error:
                             ui_print('rarbg error: ' + response.error, debug=ui_settings.debug)
@@ -38,8 +38,7 @@ def scrape(query, altquery):
                             url = 'https://torrentapi.org/pubapi_v2.php?get_token=get_token&app_id=fuckshit'
                             response = session.get(url, headers=headers)
                             if len(response.content) > 5:
-                                response = json.loads(response.content,
-                                                        object_hook=lambda d: SimpleNamespace(**d))
+                                response = view.loads(response.content)
                                 token = response.token
                             else:
                                 ui_print('rarbg error: could not fetch new token', debug=ui_settings.debug)
@@ -7,19 +7,40 @@ name = "torrentio"
 
 default_opts = "https://torrentio.strem.fun/sort=qualitysize|qualityfilter=480p,scr,cam/manifest.json"
 
-session = custom_session()
+session = custom_session(rate=1, burst=5, name=name)
+# requests that are in flight
+inflight = flight()
 
 
 def get(url):
+    # identical concurrent requests (e.g. the imdb lookups of several episodes of a show) share one response
+    return inflight.do(flight.key(url), request, url)
+
+
+def request(url):
     try:
         response = session.get(url, timeout=60)
-        response = json.loads(
-            response.content, object_hook=lambda d: SimpleNamespace(**d))
+        response = view.loads(response.content)
         return response
     except:
         return None
 
 
+def search(title, type):
+    # imdb id of a title, from the id cache or the cinemeta search
+    from scraper import ids
+    imdb = ids.lookup(type, title)
+    if not imdb == None:
+        return imdb
+    url = "https://v3-cinemeta.strem.io/catalog/" + ("series" if type == "show" else "movie") + "/top/search=" + title + ".json"
+    try:
+        imdb = get(url).metas[0].imdb_id
+    except:
+        return None
+    ids.remember(type, title, imdb)
+    return imdb
+
+
 def setup(cls, new=False):
     from settings import settings_list
     from scraper.services import active
@@ -83,28 +104,16 @@ def scrape(query, altquery):
         query = regex.search(r'(tt[0-9]+)', altquery, regex.I).group()
     else:
         plain_text = copy.deepcopy(query)
-        try:
-            if type == "show":
-                url = "https://v3-cinemeta.strem.io/catalog/series/top/search=" + query + ".json"
-                meta = get(url)
+        query = search(plain_text, type)
+        if query == None:
+            if type == "movie":
+                type = "show"
+                s = 1
+                e = 1
             else:
-                url = "https://v3-cinemeta.strem.io/catalog/movie/top/search=" + query + ".json"
-                meta = get(url)
-            query = meta.metas[0].imdb_id
-        except:
-            try:
-                if type == "movie":
-                    type = "show"
-                    s = 1
-                    e = 1
-                    url = "https://v3-cinemeta.strem.io/catalog/series/top/search=" + query + ".json"
-                    meta = get(url)
-                else:
-                    type = "movie"
-                    url = "https://v3-cinemeta.strem.io/catalog/movie/top/search=" + query + ".json"
-                    meta = get(url)
-                query = meta.metas[0].imdb_id
-            except:
+                type = "movie"
+            query = search(plain_text, type)
+            if query == None:
                 ui_print('[torrentio] error: could not find IMDB ID')
                 return scraped_releases
     if type == "movie":
@@ -116,11 +125,8 @@ def scrape(query, altquery):
             s = 1
             e = 1
             if plain_text != "":
-                try:
-                    url = "https://v3-cinemeta.strem.io/catalog/series/top/search=" + plain_text + ".json"
-                    meta = get(url)
-                    query = meta.metas[0].imdb_id
-                except:
+                query = search(plain_text, type)
+                if query == None:
                     ui_print('[torrentio] error: could not find IMDB ID')
                     return scraped_releases
     if type == "show":
@@ -4,7 +4,7 @@ from ui.ui_print import *
 import releases
 
 name = "1337x"
-session = requests.Session()
+session = client(name, 'scraper')
 
 def setup(cls, new=False):
     from scraper.services import setup
@@ -12,6 +12,7 @@ def setup(cls, new=False):
 
 def scrape(query, altquery):
     from scraper.services import active
+    from bs4 import BeautifulSoup
     scraped_releases = []
     if '1337x' in active:
         headers = {
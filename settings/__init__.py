@@ -408,10 +408,53 @@ settings_list = [
                 debrid.services.putio, 'api_key', hidden=True, oauth=True),
     ]
         ],
+    ['Performance Settings', [
+        setting('Download workers', 'Please enter the number of media items that should be processed at the same time (e.g. 4): ', ui_settings, 'workers',
+                help='plex_debrid can process multiple media items of your watchlists at the same time, so that a single slow item does not stall all others. By default, items are processed one after another.'),
+        setting('Scraper concurrency', 'Please enter the maximum number of concurrent scrapes per scraper (e.g. 4): ', concurrency, 'scraper',
+                help='When multiple media items are processed at the same time, this limits how many of them can use the same scraper at once.'),
+        setting('Debrid concurrency', 'Please enter the maximum number of concurrent requests per debrid service (e.g. 2): ', concurrency, 'debrid',
+                help='When multiple media items are processed at the same time, this limits how many of them can check or add releases on the same debrid service at once.'),
+        setting('Request rate limits', 'Please enter custom rate limits as host=requests per second/burst, separated by commas (e.g. torrentio.strem.fun=2/5): ', limiter, 'rates',
+                help='plex_debrid limits the requests to each service to the rate the service allows. Here you can override these limits, or limit additional hosts. Limits of a single http method are entered as e.g. POST api.trakt.tv=1/1. Leave empty to use the default limits.'),
+        setting('Request timeout', 'Please enter the default timeout (in seconds) of requests to the services (e.g. 60): ', client, 'timeout',
+                help='Requests to the services that dont set their own timeout are given up after this many seconds.'),
+        setting('Retry budget', 'Please enter the maximum number of seconds to wait for retries of a single rate limited or unavailable request (e.g. 60): ', backoff, 'budget',
+                help='Rate limited and temporarily unavailable requests are retried after the time the service asks for, or with an exponentially growing delay. A request is given up once its retries would wait longer than this budget.'),
+        setting('Metadata concurrency', 'Please enter the maximum number of concurrent plex/trakt metadata requests (e.g. 4): ', concurrency, 'metadata',
+                help='Limits how many plex and trakt metadata requests can be made at the same time.'),
+        setting('Media recheck interval', 'Please enter the number of seconds after which a monitored media item should be checked again (e.g. 1800): ', content.schedule, 'interval',
+                help='plex_debrid only checks monitored media items when they are due. Items that could not be downloaded are retried after 30 minutes, unreleased items are checked once they are released and everything else is checked again after this interval. The watchlists are refreshed completely at the same interval.'),
+        setting('Item time budget', 'Please enter the maximum number of seconds a single media item may take to process, or 0 for no limit (e.g. 600): ', cancellation, 'item_budget',
+                help='Once a media item exceeds this time budget, its remaining scrapes and debrid requests are cancelled and the item is checked again later. By default, there is no limit.'),
+        setting('Cycle time budget', 'Please enter the maximum number of seconds a download cycle may take, or 0 for no limit (e.g. 3600): ', cancellation, 'cycle_budget',
+                help='Once a download cycle exceeds this time budget, the media items that were not started yet are skipped and checked again in the next cycle. By default, there is no limit.'),
+        setting('Circuit breaker failures', 'Please enter the number of consecutive failed requests after which a scraper or debrid service is skipped (e.g. 5): ', breaker, 'failures',
+                help='When a scraper or debrid service is down, plex_debrid stops waiting for its requests to time out: after this many failed requests in a row, the service is skipped until its cooldown has passed. The current state of all services is shown in the "Service Status" menu.'),
+        setting('Circuit breaker cooldown', 'Please enter the number of seconds a failing scraper or debrid service is skipped before it is tried again (e.g. 60): ', breaker, 'cooldown',
+                help='Once the cooldown has passed, a single request checks whether the service is back. If it still fails, the service is skipped for twice as long (up to an hour).'),
+        setting('Scrape cache', 'Please enter "true" or "false": ', scraper.cache, 'enabled',
+                help='plex_debrid remembers the releases each scraper found for a query, so that the seasons and episodes of a show and the retries of a media item dont scrape the same query again. Releases of recent episodes are kept for 15 minutes, those of older media for up to 3 days.'),
+        setting('Scrape cache size', 'Please enter the maximum number of scraped queries that should be cached (e.g. 2000): ', scraper.cache, 'size',
+                help='Once the scrape cache is full, the least recently used queries are dropped.'),
+        setting('Streaming scrape', 'Please enter the number of cached releases per version after which the remaining scrapers are cancelled, or 0 to always wait for all scrapers (e.g. 10): ', scraper.stream, 'cached',
+                help='By default, plex_debrid waits for all scrapers to finish before it checks the scraped releases. In streaming mode, the releases of each scraper are checked as soon as it is done, and the remaining (slower) scrapers are cancelled once this many cached releases pass the requirements of every version of the media item.'),
+        setting('Async networking', 'Please enter "true" or "false": ', aio, 'enabled',
+                help='If the aiohttp package is installed, plex_debrid makes the requests of jackett, prowlarr, real debrid and alldebrid on a single asyncio event loop instead of a thread per request. Turn this off to always use the threaded requests.'),
+        setting('Async connections', 'Please enter the maximum number of open connections of the async networking (e.g. 100): ', aio, 'connections',
+                help='Limits how many connections the async networking keeps open at the same time, across all services.'),
+        setting('Worker pool size', 'Please enter the maximum number of worker threads per pool (e.g. 32): ', executor, 'size',
+                help='Without async networking, scrapers and the link resolvers of jackett and prowlarr run on two persistent pools of worker threads instead of a new thread per request. Each pool starts at most this many threads, idle threads exit after a minute.'),
+    ]
+        ],
     ['UI Settings', [
         setting('Show Menu on Startup', 'Please enter "true" or "false": ', ui_settings, 'run_directly'),
         setting('Debug printing', 'Please enter "true" or "false": ', ui_settings, 'debug'),
         setting('Log to file', 'Please enter "true" or "false": ', ui_settings, 'log'),
+        setting('Log file size', 'Please enter the size (in MB) after which the log file is rotated, or 0 to never rotate it (e.g. 10): ', ui_settings, 'log_size',
+                help='Once plex_debrid.log is larger than this size, it is renamed to plex_debrid.log.1 and a new log file is started.'),
+        setting('Log file count', 'Please enter the number of rotated log files that should be kept (e.g. 3): ', ui_settings, 'log_files',
+                help='Rotated log files are kept as plex_debrid.log.1, plex_debrid.log.2 and so on, the oldest one is deleted.'),
         setting('version', 'No snooping around! :D This is for compatability reasons.', ui_settings, 'version',
                 hidden=True),
     ]
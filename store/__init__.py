@@ -1,4 +1,4 @@
-def load(module,variable):
+def load(module,variable,debug="true"):
     from ui.ui_print import ui_print
     from ui.ui_print import ui_settings
     from ui.ui_print import config_dir
@@ -8,16 +8,16 @@ def load(module,variable):
     try:
         filename = config_dir + '/' + module + "_" + variable + '.pkl'
         if os.path.exists(filename):
-            ui_print("["+module+"] reading cached "+variable+" file ...")
+            ui_print("["+module+"] reading cached "+variable+" file ...",debug)
             with open(filename, 'rb') as f:
                 cache = pickle.load(f)
-            ui_print("done")
+            ui_print("done",debug)
     except:
         ui_print("["+module+"] error: couldnt read cached "+variable+" file.")       
         cache = []
     return cache
 
-def save(cache,module,variable):
+def save(cache,module,variable,debug="true"):
     from ui.ui_print import ui_print
     from ui.ui_print import ui_settings
     from ui.ui_print import config_dir
@@ -25,9 +25,193 @@ def save(cache,module,variable):
     from base import os
     try:
         filename = config_dir + '/' + module + "_" + variable + '.pkl'
-        ui_print("["+module+"] writing cached "+variable+" file ...")    
+        ui_print("["+module+"] writing cached "+variable+" file ...",debug)    
         with open(filename, 'wb') as f:
             pickle.dump(cache, f)
-        ui_print("done")
+        ui_print("done",debug)
     except:
         ui_print("["+module+"] error: couldnt write cached "+variable+" file.") 
+
+class keys:
+    # Index of hashable journal items (e.g. strings), with a value per item. Journals of items that arent hashable,
+    # like media items, use content.classes.catalog, which has the same methods.
+    def __init__(self):
+        self.entries = {}
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def get(self, item, default=None):
+        return item if item in self.entries else default
+
+    def value(self, item, default=None):
+        return self.entries.get(item, default)
+
+    def add(self, item, value=None):
+        self.entries[item] = value
+
+    def pop(self, item, default=None):
+        return self.entries.pop(item, default)
+
+class journal(list):
+    # A list that is persisted incrementally: every change is appended to a journal file next to the
+    # cached pickle file, instead of rewriting the whole file. load() merges the journal into the cached file,
+    # compact() does the same once the journal has grown past limit entries. Items of a journal with an expiry
+    # (in seconds) are dropped on load once they were added longer ago than that. Membership checks use an index
+    # of the items (keys, or the given index class), which also keeps the time each item was added.
+    limit = 1000
+
+    def __init__(self,module,variable,expiry=None,index=None):
+        import threading
+        super().__init__()
+        self.module = module
+        self.variable = variable
+        self.expiry = expiry
+        self.factory = keys if index == None else index
+        # item: [number of equal items in the list, time the last one was added]
+        self.index = self.factory()
+        self.entries = 0
+        self.lock = threading.RLock()
+
+    def filename(self):
+        from ui.ui_print import config_dir
+        return config_dir + '/' + self.module + "_" + self.variable + '.journal'
+
+    def write(self,operation,item):
+        from ui.ui_print import ui_print
+        from ui.ui_print import ui_settings
+        from base import pickle
+        from base import time
+        try:
+            with self.lock:
+                with open(self.filename(), 'ab') as f:
+                    pickle.dump((operation,item,time.time()), f)
+                self.entries += 1
+        except Exception as e:
+            ui_print("["+self.module+"] error: couldnt write "+self.variable+" journal: " + str(e), ui_settings.debug)
+
+    def track(self,item,stamp):
+        entry = self.index.value(item)
+        if entry == None:
+            self.index.add(item, [1, stamp])
+        else:
+            entry[0] += 1
+            entry[1] = stamp
+
+    def untrack(self,item):
+        entry = self.index.value(item)
+        if entry == None:
+            return
+        entry[0] -= 1
+        if entry[0] <= 0:
+            self.index.pop(item)
+        else:
+            # the index may still hold the removed item, point it at an equal one that is left
+            self.index.add(next(x for x in self if x == item), entry)
+
+    def __contains__(self,item):
+        return item in self.index
+
+    def get(self,item,default=None):
+        # the item of the list that is equal to the given item
+        return self.index.get(item, default)
+
+    def __iadd__(self,items):
+        from base import time
+        items = list(items)
+        with self.lock:
+            super().__iadd__(items)
+            for item in items:
+                self.track(item, time.time())
+                self.write('add',item)
+        return self
+
+    def append(self,item):
+        self.__iadd__([item])
+
+    def remove(self,item):
+        with self.lock:
+            super().remove(item)
+            self.untrack(item)
+            self.write('remove',item)
+
+    def update(self,item):
+        # record a change of an item that is already in the list
+        self.write('update',item)
+
+    def dump(self):
+        # write the list to the cached file and start a new journal
+        from ui.ui_print import ui_print
+        from ui.ui_print import ui_settings
+        from base import os
+        from base import time
+        with self.lock:
+            if self.expiry == None:
+                cache = list(self)
+            else:
+                now = time.time()
+                cache = [(self.index.value(item, [0, now])[1], item) for item in self]
+            save(cache,self.module,self.variable,ui_settings.debug)
+            self.entries = 0
+            if not os.path.exists(self.filename()):
+                return
+            try:
+                os.remove(self.filename())
+            except:
+                ui_print("["+self.module+"] error: couldnt remove "+self.variable+" journal.")
+
+    def compact(self):
+        with self.lock:
+            if self.entries >= journal.limit:
+                self.dump()
+
+    def load(self):
+        from ui.ui_print import ui_print
+        from base import pickle
+        from base import os
+        from base import time
+        now = time.time()
+        with self.lock:
+            cache = load(self.module,self.variable)
+            if not isinstance(cache, list):
+                cache = []
+            # (time added, item) pairs. the cached file of a journal with an expiry holds them, the others hold the items only
+            if self.expiry == None:
+                cache = [(now, item) for item in cache]
+            else:
+                cache = [entry if isinstance(entry, tuple) and len(entry) == 2 else (now, entry) for entry in cache]
+            items = [item for stamp, item in cache]
+            filename = self.filename()
+            journaled = os.path.exists(filename)
+            if journaled:
+                try:
+                    with open(filename, 'rb') as f:
+                        while True:
+                            try:
+                                record = pickle.load(f)
+                            except EOFError:
+                                break
+                            operation, item = record[0], record[1]
+                            if operation == 'add':
+                                cache.append((record[2] if len(record) > 2 else now, item))
+                                items.append(item)
+                            elif item in items:
+                                index = items.index(item)
+                                if operation == 'remove':
+                                    del cache[index]
+                                    del items[index]
+                                elif operation == 'update':
+                                    cache[index] = (cache[index][0], item)
+                                    items[index] = item
+                except Exception:
+                    ui_print("["+self.module+"] error: couldnt read all of the "+self.variable+" journal, the rest is skipped.")
+            expired = []
+            if not self.expiry == None:
+                expired = [entry for entry in cache if entry[0] <= now - self.expiry]
+                cache = [entry for entry in cache if entry[0] > now - self.expiry]
+            self[:] = [item for stamp, item in cache]
+            self.index = self.factory()
+            for stamp, item in cache:
+                self.track(item, stamp)
+            if journaled or len(expired) > 0:
+                self.dump()
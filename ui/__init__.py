@@ -56,6 +56,29 @@ def ignored():
             back = True
     options()
 
+def status():
+    back = False
+    while not back:
+        ui_cls('Options/Service Status/')
+        services = breaker.status()
+        if len(services) == 0:
+            print('No scraper or debrid service has been used yet.')
+        for service in services:
+            if service.state == 'closed':
+                state = 'available'
+            elif service.blocked():
+                state = 'unavailable, skipped for another ' + str(round(service.retry())) + ' seconds'
+            else:
+                state = 'unavailable, checking whether it is back'
+            print(service.name + ': ' + state + ' (' + str(service.count) + ' failed requests in a row)')
+        print()
+        print('0) Back')
+        print()
+        choice = input('Press enter to refresh: ')
+        if choice == '0':
+            back = True
+    options()
+
 def scrape():
     ui_cls('Options/Scraper/')
     print('Press Enter to return to the main menu.')
@@ -94,12 +117,12 @@ def scrape():
                     if trigger == "scraper sources":
                         if operator in ["==","include"]:
                             if value in scraper.services.active:
-                                scraper.services.overwrite += [value]
+                                scraper.services.local.overwrite += [value]
                         elif operator == "exclude":
                             if value in scraper.services.active:
                                 for s in scraper.services.active:
                                     if not s == value:
-                                        scraper.services.overwrite += [s]
+                                        scraper.services.local.overwrite += [s]
                     if trigger == "scraping adjustment":
                         if operator == "add text before title":
                             query = value + query
@@ -224,6 +247,7 @@ def options():
         option('Settings', current_module, 'settings'),
         option('Ignored Media', current_module, 'ignored'),
         option('Scraper', current_module, 'scrape'),
+        option('Service Status', current_module, 'status'),
     ]
     ui_cls('Options/',update=update_available())
     for index, option_ in enumerate(list):
@@ -336,12 +360,25 @@ def preflight():
         return False
     return True
 
+def restore():
+    # load the run state of the last run
+    content.classes.media.ignore_queue.load()
+    content.classes.media.downloaded_versions.load()
+    debrid.downloading.load()
+
+def compact():
+    # merge the journals of the run state into their cached files once they grew too long
+    content.classes.media.ignore_queue.compact()
+    content.classes.media.downloaded_versions.compact()
+    debrid.downloading.compact()
+
 def run(cdir = "", smode = False):
     global config_dir
     global service_mode
     config_dir = cdir
     service_mode = smode
     set_log_dir(config_dir)
+    restore()
     if setup():
         #uvicorn.run("webui:app", port=8008, reload=True)
         options()
@@ -386,146 +423,278 @@ def update(settings, version):
 
 def unique(lst):
     unique_objects = []
+    known = content.classes.catalog()
     for obj in lst:
-        is_unique = True
-        for unique_obj in unique_objects:
-            if unique_obj == obj:
-                is_unique = False
-                break
-        if is_unique:
+        if not obj in known:
             unique_objects.append(obj)
+            known.add(obj)
     return unique_objects
 
-def threaded(stop):
-    ui_cls()
-    if service_mode == True:
-        print("Running in service mode, user input not supported.")
-    else:
-        print("Type 'exit' to return to the main menu.")
-    timeout = 5
-    regular_check = 1800
-    timeout_counter = 0
-    library = content.classes.library()[0]()
-    # get entire plex_watchlist
-    plex_watchlist = content.services.plex.watchlist()
-    # get entire trakt_watchlist
-    trakt_watchlist = content.services.trakt.watchlist()
-    # get all overseerr request
-    overseerr_requests = content.services.overseerr.requests()
+class workers:
+    # A bounded pool of download threads. Media items are queued with a priority (lower runs first)
+    # so that newly watchlisted content is picked up before the remaining items of a running pass.
+    def __init__(self, count):
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.pending = 0
+        self.skipped = []
+        self.condition = threading.Condition()
+        self.threads = []
+        for i in range(count):
+            t = Thread(target=self.work, daemon=True)
+            self.threads.append(t)
+            t.start()
+
+    def put(self, element, library, priority=1, token=None):
+        # items are processed under their own cancellation token, a child of the given (cycle) token
+        if token == None:
+            token = cancellation.root
+        with self.condition:
+            self.pending += 1
+        self.queue.put((priority, next(self.counter), element, library, token))
+
+    def work(self):
+        while True:
+            priority, index, element, library, token = self.queue.get()
+            if element == None:
+                return
+            try:
+                if token.cancelled():
+                    with self.condition:
+                        self.skipped += [element]
+                else:
+                    # with several workers, the lines of the media items would interleave without their title
+                    if len(self.threads) > 1:
+                        ui_item(element.query())
+                    with cancellation(token, cancellation.budget(cancellation.item_budget)) as item:
+                        with metrics.timer('item', element.type):
+                            element.download(library=library)
+                    metrics.count('items', element.type)
+                    if item.cancelled() and not token.cancelled():
+                        ui_print('item time budget exceeded for: ' + element.query() + ', checking it again later.')
+            except Exception as e:
+                ui_print("error: (download exception): " + str(e), ui_settings.debug)
+            ui_item()
+            with self.condition:
+                self.pending -= 1
+                self.condition.notify_all()
+
+    def join(self, timeout=None):
+        # wait until all queued items are processed, returns False if the timeout passed first
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending == 0, timeout)
+
+    def drain(self):
+        # return and forget the media items that were skipped because their cycle was cancelled
+        with self.condition:
+            skipped = self.skipped
+            self.skipped = []
+        return skipped
+
+    def close(self):
+        for t in self.threads:
+            self.queue.put((float('inf'), next(self.counter), None, None, None))
+
+def worker_count():
+    try:
+        return max(1, int(ui_settings.workers))
+    except:
+        ui_print("error: the download workers setting is not a number! using 1 download worker.")
+        return 1
+
+def monitored(plex_watchlist, trakt_watchlist, overseerr_requests):
     # combine all content, sort by newest
     watchlists = plex_watchlist + trakt_watchlist + overseerr_requests
     try:
         watchlists.data.sort(key=lambda s: s.watchlistedAt,reverse=True)
     except:
         ui_print("couldnt sort monitored media by newest, using default order.", ui_settings.debug)
-    if len(library) > 0:
-        ui_print('checking new content ...')
+    return watchlists
+
+def fetch_watchlists():
+    # get entire plex_watchlist
+    with metrics.timer('watchlist', 'plex'):
+        plex_watchlist = content.services.plex.watchlist()
+    # get entire trakt_watchlist
+    with metrics.timer('watchlist', 'trakt'):
+        trakt_watchlist = content.services.trakt.watchlist()
+    # get all overseerr request, match content to plex media type and add to monitored list
+    with metrics.timer('watchlist', 'overseerr'):
+        overseerr_requests = content.services.overseerr.requests()
+    return plex_watchlist, trakt_watchlist, overseerr_requests
+
+def fetch_library():
+    with metrics.timer('library'):
+        return content.classes.library()[0]()
+
+def changes(plex_watchlist, trakt_watchlist, overseerr_requests):
+    # collect the changes of all watchlists since their last update
+    delta = content.classes.delta()
+    for service, watchlist in [('plex', plex_watchlist), ('trakt', trakt_watchlist), ('overseerr', overseerr_requests)]:
+        with metrics.timer('watchlist_update', service):
+            delta += watchlist.update()
+    return delta
+
+def process(pool, elements, library, services=None):
+    # queue all media items and wait for the pass to complete. if services are given, the watchlists are checked for changes every 5 seconds and new content is queued in front of the remaining items.
+    # the pass is cancelled once the cycle time budget is exceeded, items that werent started by then are skipped.
+    # returns all media items that were processed, the watchlist changes that were found and the skipped media items.
+    processed = []
+    found = content.classes.delta()
+    cycle = cancellation(cancellation.root, cancellation.budget(cancellation.cycle_budget))
+    for element in elements:
+        if hasattr(element, 'download'):
+            pool.put(element, library, token=cycle)
+            processed += [element]
+    t0 = time.time()
+    while not pool.join(timeout=1):
+        if services == None or time.time() - t0 < 5 or cycle.cancelled():
+            continue
+        delta = changes(*services)
+        found += delta
+        if delta.pending():
+            new_library = fetch_library()
+            if len(new_library) > 0:
+                for element in unique(delta.added + delta.changed):
+                    if hasattr(element, 'download'):
+                        pool.put(element, new_library, priority=0, token=cycle)
+                        processed += [element]
         t0 = time.time()
-        for element in unique(watchlists):
-            if hasattr(element, 'download'):
-                element.download(library=library)
-                t1 = time.time()
-                #if more than 5 seconds have passed, check for newly watchlisted content
-                if t1-t0 >= 5:
-                    if plex_watchlist.update() or overseerr_requests.update() or trakt_watchlist.update():
-                        library = content.classes.library()[0]()
-                        if len(library) == 0:
-                            continue
-                        new_watchlists = plex_watchlist + trakt_watchlist + overseerr_requests
-                        try:
-                            new_watchlists.data.sort(key=lambda s: s.watchlistedAt,reverse=True)
-                        except:
-                            ui_print("couldnt sort monitored media by newest, using default order.", ui_settings.debug)
-                        new_watchlists = unique(new_watchlists)
-                        for element in new_watchlists[:]:
-                            if element in watchlists:
-                                new_watchlists.remove(element)
-                        ui_print('checking new content ...')
-                        for element in new_watchlists:
-                            if hasattr(element, 'download'):
-                                element.download(library=library)
-                        ui_print('done')
-                    t0 = time.time()
-        ui_print('done')
+    skipped = pool.drain()
+    if len(skipped) > 0:
+        ui_print('cycle time budget exceeded, skipped ' + str(len(skipped)) + ' media items.')
+        done = content.classes.catalog(skipped)
+        processed = [element for element in processed if not element in done]
+    return processed, found, skipped
+
+def threaded(stop, cycles=None):
+    # runs until stopped, or for the given number of cycles
+    ui_cls()
+    if service_mode == True:
+        print("Running in service mode, user input not supported.")
+    else:
+        print("Type 'exit' to return to the main menu.")
+    timeout = 5
+    refreshed = time.time()
+    pool = workers(worker_count())
+    schedule = content.schedule.scheduler()
+    library = fetch_library()
+    plex_watchlist, trakt_watchlist, overseerr_requests = fetch_watchlists()
+    watchlists = monitored(plex_watchlist, trakt_watchlist, overseerr_requests)
+    # monitored items are due right away or when they were due in the last run, afterwards items are only checked once they are due again
+    if cycles == None:
+        schedule.resume()
+    schedule.update(unique(watchlists))
     while not stop():
-        if plex_watchlist.update() or overseerr_requests.update() or trakt_watchlist.update():
-            library = content.classes.library()[0]()
-            if len(library) == 0:
-                continue
-            watchlists = plex_watchlist + trakt_watchlist + overseerr_requests
-            try:
-                watchlists.data.sort(key=lambda s: s.watchlistedAt,reverse=True)
-            except:
-                ui_print("couldnt sort monitored media by newest, using default order.", ui_settings.debug)
-            ui_print('checking new content ...')
-            for element in unique(watchlists):
-                if hasattr(element, 'download'):
-                    newly_added = True
-                    if element.type == "show":
-                        for season in element.Seasons:
-                            if season in content.classes.media.ignore_queue or not newly_added:
-                                newly_added = False
-                                break
-                            for episode in season.Episodes:
-                                if episode in content.classes.media.ignore_queue:
-                                    newly_added = False
-                                    break
-                    if newly_added:
-                        element.download(library=library)
-            ui_print('done')
-        elif timeout_counter >= regular_check:
-            # get entire plex_watchlist
-            plex_watchlist = content.services.plex.watchlist()
-            # get entire trakt_watchlist
-            trakt_watchlist = content.services.trakt.watchlist()
-            # get all overseerr request, match content to plex media type and add to monitored list
-            overseerr_requests = content.services.overseerr.requests()
-            # combine all content, sort by newest
-            watchlists = plex_watchlist + trakt_watchlist + overseerr_requests
-            try:
-                watchlists.data.sort(key=lambda s: s.watchlistedAt,reverse=True)
-            except:
-                ui_print("couldnt sort monitored media by newest, using default order.", ui_settings.debug)
-            library = content.classes.library()[0]()
-            timeout_counter = 0
-            if len(library) == 0:
-                continue
-            ui_print('checking new content ...')
-            t0 = time.time()
-            for element in unique(watchlists):
-                if hasattr(element, 'download'):
-                    element.download(library=library)
-                    t1 = time.time()
-                    #if more than 5 seconds have passed, check for newly watchlisted content
-                    if t1-t0 >= 5:
-                        if plex_watchlist.update() or overseerr_requests.update() or trakt_watchlist.update():
-                            library = content.classes.library()[0]()
-                            if len(library) == 0:
-                                continue
-                            new_watchlists = plex_watchlist + trakt_watchlist + overseerr_requests
-                            try:
-                                new_watchlists.data.sort(key=lambda s: s.watchlistedAt,reverse=True)
-                            except:
-                                ui_print("couldnt sort monitored media by newest, using default order.", ui_settings.debug)
-                            new_watchlists = unique(new_watchlists)
-                            for element in new_watchlists[:]:
-                                if element in watchlists:
-                                    new_watchlists.remove(element)
-                            ui_print('checking new content ...')
-                            for element in new_watchlists:
-                                if hasattr(element, 'download'):
-                                    element.download(library=library)
-                            ui_print('done')
-                        t0 = time.time()
-            ui_print('done')
-        else:
-            timeout_counter += timeout
-        time.sleep(timeout)
+        delta = changes(plex_watchlist, trakt_watchlist, overseerr_requests)
+        if delta:
+            # only the changed items are scheduled, the rest of the watchlists is left alone
+            if delta.pending():
+                library = fetch_library()
+            watchlists = monitored(plex_watchlist, trakt_watchlist, overseerr_requests)
+            schedule.apply(delta, watchlists)
+        elif time.time() - refreshed >= content.schedule.seconds():
+            plex_watchlist, trakt_watchlist, overseerr_requests = fetch_watchlists()
+            watchlists = monitored(plex_watchlist, trakt_watchlist, overseerr_requests)
+            library = fetch_library()
+            refreshed = time.time()
+            schedule.update(unique(watchlists))
+        if len(library) > 0:
+            due = schedule.pop()
+            if len(due) > 0:
+                ui_print('checking new content ...')
+                processed, delta, skipped = process(pool, due, library, [plex_watchlist, trakt_watchlist, overseerr_requests])
+                if delta:
+                    watchlists = monitored(plex_watchlist, trakt_watchlist, overseerr_requests)
+                schedule.apply(delta, watchlists, processed)
+                # skipped items are due again right away
+                for element in skipped:
+                    schedule.add(element, time.time())
+                schedule.save()
+                compact()
+                content.classes.calendar.save()
+                scraper.cache.save()
+                scraper.ids.save()
+                metrics.export(config_dir)
+                ui_print('done')
+        if not cycles == None:
+            cycles -= 1
+            if cycles <= 0:
+                break
+        cancellation.root.wait(timeout)
+    pool.close()
+
+def benchmark(cdir=""):
+    # run a single download cycle, starting cold, and print its wall clock and cpu time. combined with a recorded http fixture (--replay), a full cycle can be timed without any network access.
+    global config_dir
+    config_dir = cdir
+    set_log_dir(config_dir)
+    restore()
+    load()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    threaded(lambda: False, cycles=1)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    print()
+    print('benchmark: cycle took ' + str(round(wall, 2)) + 's wall clock time, ' + str(round(cpu, 2)) + 's cpu time')
+
+def benchmark_json(filename):
+    # decode the json payloads of a recorded http fixture (--record) with SimpleNamespace objects and with lazy views, and print the parse time and peak memory of both.
+    import tracemalloc
+    with open(filename, 'r') as f:
+        records = json.load(f)
+    payloads = []
+    for record in records:
+        content = base64.b64decode(record['content'])
+        try:
+            json.loads(content)
+        except:
+            continue
+        payloads += [(record['url'], content)]
+    decoders = [
+        ('SimpleNamespace', lambda content: json.loads(content, object_hook=lambda d: SimpleNamespace(**d))),
+        ('view' + (' (orjson)' if not view.decoder() == None else ''), lambda content: view.loads(content)),
+    ]
+    print('decoding ' + str(len(payloads)) + ' json payloads (' + str(round(sum(len(content) for url, content in payloads) / 1024 / 1024, 2)) + ' MB) from ' + filename)
+    for name, decode in decoders:
+        seconds = 0
+        peak = 0
+        for url, content in payloads:
+            tracemalloc.start()
+            tic = time.perf_counter()
+            decoded = decode(content)
+            seconds += time.perf_counter() - tic
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            del decoded
+        print(name.ljust(20) + ' parse time: ' + str(round(seconds * 1000, 1)) + 'ms, peak memory of the largest payload: ' + str(round(peak / 1024 / 1024, 2)) + ' MB')
+
+def profile_startup(count=15):
+    # import plex_debrid in a fresh interpreter with python's import time profiler (-X importtime), and print the total import time
+    # and the packages that took longest to import.
+    import subprocess
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import time; tic = time.perf_counter(); import ui; print(time.perf_counter() - tic)'], cwd=directory, capture_output=True, text=True)
+    if not result.returncode == 0:
+        print('startup profile failed: ' + result.stderr.strip().split('\n')[-1])
+        return
+    packages = {}
+    for line in result.stderr.split('\n'):
+        if not line.startswith('import time:') or line.endswith('| imported package'):
+            continue
+        self, cumulative, module = line[len('import time:'):].split('|')
+        package = module.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self)
+    print('startup profile: importing plex_debrid took ' + str(round(float(result.stdout.strip().split('\n')[-1]) * 1000, 1)) + 'ms')
+    for package, microseconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]:
+        print(package.ljust(30) + str(round(microseconds / 1000, 1)).rjust(8) + 'ms')
 
 def download_script_run():
     if preflight():
         global stop
         stop = False
+        cancellation.root = cancellation()
         t = Thread(target=threaded, args=(lambda: stop,))
         t.start()
         if service_mode == True:
@@ -535,6 +704,8 @@ def download_script_run():
                 text = input("")
                 if text == 'exit':
                     stop = True
+                    # cancel all running requests and waits, so that the download automation stops right away
+                    cancellation.root.cancel()
                 else:
                     print("Type 'exit' to return to the main menu.")
         print("Waiting for the download automation to stop ... ")
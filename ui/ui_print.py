@@ -1,10 +1,13 @@
 from base import *
+import atexit
 
 from ui import ui_settings
 
 sameline = False
 sameline_log = False
 config_dir = "."
+# the media item the current thread works on, if several download workers run in parallel
+ui_context = threading.local()
 
 def ui_cls(path='',update=""):
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -27,39 +30,165 @@ def set_log_dir(config):
     global config_dir
     config_dir = config
 
+def ui_item(title=None):
+    # prefix the lines this thread prints with the title of a media item, or stop prefixing them. prefixed lines are
+    # always printed on their own, since lines of other threads can come in between a "..." line and its "done".
+    ui_context.prefix = None if title == None else '[' + title + '] '
+
+class writer:
+    # Writes the log file from a background thread. ui_print only queues its lines, the writer keeps the log file open,
+    # writes everything that was queued in one go and rotates the file once it is larger than the log size setting.
+    # The console is flushed once per batch as well, instead of on every printed line.
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+        self.file = None
+        self.path = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.thread == None:
+            with self.lock:
+                if self.thread == None:
+                    self.thread = Thread(target=self.run, daemon=True, name='log writer')
+                    self.thread.start()
+
+    def put(self, directory, timestamp, string, line=False):
+        self.start()
+        self.queue.put((directory, timestamp, string, line))
+
+    def wake(self):
+        # only flush the console
+        self.start()
+        self.queue.put(None)
+
+    def flush(self, timeout=5):
+        # wait until everything that was queued so far is written
+        if self.thread == None:
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < 1000:
+                try:
+                    batch += [self.queue.get_nowait()]
+                except queue.Empty:
+                    break
+            self.write(batch)
+
+    def write(self, batch):
+        global sameline_log
+        events = []
+        try:
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    events += [entry]
+                    continue
+                if entry == None:
+                    continue
+                directory, timestamp, string, line = entry
+                self.open(directory + '/plex_debrid.log')
+                if line:
+                    if sameline_log:
+                        self.file.write('\n')
+                        sameline_log = False
+                    self.file.write('[' + timestamp + '] ' + string + '\n')
+                elif string == 'done' and sameline_log:
+                    self.file.write('done' + '\n')
+                    sameline_log = False
+                elif sameline_log and string.startswith('done'):
+                    self.file.write(string + '\n')
+                    sameline_log = False
+                elif sameline_log and string.endswith('...'):
+                    self.file.write('done' + '\n')
+                    self.file.write('[' + timestamp + '] ' + string + ' ')
+                    sameline_log = True
+                elif string.endswith('...'):
+                    self.file.write('[' + timestamp + '] ' + string + ' ')
+                    sameline_log = True
+                elif not string.startswith('done') and sameline_log:
+                    self.file.write('done' + '\n')
+                    self.file.write('[' + timestamp + '] ' + string + '\n')
+                    sameline_log = False
+                elif not string.startswith('done'):
+                    self.file.write('[' + timestamp + '] ' + string + '\n')
+                    sameline_log = False
+            if not self.file == None:
+                self.file.flush()
+                self.rotate()
+        except:
+            self.close()
+            print('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] logging error: couldnt write into log file at: ' + str(self.path))
+        try:
+            sys.stdout.flush()
+        except:
+            pass
+        for event in events:
+            event.set()
+
+    def open(self, path):
+        if path == self.path and not self.file == None:
+            return
+        self.close()
+        self.path = path
+        self.file = open(path, 'a')
+
+    def close(self):
+        if not self.file == None:
+            try:
+                self.file.close()
+            except:
+                pass
+        self.file = None
+
+    def rotate(self):
+        # plex_debrid.log is moved to plex_debrid.log.1, plex_debrid.log.1 to plex_debrid.log.2 and so on. a line that
+        # is still waiting for its "done" is finished in the new file.
+        try:
+            size = float(ui_settings.log_size) * 1000000
+            files = max(0, int(ui_settings.log_files))
+        except:
+            size = 10000000
+            files = 3
+        if size <= 0 or self.file.tell() < size:
+            return
+        self.close()
+        if files == 0:
+            os.remove(self.path)
+            return
+        for index in range(files - 1, 0, -1):
+            if os.path.exists(self.path + '.' + str(index)):
+                os.replace(self.path + '.' + str(index), self.path + '.' + str(index + 1))
+        os.replace(self.path, self.path + '.1')
+
+log_writer = writer()
+atexit.register(log_writer.flush)
+
 def ui_print(string: str, debug="true"):
     global sameline
-    global sameline_log
     try:
+        timestamp = None
+        prefix = getattr(ui_context, 'prefix', None)
+        if not prefix == None:
+            string = prefix + string
         #log
         if ui_settings.log == "true":
-            try:
-                with open(config_dir + '/plex_debrid.log', 'a') as f:
-                    if string == 'done' and sameline_log:
-                        f.write('done' + '\n')
-                        sameline_log = False
-                    elif sameline_log and string.startswith('done'):
-                        f.write(string + '\n')
-                        sameline_log = False
-                    elif sameline_log and string.endswith('...'):
-                        f.write('done' + '\n')
-                        f.write('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string  + ' ')
-                        sameline_log = True
-                    elif string.endswith('...'):
-                        f.write('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string + ' ')
-                        sameline_log = True
-                    elif not string.startswith('done') and sameline_log:
-                        f.write('done' + '\n')
-                        f.write('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string + '\n')
-                        sameline_log = False
-                    elif not string.startswith('done'):
-                        f.write('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string + '\n')
-                        sameline_log = False
-            except:
-                print('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] logging error: couldnt write into log file at: ' + config_dir + '/plex_debrid.log')
+            timestamp = datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")
+            log_writer.put(config_dir, timestamp, string, not prefix == None)
         #ui
         if debug == "true":
-            if string == 'done' and sameline:
+            if timestamp == None:
+                timestamp = datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")
+            if not prefix == None:
+                if sameline:
+                    print()
+                    sameline = False
+                print('[' + timestamp + '] ' + string)
+            elif string == 'done' and sameline:
                 print('done')
                 sameline = False
             elif sameline and string.startswith('done'):
@@ -67,18 +196,20 @@ def ui_print(string: str, debug="true"):
                 sameline = False
             elif sameline and string.endswith('...'):
                 print('done')
-                print('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string, end=' ')
+                print('[' + timestamp + '] ' + string, end=' ')
                 sameline = True
             elif string.endswith('...'):
-                print('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string, end=' ')
+                print('[' + timestamp + '] ' + string, end=' ')
                 sameline = True
             elif not string.startswith('done') and sameline:
                 print('done')
-                print('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string)
+                print('[' + timestamp + '] ' + string)
                 sameline = False
             elif not string.startswith('done'):
-                print('[' + str(datetime.datetime.now().strftime("%d/%m/%y %H:%M:%S")) + '] ' + string)
+                print('[' + timestamp + '] ' + string)
                 sameline = False
-            sys.stdout.flush()
+            # the log writer flushes the console after its next batch
+            if not ui_settings.log == "true":
+                log_writer.wake()
     except:
         sys.stdout.flush()
@@ -2,3 +2,7 @@ version = ['2.95', "Settings compatible update", []]
 run_directly = "true"
 debug = "false"
 log = "false"
+# size (in MB) after which the log file is rotated, and the number of rotated log files that are kept
+log_size = "10"
+log_files = "3"
+workers = "1"